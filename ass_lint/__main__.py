@@ -1,50 +1,65 @@
 import argparse
 import asyncio
 import logging
-from collections.abc import Iterable
+import os
+import sys
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from functools import partial
 from pathlib import Path
+from typing import Optional
 
 import colorama
-from ass_parser import read_ass
-from ass_renderer import AssRenderer
+from ass_parser import AssEvent, AssFile
 
-from ass_lint.checks import get_checks
-from ass_lint.common import BaseCheck, BaseResult, CheckContext, LogLevel
-from ass_lint.util import benchmark, get_video_height, get_video_width
-from ass_lint.video import VideoError, VideoSource
+from ass_lint.cache import get_cache_dir, prune_caches
+from ass_lint.checks import CHECKS, get_checks
+from ass_lint.common import (
+    DEFAULT_FONTS_DIRS,
+    BaseCheck,
+    BaseEventCheck,
+    BaseResult,
+    CheckContext,
+    DebugInformation,
+    LogLevel,
+    Resource,
+    TimedOut,
+    make_context,
+)
+from ass_lint.config import (
+    CONFIG_FILE_NAME,
+    ConfigError,
+    find_config,
+    load_config,
+)
+from ass_lint.diff import DiffError, FileDiff, diff_against_reference
+from ass_lint.matroska import MatroskaError
+from ass_lint.profiler import Profiler
+from ass_lint.reader import AssReader, read_ass
+from ass_lint.result_cache import (
+    ResultCache,
+    count_warnings,
+    get_result_cache_key,
+)
+from ass_lint.scheduler import (
+    ResultOrder,
+    Scheduler,
+    TimeBudget,
+    construct_check,
+)
+from ass_lint.util import DEFAULT_WIDTH_MARGIN, get_system_fonts_dirs
 
-
-def make_context(path: Path) -> CheckContext:
-    ass_file = read_ass(path)
-
-    video_resolution = (
-        get_video_width(ass_file),
-        get_video_height(ass_file),
-    )
-
-    renderer = AssRenderer()
-    renderer.set_source(ass_file=ass_file, video_resolution=video_resolution)
-
-    video = None
-    if video_path := ass_file.script_info.get("Video File"):
-        video_path = path.parent / video_path
-        try:
-            video = VideoSource(video_path)
-        except VideoError as ex:
-            logging.warning(ex)
-
-    return CheckContext(
-        subs_path=path,
-        ass_file=ass_file,
-        video_resolution=video_resolution,
-        renderer=renderer,
-        video=video,
-    )
+# some checks ran out of time and only covered part of the file
+PARTIAL_COVERAGE_EXIT_CODE = 3
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
-    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "path",
+        type=Path,
+        help="ASS file, or Matroska file to check the ASS track of",
+    )
     parser.add_argument(
         "-f",
         "--full",
@@ -57,7 +72,168 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="show debug information",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="CHECK",
+        choices=[spec.name for spec in CHECKS],
+        help="run only given check (can be repeated)",
+    )
+    parser.add_argument(
+        "--skip",
+        action="append",
+        metavar="CHECK",
+        choices=[spec.name for spec in CHECKS],
+        help="don't run given check (can be repeated)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="number of checks to run concurrently",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="number of events to measure with the renderer concurrently",
+    )
+    parser.add_argument(
+        "--order",
+        choices=[order.value for order in ResultOrder],
+        default=ResultOrder.check.value,
+        help="report results grouped by check or sorted by event number",
+    )
+    parser.add_argument(
+        "--grammar-server",
+        metavar="URL",
+        help="LanguageTool-compatible server to check grammar with",
+    )
+    parser.add_argument(
+        "--fonts-dir",
+        type=Path,
+        action="append",
+        dest="fonts_dirs",
+        metavar="DIR",
+        help="directory to look for fonts in, recursively; relative paths "
+        "are resolved against the subtitles' directory (can be repeated, "
+        "defaults to fonts and ~/.config/ass-lint/fonts)",
+    )
+    parser.add_argument(
+        "--system-fonts",
+        action="store_true",
+        help="look for fonts in the system font directories as well",
+    )
+    parser.add_argument(
+        "--width-margin",
+        type=float,
+        default=DEFAULT_WIDTH_MARGIN,
+        metavar="RATIO",
+        help="relative margin within which line widths estimated from font "
+        "metrics are confirmed with the renderer",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        metavar="PATH",
+        help=f"project configuration (defaults to the nearest "
+        f"{CONFIG_FILE_NAME} in the subtitles' directory or its parents)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="don't reuse nor store the results of unchanged files",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        type=float,
+        metavar="DAYS",
+        help="remove cache entries not used for given number of days",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=float,
+        metavar="MB",
+        help="remove the least recently used entries of each cache until it "
+        "fits in given size",
+    )
+    parser.add_argument(
+        "--check-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="stop each check after given time, reporting what it found "
+        "until then",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help="stop all the checks after given time, reporting what they "
+        "found until then",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="start checking events while the file is still being read",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REF",
+        help="check only what changed since given reference file, or git "
+        "revision of the checked file",
+    )
+    parser.add_argument(
+        "--sample",
+        type=float,
+        metavar="FRACTION",
+        help="run the expensive checks just for given portion of the "
+        "events of each style and actor category, estimating the total "
+        "violation count",
+    )
+    parser.add_argument(
+        "--sample-seed",
+        type=int,
+        default=0,
+        metavar="N",
+        help="seed picking the sampled events",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print per-check timings at exit",
+    )
+    parser.add_argument(
+        "--profile-slowest",
+        type=int,
+        default=5,
+        metavar="N",
+        help="number of slowest events to report for each check",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="CHECK",
+        help="run given check (e.g. CheckLongLines) under cProfile "
+        "and dump the stats to CHECK.prof",
+    )
+    parser.add_argument(
+        "--cprofile-dir",
+        type=Path,
+        default=Path("."),
+        metavar="DIR",
+        help="directory to dump .prof files to",
+    )
+    args = parser.parse_args()
+    if args.since and args.stream:
+        parser.error("--since can't be combined with --stream")
+    if args.sample is not None:
+        if not 0 < args.sample <= 1:
+            parser.error("--sample must be within (0, 1]")
+        if args.stream:
+            parser.error("--sample can't be combined with --stream")
+    return args
 
 
 def print_result(result: BaseResult) -> None:
@@ -69,27 +245,252 @@ def print_result(result: BaseResult) -> None:
     print(color + repr(result) + colorama.Fore.RESET)
 
 
-async def main() -> None:
+async def main() -> int:
     colorama.init()
 
     args = parse_args()
+    time_budget = TimeBudget(
+        per_check=args.check_timeout,
+        deadline=(
+            time.time() + args.timeout if args.timeout is not None else None
+        ),
+    )
     if args.debug:
         logging.basicConfig(level=logging.DEBUG)
 
-    ctx = make_context(args.path)
-    checks = list(get_checks(full=args.full))
+    profiler: Optional[Profiler] = None
+    if args.profile or args.cprofile:
+        profiler = Profiler(
+            slowest_count=args.profile_slowest,
+            cprofile_check=args.cprofile,
+            cprofile_dir=args.cprofile_dir,
+        )
 
-    for check_cls in checks:
-        with benchmark(f"{check_cls}"):
-            try:
-                check = check_cls(ctx)
-            except Exception as ex:
-                logging.warning(ex)
+    checks = list(get_checks(full=args.full, only=args.only, skip=args.skip))
+    ass_file: Optional[AssFile] = None
+    diff: Optional[FileDiff] = None
+    if args.since:
+        ass_file = read_ass(args.path)
+        try:
+            diff = diff_against_reference(args.path, ass_file, args.since)
+        except DiffError as ex:
+            raise SystemExit(f"error: {ex}") from ex
+        if unaffected := [
+            check_cls
+            for check_cls in checks
+            if not check_cls.is_affected_by(diff)
+        ]:
+            print_result(
+                DebugInformation(
+                    "Unchanged since the reference, skipping: "
+                    + ", ".join(check_cls.__name__ for check_cls in unaffected)
+                )
+            )
+            checks = [
+                check_cls
+                for check_cls in checks
+                if check_cls not in unaffected
+            ]
+    if resources := get_required_resources(checks):
+        print_result(
+            DebugInformation(
+                "Selected checks will load: "
+                + ", ".join(sorted(resource.value for resource in resources))
+            )
+        )
+    try:
+        config = load_config(args.config or find_config(args.path))
+    except ConfigError as ex:
+        raise SystemExit(f"error: {ex}") from ex
+    fonts_dirs = list(args.fonts_dirs or DEFAULT_FONTS_DIRS)
+    if args.system_fonts:
+        fonts_dirs.extend(get_system_fonts_dirs())
+
+    context_factory = partial(
+        make_context,
+        args.path,
+        fonts_dirs=fonts_dirs,
+        config=config,
+        grammar_server=args.grammar_server,
+        width_margin=args.width_margin,
+        render_workers=args.render_workers,
+        diff=diff,
+        sample_fraction=args.sample,
+        sample_seed=args.sample_seed,
+    )
+    cache_dir = get_cache_dir()
+    result_cache: Optional[ResultCache] = None
+    cached_results: Optional[list[BaseResult]] = None
+    if not args.no_cache and not profiler:
+        result_cache = ResultCache(cache_dir)
+        cache_key = get_result_cache_key(
+            context_factory(ass_file=AssReader(args.path).read_header()),
+            checks,
+            args.order,
+            args.stream,
+        )
+        cached_results = result_cache.get(cache_key)
+
+    results: list[BaseResult] = []
+    if cached_results is not None:
+        for result in cached_results:
+            print_result(result)
+    else:
+
+        def report(result: BaseResult) -> None:
+            print_result(result)
+            results.append(result)
+
+        with count_warnings() as warnings:
+            if args.stream:
+                await run_streaming(
+                    args.path,
+                    context_factory,
+                    checks,
+                    profiler,
+                    report,
+                    time_budget,
+                )
             else:
-                async for result in check.run():
-                    print_result(result)
+                ctx = context_factory(ass_file=ass_file)
+                scheduler = Scheduler(
+                    ctx=ctx,
+                    context_factory=context_factory,
+                    jobs=args.jobs,
+                    order=ResultOrder(args.order),
+                    profiler=profiler,
+                    time_budget=time_budget,
+                )
+                try:
+                    async for result in scheduler.run(checks):
+                        report(result)
+                finally:
+                    ctx.close()
+        timed_out = any(isinstance(result, TimedOut) for result in results)
+        # failing checks only log a warning
+        if result_cache and not warnings.count and not timed_out:
+            result_cache.set(cache_key, results)
+
+    if result_cache:
+        result_cache.close()
+    if args.cache_max_age is not None or args.cache_max_size is not None:
+        prune_caches(
+            cache_dir,
+            max_age=(
+                args.cache_max_age * 86400
+                if args.cache_max_age is not None
+                else None
+            ),
+            max_size=(
+                int(args.cache_max_size * 1024 * 1024)
+                if args.cache_max_size is not None
+                else None
+            ),
+        )
+
+    if profiler:
+        for path in profiler.dump_cprofiles():
+            print(f"cProfile stats saved to {path}")
+        print(profiler.format_summary())
+
+    if any(isinstance(result, TimedOut) for result in results):
+        return PARTIAL_COVERAGE_EXIT_CODE
+    return 0
+
+
+def get_required_resources(checks: list[type[BaseCheck]]) -> set[Resource]:
+    return {resource for check in checks for resource in check.resources}
+
+
+async def run_streaming(
+    path: Path,
+    context_factory: Callable[..., CheckContext],
+    checks: list[type[BaseCheck]],
+    profiler: Optional[Profiler],
+    report: Callable[[BaseResult], None] = print_result,
+    time_budget: Optional[TimeBudget] = None,
+) -> None:
+    reader = AssReader(path)
+    ctx = context_factory(ass_file=reader.read_header())
+    try:
+        await _run_streaming(
+            reader, ctx, checks, profiler, report, time_budget
+        )
+    finally:
+        ctx.close()
+
+
+async def _run_streaming(
+    reader: AssReader,
+    ctx: CheckContext,
+    checks: list[type[BaseCheck]],
+    profiler: Optional[Profiler],
+    report: Callable[[BaseResult], None],
+    time_budget: Optional[TimeBudget],
+) -> None:
+    event_checks: list[BaseEventCheck] = []
+    file_checks: list[type[BaseCheck]] = []
+    for check_cls in checks:
+        if issubclass(check_cls, BaseEventCheck) and check_cls.streamable:
+            deadline = (
+                time_budget.get_check_deadline() if time_budget else None
+            )
+            check = construct_check(ctx, check_cls, profiler)
+            if check:
+                check.deadline = deadline
+                event_checks.append(check)
+        else:
+            file_checks.append(check_cls)
+
+    pending: list[AssEvent] = []
+    for chunk in reader.iter_event_chunks():
+        if not event_checks:
+            continue
+        pending.extend(chunk)
+        for check in event_checks:
+            check.extend_event_map(chunk)
+
+        # the last non-empty event might get its successor in the next chunk
+        split = len(pending)
+        last = event_checks[0].last_non_empty_event
+        if last and last.index >= pending[0].index:
+            split = last.index - pending[0].index
+        ready, pending = pending[:split], pending[split:]
+        for check in event_checks:
+            await run_check(
+                check, check.run_for_events(ready), profiler, report
+            )
+
+    for check in event_checks:
+        await run_check(check, check.run_for_events(pending), profiler, report)
+        if timeout_result := check.get_timeout_result():
+            report(timeout_result)
+
+    for check_cls in file_checks:
+        deadline = time_budget.get_check_deadline() if time_budget else None
+        check = construct_check(ctx, check_cls, profiler)
+        if check:
+            check.deadline = deadline
+            await run_check(check, check.run(), profiler, report)
+            if timeout_result := check.get_timeout_result():
+                report(timeout_result)
+
+
+async def run_check(
+    check: BaseCheck,
+    results: AsyncIterator[BaseResult],
+    profiler: Optional[Profiler],
+    report: Callable[[BaseResult], None] = print_result,
+) -> None:
+    if profiler and check.profile:
+        results = profiler.measure_run(check.profile, results)
+    async for result in results:
+        report(result)
 
 
 if __name__ == "__main__":
     loop = asyncio.get_event_loop()
-    loop.run_until_complete(main())
+    try:
+        sys.exit(loop.run_until_complete(main()))
+    except MatroskaError as ex:
+        sys.exit(f"error: {ex}")
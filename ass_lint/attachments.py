@@ -0,0 +1,183 @@
+import hashlib
+import io
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from ass_parser import AssBaseSection, AssFile
+
+FONTS_SECTION_NAME = "Fonts"
+GRAPHICS_SECTION_NAME = "Graphics"
+ATTACHMENT_SECTION_NAMES = {FONTS_SECTION_NAME, GRAPHICS_SECTION_NAME}
+ATTACHMENT_NAME_KEYS = {
+    FONTS_SECTION_NAME: "fontname",
+    GRAPHICS_SECTION_NAME: "filename",
+}
+
+# characters per encoded line, as written by Aegisub
+ENCODED_LINE_LENGTH = 80
+DECODE_CHUNK_SIZE = 65536
+
+
+@dataclass
+class AttachmentSource:
+    """Byte range of the subtitles file holding the encoded lines of an
+    attachment, read only once something needs the attachment.
+    """
+
+    path: Path
+    start: int
+    end: int
+    # contents of the subtitles file, if not read from the path
+    data: Optional[bytes] = field(default=None, repr=False)
+
+    def read(self) -> bytes:
+        if self.data is not None:
+            return self.data[self.start : self.end]
+        with self.path.open("rb") as handle:
+            handle.seek(self.start)
+            return handle.read(self.end - self.start)
+
+
+@dataclass
+class AssAttachment:
+    name: str
+    lines: list[str] = field(default_factory=list)
+    section_name: str = FONTS_SECTION_NAME
+    # where to read the lines from, if they weren't read yet
+    source: Optional[AttachmentSource] = None
+
+    @property
+    def path(self) -> Path:
+        return Path(f"[{self.section_name}]") / self.name
+
+    @property
+    def content_hash(self) -> str:
+        digest = hashlib.sha256()
+        for line in self.iter_lines():
+            digest.update(line.encode())
+        return digest.hexdigest()
+
+    def iter_lines(self) -> Iterator[str]:
+        if self.source is None:
+            yield from self.lines
+            return
+        for line in self.source.read().decode("utf-8").splitlines():
+            if line := line.strip():
+                yield line
+
+    def decode(self) -> io.BytesIO:
+        return decode_attachment(self.iter_lines())
+
+
+class AssAttachmentSection(AssBaseSection):
+    """[Fonts] or [Graphics] section.
+
+    The attachments are kept encoded and only decoded on demand.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.attachments: list[AssAttachment] = []
+
+    def consume_ass_body_lines(self, lines: list[tuple[int, str]]) -> None:
+        self.attachments.clear()
+        name_key = ATTACHMENT_NAME_KEYS.get(self.name, "fontname")
+        for _line_num, line in lines:
+            if line.startswith(f"{name_key}:"):
+                self.attachments.append(
+                    AssAttachment(
+                        name=line.split(":", 1)[1].strip(),
+                        section_name=self.name,
+                    )
+                )
+            elif self.attachments:
+                self.attachments[-1].lines.append(line)
+
+    def produce_ass_body_lines(self) -> Iterable[str]:
+        name_key = ATTACHMENT_NAME_KEYS.get(self.name, "fontname")
+        for attachment in self.attachments:
+            yield f"{name_key}: {attachment.name}"
+            yield from attachment.iter_lines()
+
+
+def _decode_groups(data: bytes) -> bytes:
+    import numpy as np
+
+    values = (
+        np.frombuffer(data, dtype=np.uint8).astype(np.uint32) - 33
+    ).reshape(-1, 4)
+    values = (
+        (values[:, 0] << 18)
+        | (values[:, 1] << 12)
+        | (values[:, 2] << 6)
+        | values[:, 3]
+    )
+    return (
+        np.stack([values >> 16, values >> 8, values], axis=1)
+        .astype(np.uint8)
+        .tobytes()
+    )
+
+
+def decode_attachment(lines: Iterable[str]) -> io.BytesIO:
+    """Decode an attachment from the ASS flavor of UU-encoding.
+
+    Every four characters encode three bytes, offset by 33 and without any
+    length prefix; a trailing group of two or three characters encodes one or
+    two bytes. The lines are decoded in chunks so that the whole encoded text
+    never needs to be joined.
+
+    :param lines: encoded lines
+    :return: decoded attachment
+    """
+    ret = io.BytesIO()
+    pending = b""
+    chunk: list[bytes] = []
+    chunk_size = 0
+    for line in lines:
+        chunk.append(line.encode("ascii"))
+        chunk_size += len(line)
+        if chunk_size >= DECODE_CHUNK_SIZE:
+            data = pending + b"".join(chunk)
+            cut = len(data) - len(data) % 4
+            ret.write(_decode_groups(data[:cut]))
+            pending = data[cut:]
+            chunk = []
+            chunk_size = 0
+
+    data = pending + b"".join(chunk)
+    cut = len(data) - len(data) % 4
+    ret.write(_decode_groups(data[:cut]))
+    if tail := data[cut:]:
+        ret.write(_decode_groups(tail.ljust(4, b"!"))[: len(tail) - 1])
+    ret.seek(0)
+    return ret
+
+
+def encode_attachment(data: bytes) -> list[str]:
+    chars = []
+    for i in range(0, len(data), 3):
+        group = data[i : i + 3]
+        value = int.from_bytes(group.ljust(3, b"\0"), "big")
+        encoded = [(value >> shift) & 0x3F for shift in (18, 12, 6, 0)]
+        chars.extend(chr(char + 33) for char in encoded[: len(group) + 1])
+    text = "".join(chars)
+    return [
+        text[i : i + ENCODED_LINE_LENGTH]
+        for i in range(0, len(text), ENCODED_LINE_LENGTH)
+    ]
+
+
+def get_attachments(
+    ass_file: AssFile, section_name: str = FONTS_SECTION_NAME
+) -> list[AssAttachment]:
+    ret = []
+    for section in ass_file.extra_sections:
+        if (
+            isinstance(section, AssAttachmentSection)
+            and section.name == section_name
+        ):
+            ret.extend(section.attachments)
+    return ret
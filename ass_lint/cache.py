@@ -0,0 +1,164 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Optional
+
+
+def get_cache_dir() -> Path:
+    return (
+        Path(os.environ.get("XDG_CACHE_HOME") or "~/.cache").expanduser()
+        / "ass-lint"
+    )
+
+
+def make_cache_key(*parts: Any) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            digest.update(part)
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_file_identity(path: Path) -> Optional[tuple[str, int]]:
+    """Identify a file by its path and size, for files too large to hash.
+
+    The modification time is left out, as fresh checkouts reset it.
+
+    :param path: file to identify
+    :return: identity, or None if the file doesn't exist
+    """
+    try:
+        return (str(path), path.stat().st_size)
+    except OSError:
+        return None
+
+
+class DiskCache:
+    """Persistent key-value store shared across runs and processes.
+
+    Values are pickled into a SQLite database, one file per cache name.
+    """
+
+    def __init__(self, name: str, cache_dir: Path) -> None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.path = cache_dir / f"{name}.sqlite"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, "
+                "value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "accessed REAL NOT NULL)"
+            )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_many({key: value})
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        keys = list(keys)
+        ret: dict[str, Any] = {}
+        with self._lock, self._conn:
+            # stay below SQLite's limit of host parameters
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for key, value in self._conn.execute(
+                    f"SELECT key, value FROM entries "
+                    f"WHERE key IN ({placeholders})",
+                    chunk,
+                ):
+                    ret[key] = pickle.loads(value)
+                self._conn.execute(
+                    f"UPDATE entries SET accessed = ? "
+                    f"WHERE key IN ({placeholders})",
+                    [time.time(), *chunk],
+                )
+        return ret
+
+    def set_many(self, items: dict[str, Any]) -> None:
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            blob = pickle.dumps(value)
+            rows.append((key, blob, len(blob), now))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", rows
+            )
+
+    def prune(
+        self,
+        max_age: Optional[float] = None,
+        max_size: Optional[int] = None,
+    ) -> int:
+        """Remove entries not accessed for more than max_age seconds, then the
+        least recently accessed ones until the total size fits in max_size
+        bytes.
+
+        :param max_age: maximum entry age in seconds
+        :param max_size: maximum total size of values in bytes
+        :return: number of removed entries
+        """
+        removed = 0
+        with self._lock, self._conn:
+            if max_age is not None:
+                removed += self._conn.execute(
+                    "DELETE FROM entries WHERE accessed < ?",
+                    [time.time() - max_age],
+                ).rowcount
+
+            if max_size is not None:
+                total_size = 0
+                stale_keys = []
+                for key, size in self._conn.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed DESC"
+                ):
+                    total_size += size
+                    if total_size > max_size:
+                        stale_keys.append((key,))
+                self._conn.executemany(
+                    "DELETE FROM entries WHERE key = ?", stale_keys
+                )
+                removed += len(stale_keys)
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def prune_caches(
+    cache_dir: Path,
+    max_age: Optional[float] = None,
+    max_size: Optional[int] = None,
+) -> int:
+    """Prune each of the caches stored in given directory.
+
+    :param cache_dir: directory holding the caches
+    :param max_age: maximum entry age in seconds
+    :param max_size: maximum total size of each cache's values in bytes
+    :return: number of removed entries
+    """
+    removed = 0
+    for path in sorted(cache_dir.glob("*.sqlite")):
+        cache = DiskCache(path.stem, cache_dir)
+        try:
+            removed += cache.prune(max_age=max_age, max_size=max_size)
+        finally:
+            cache.close()
+    return removed
@@ -1,50 +1,86 @@
-from collections.abc import Iterable
-
-from ass_lint.checks.actor_stats import CheckActorStats
-from ass_lint.checks.ass_tags import CheckAssTags
-from ass_lint.checks.double_words import CheckDoubleWords
-from ass_lint.checks.durations import CheckDurations
-from ass_lint.checks.fonts import CheckFonts
-from ass_lint.checks.grammar import CheckGrammar
-from ass_lint.checks.line_continuation import CheckLineContinuation
-from ass_lint.checks.long_lines import CheckLongLines
-from ass_lint.checks.punctuation import CheckPunctuation
-from ass_lint.checks.punctuation_stats import CheckPunctuationStats
-from ass_lint.checks.quotes import CheckQuotes
-from ass_lint.checks.spelling import CheckSpelling
-from ass_lint.checks.style_stats import CheckStyleStats
-from ass_lint.checks.style_validity import CheckStyleValidity
-from ass_lint.checks.times import CheckTimes
-from ass_lint.checks.unnecessary_breaks import CheckUnnecessaryBreaks
-from ass_lint.checks.video_resolution import CheckVideoResolution
-from ass_lint.common import BaseCheck
-
-
-def get_checks(full: bool) -> Iterable[BaseCheck]:
-    if full:
-        yield CheckGrammar
-
-    yield CheckStyleValidity
-    yield CheckAssTags
-    yield CheckDurations
-    yield CheckPunctuation
-    yield CheckQuotes
-    yield CheckLineContinuation
-    yield CheckDoubleWords
-    yield CheckUnnecessaryBreaks
-    yield CheckLongLines
-
-    if full:
-        yield CheckTimes
-
-    yield CheckVideoResolution
-    yield CheckSpelling
-    yield CheckActorStats
-    yield CheckStyleStats
-    yield CheckFonts
-    yield CheckPunctuationStats
+import importlib
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from ass_lint.common import BaseCheck
+
+
+@dataclass(frozen=True)
+class CheckSpec:
+    name: str
+    class_name: str
+    full: bool = False
+
+    @property
+    def module_name(self) -> str:
+        return f"{__name__}.{self.name}"
+
+    def load(self) -> type["BaseCheck"]:
+        module = importlib.import_module(self.module_name)
+        return getattr(module, self.class_name)
+
+
+# checks are only imported once selected, as some of them pull in heavy
+# dependencies such as fontTools, numpy or enchant
+CHECKS = [
+    CheckSpec("grammar", "CheckGrammar", full=True),
+    CheckSpec("style_validity", "CheckStyleValidity"),
+    CheckSpec("ass_tags", "CheckAssTags"),
+    CheckSpec("durations", "CheckDurations"),
+    CheckSpec("overlapping_dialog", "CheckOverlappingDialog"),
+    CheckSpec("punctuation", "CheckPunctuation"),
+    CheckSpec("quotes", "CheckQuotes"),
+    CheckSpec("line_continuation", "CheckLineContinuation"),
+    CheckSpec("double_words", "CheckDoubleWords"),
+    CheckSpec("rules", "CheckRules"),
+    CheckSpec("unnecessary_breaks", "CheckUnnecessaryBreaks"),
+    CheckSpec("long_lines", "CheckLongLines"),
+    CheckSpec("times", "CheckTimes", full=True),
+    CheckSpec("video_resolution", "CheckVideoResolution"),
+    CheckSpec("spelling", "CheckSpelling"),
+    CheckSpec("actor_stats", "CheckActorStats"),
+    CheckSpec("style_stats", "CheckStyleStats"),
+    CheckSpec("fonts", "CheckFonts"),
+    CheckSpec("punctuation_stats", "CheckPunctuationStats"),
+]
+
+
+def get_check_specs(
+    full: bool,
+    only: Optional[Collection[str]] = None,
+    skip: Optional[Collection[str]] = None,
+) -> Iterable[CheckSpec]:
+    known_names = {spec.name for spec in CHECKS}
+    for name in [*(only or []), *(skip or [])]:
+        if name not in known_names:
+            raise ValueError(f"unknown check: {name}")
+
+    for spec in CHECKS:
+        if only:
+            # explicitly selected checks run even if they're slow
+            if spec.name not in only:
+                continue
+        elif spec.full and not full:
+            continue
+        if skip and spec.name in skip:
+            continue
+        yield spec
+
+
+def get_checks(
+    full: bool,
+    only: Optional[Collection[str]] = None,
+    skip: Optional[Collection[str]] = None,
+) -> Iterable[type["BaseCheck"]]:
+    for spec in get_check_specs(full=full, only=only, skip=skip):
+        yield spec.load()
 
 
 __all__ = [
+    "CHECKS",
+    "CheckSpec",
+    "get_check_specs",
     "get_checks",
 ]
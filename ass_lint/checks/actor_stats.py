@@ -1,19 +1,15 @@
-from collections import defaultdict
-
-from ass_lint.common import BaseCheck, Information
+from ass_lint.common import BaseCheck, FileSection, Information
 
 
 class CheckActorStats(BaseCheck):
+    sections = frozenset({FileSection.events})
+
     async def run(self) -> None:
         result = ["Actors summary:"]
-        actors = defaultdict(int)
-
-        for event in self.ctx.ass_file.events:
-            actors[event.actor] += 1
 
         for actor, occurrences in sorted(
-            actors.items(), key=lambda kv: -kv[1]
+            self.ctx.stats.actors.items(), key=lambda kv: -kv[1]
         ):
-            result.append(f"– {occurrences} time(s): {actor}")
+            result.append(f"– {occurrences} time(s): {actor}")
 
         yield Information("\n".join(result))
@@ -12,7 +12,7 @@ from ass_tag_parser import (
     parse_ass,
 )
 
-from ass_lint.common import BaseEventCheck, BaseResult, Violation
+from ass_lint.common import BaseEventCheck, BaseResult, FileSection, Violation
 
 
 def get(source: list[Any], idx: int) -> Any:
@@ -22,6 +22,8 @@ def get(source: list[Any], idx: int) -> Any:
 
 
 class CheckAssTags(BaseEventCheck):
+    sections = frozenset({FileSection.events})
+
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
         try:
             ass_line = parse_ass(event.text)
@@ -1,16 +1,27 @@
-import re
 from collections.abc import Iterable
 
 from ass_parser import AssEvent
-from ass_tag_parser import ass_to_plaintext
 
-from ass_lint.common import BaseEventCheck, BaseResult, Violation
+from ass_lint import guarded_re
+from ass_lint.common import (
+    MAX_TEXT_LENGTH,
+    BaseEventCheck,
+    BaseResult,
+    FileSection,
+    Violation,
+)
+from ass_lint.util import get_plaintext
 
 
 class CheckDoubleWords(BaseEventCheck):
+    sections = frozenset({FileSection.events})
+    text_only = True
+    max_text_length = MAX_TEXT_LENGTH
+    version = 3
+
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
-        text = ass_to_plaintext(event.text)
+        text = get_plaintext(event.text)
 
-        for pair in re.finditer(r"(?<!\w)(\w+)\s+\1(?!\w)", text):
+        for pair in guarded_re.finditer(r"(?<!\w)(\w+)\s+\1(?!\w)", text):
             word = pair.group(1)
             yield Violation(f"double word ({word})", [event])
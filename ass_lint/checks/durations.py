@@ -1,51 +1,93 @@
-import re
 from collections.abc import Iterable
+from typing import TYPE_CHECKING, Union
 
 from ass_parser import AssEvent
-from ass_tag_parser import ass_to_plaintext
 
-from ass_lint.common import BaseEventCheck, BaseResult, Violation
-from ass_lint.util import is_event_karaoke
+from ass_lint.common import BaseEventCheck, BaseResult, FileSection, Violation
+from ass_lint.event_flags import EventFlag
+from ass_lint.util import count_plaintext_characters, get_plaintext
+
+if TYPE_CHECKING:
+    import numpy as np
 
 MIN_DURATION = 250  # milliseconds
 MIN_DURATION_LONG = 500  # milliseconds
 MIN_GAP = 250  # milliseconds
 
+# the rules take either single values or whole columns of the event table,
+# and are written without numpy so that it's only imported for the latter
+IntOrArray = Union[int, "np.ndarray"]
+
 
-def character_count(text: str) -> int:
-    """Count how many characters an ASS line contains.
+def get_min_duration(char_count: IntOrArray) -> IntOrArray:
+    return MIN_DURATION + (char_count >= 8) * (
+        MIN_DURATION_LONG - MIN_DURATION
+    )
 
-    Doesn't take into account effects such as text invisibility etc.
 
-    :param text: input ASS line
-    :return: number of characters
-    """
-    return len(re.sub(r"\W+", "", ass_to_plaintext(text), flags=re.I | re.U))
+def is_gap_too_short(gap: IntOrArray) -> IntOrArray:
+    return (gap > 0) & (gap < MIN_GAP)
 
 
 class CheckDurations(BaseEventCheck):
+    sections = frozenset({FileSection.events})
+    version = 2
+
+    async def run(self) -> Iterable[BaseResult]:
+        if self.ctx.diff is not None:
+            # just a handful of events, not worth building the whole table
+            async for result in super().run():
+                yield result
+            return
+
+        table = self.ctx.event_table
+        events = self.ctx.ass_file.events
+
+        min_duration = get_min_duration(table.char_count)
+        too_short = table.is_non_empty & (table.duration < min_duration)
+
+        next_idx = table.next_non_empty
+        has_next = table.is_non_empty & (next_idx >= 0)
+        is_karaoke = table.has_flag(EventFlag.KARAOKE)
+        gap = table.start[next_idx] - table.end
+        gap_too_short = (
+            has_next
+            & ~(is_karaoke & is_karaoke[next_idx])
+            & is_gap_too_short(gap)
+        )
+
+        for i in (too_short | gap_too_short).nonzero()[0]:
+            if too_short[i]:
+                yield Violation(
+                    f"duration shorter than {min_duration[i]} ms",
+                    [events[i]],
+                )
+            if gap_too_short[i]:
+                yield Violation(
+                    f"gap shorter than {MIN_GAP} ms ({gap[i]} ms)",
+                    [events[i], events[next_idx[i]]],
+                )
+
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
-        text = ass_to_plaintext(event.text)
+        text = get_plaintext(event.text)
         if not text or event.is_comment:
             return
 
-        if event.duration < MIN_DURATION_LONG and character_count(text) >= 8:
-            yield Violation(
-                f"duration shorter than {MIN_DURATION_LONG} ms", [event]
-            )
-
-        elif event.duration < MIN_DURATION:
+        min_duration = get_min_duration(count_plaintext_characters(text))
+        if event.duration < min_duration:
             yield Violation(
-                f"duration shorter than {MIN_DURATION} ms", [event]
+                f"duration shorter than {min_duration} ms", [event]
             )
 
         next_event = self.get_next_non_empty_event(event)
 
         if next_event and not (
-            is_event_karaoke(next_event) and is_event_karaoke(event)
+            self.ctx.event_flags.get(next_event)
+            & self.ctx.event_flags.get(event)
+            & EventFlag.KARAOKE
         ):
             gap = next_event.start - event.end
-            if 0 < gap < MIN_GAP:
+            if is_gap_too_short(gap):
                 yield Violation(
                     f"gap shorter than {MIN_GAP} ms ({gap} ms)",
                     [event, next_event],
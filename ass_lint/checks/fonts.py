@@ -1,49 +1,32 @@
 from collections import defaultdict
-from functools import cache
-from pathlib import Path
-from typing import Optional
+from typing import Any
 
 import ass_tag_parser
-import fontTools.ttLib as font_tools
+import numpy as np
 from ass_parser import AssFile
 
-from ass_lint.common import BaseCheck, Information, Violation
-
-TT_NAME_ID_FONT_FAMILY = 1
-TT_NAME_ID_FULL_NAME = 4
-TT_NAME_ID_TYPOGRAPHIC_FAMILY = 16
-TT_PLATFORM_MICROSOFT = 3
-
-
-class FontInfo:
-    def __init__(self, font_path):
-        font = font_tools.TTFont(font_path)
-
-        self.names = []
-        self.is_bold = bool(font["OS/2"].fsSelection & (1 << 5))
-        self.is_italic = bool(font["OS/2"].fsSelection & 1)
-        self.glyphs = set(
-            chr(y[0]) for x in font["cmap"].tables for y in x.cmap.items()
-        )
-
-        for record in font["name"].names:
-            if record.platformID != TT_PLATFORM_MICROSOFT:
-                continue
-
-            if record.nameID not in {
-                TT_NAME_ID_FONT_FAMILY,
-                TT_NAME_ID_FULL_NAME,
-                TT_NAME_ID_TYPOGRAPHIC_FAMILY,
-            }:
-                continue
-
-            self.names.append(record.string.decode("utf-16-be"))
+from ass_lint.common import (
+    BaseCheck,
+    CheckContext,
+    ExecutionMode,
+    FileSection,
+    Information,
+    Violation,
+)
+from ass_lint.fonts import (
+    get_codepoints,
+    get_embedded_fonts,
+    get_fonts,
+    get_fonts_fingerprint,
+    locate_font,
+)
+from ass_lint.util import DRAWING_RE, strip_drawings
 
 
 def get_used_font_styles(
     ass_file: AssFile,
-) -> dict[tuple[str, bool, bool], set[str]]:
-    results = defaultdict(set)
+) -> dict[tuple[str, bool, bool], np.ndarray]:
+    texts = defaultdict(list)
 
     styles = {style.name: style for style in ass_file.styles}
     for event in ass_file.events:
@@ -58,8 +41,11 @@ def get_used_font_styles(
         is_bold = style.bold
         is_italic = style.italic
 
+        text = event.text
+        if DRAWING_RE.search(text):
+            text = strip_drawings(text)
         try:
-            ass_line = ass_tag_parser.parse_ass(event.text)
+            ass_line = ass_tag_parser.parse_ass(text)
         except ass_tag_parser.ParseError:
             # ASS parsing errors are handled elsewhere
             continue
@@ -72,14 +58,14 @@ def get_used_font_styles(
             elif isinstance(item, ass_tag_parser.AssTagItalic):
                 is_italic = item.enabled
             elif isinstance(item, ass_tag_parser.AssTagFontName):
-                family = (
-                    item.name if item.name else styles[event.style].font_name
-                )
+                family = item.name if item.name else style.font_name
             elif isinstance(item, ass_tag_parser.AssText):
-                for glyph in item.text:
-                    results[(family, is_bold, is_italic)].add(glyph)
+                texts[(family, is_bold, is_italic)].append(item.text)
 
-    return results
+    return {
+        font_specs: get_codepoints("".join(font_texts))
+        for font_specs, font_texts in texts.items()
+    }
 
 
 def get_font_description(
@@ -95,42 +81,35 @@ def get_font_description(
     return font_family
 
 
-@cache
-def get_fonts(fonts_dir: Path) -> dict[Path, FontInfo]:
-    ret: dict[Path, FontInfo] = {}
-    for path in fonts_dir.iterdir():
-        if path.is_file():
-            try:
-                ret[path] = FontInfo(path)
-            except font_tools.TTLibError:
-                pass
-    return ret
-
-
-def locate_font(
-    fonts: dict[Path, FontInfo], family: str, is_bold: bool, is_italic: bool
-) -> Optional[Path]:
-    candidates = []
-    for font_path, font in fonts.items():
-        if family.lower() in [n.lower() for n in font.names]:
-            weight = (font.is_bold == is_bold) + (font.is_italic == is_italic)
-            candidates.append((weight, font_path, font))
-    candidates.sort(key=lambda i: -i[0])
-    if not candidates:
-        return None
-    return candidates[0]
+class CheckFonts(BaseCheck):
+    sections = frozenset(
+        {FileSection.events, FileSection.styles, FileSection.extra_sections}
+    )
+    execution_mode = ExecutionMode.process
+    version = 2
 
+    @classmethod
+    def get_external_inputs(cls, ctx: CheckContext) -> list[Any]:
+        return [get_fonts_fingerprint(ctx.get_fonts_dirs())]
 
-class CheckFonts(BaseCheck):
     async def run(self) -> None:
         results = ["Fonts summary:"]
 
         font_styles = get_used_font_styles(self.ctx.ass_file)
-        fonts = get_fonts(self.ctx.fonts_dir)
-        for font_specs, glyphs in font_styles.items():
+        # like libass, prefer the embedded fonts
+        fonts = {
+            **get_embedded_fonts(
+                self.ctx.ass_file,
+                self.ctx.open_cache("embedded_fonts"),
+                self.ctx.font_attachments,
+            ),
+            **get_fonts(tuple(self.ctx.get_fonts_dirs())),
+        }
+        for font_specs, codepoints in font_styles.items():
             font_family, is_bold, is_italic = font_specs
             results.append(
-                f"– {get_font_description(*font_specs)}, {len(glyphs)} glyphs"
+                f"– {get_font_description(*font_specs)}, "
+                f"{len(codepoints)} glyphs"
             )
 
             result = locate_font(fonts, font_family, is_bold, is_italic)
@@ -141,15 +120,11 @@ class CheckFonts(BaseCheck):
                 continue
 
             _weight, _font_path, font = result
-            missing_glyphs = set()
-            for glyph in glyphs:
-                if glyph not in font.glyphs:
-                    missing_glyphs.add(glyph)
-
-            if missing_glyphs:
+            missing_codepoints = font.get_missing_codepoints(codepoints)
+            if len(missing_codepoints):
                 yield Violation(
                     f"{get_font_description(*font_specs)}: missing glyphs ("
-                    f'{"".join(missing_glyphs)}'
+                    f'{"".join(map(chr, missing_codepoints))}'
                 )
 
         yield Information("\n".join(results))
@@ -1,47 +1,85 @@
-import asyncio
 from collections.abc import Iterable
-from functools import cache
 from typing import Any, Optional
 
 from ass_parser import AssEvent
-from ass_renderer import AssRenderer
-from ass_tag_parser import ass_to_plaintext
 
-from ass_lint.common import BaseEventCheck, BaseResult, CheckContext, Violation
-from ass_lint.util import is_event_karaoke
+from ass_lint.cache import DiskCache
+from ass_lint.common import (
+    MAX_TEXT_LENGTH,
+    BaseEventCheck,
+    BaseResult,
+    CheckContext,
+    FileSection,
+    Violation,
+)
+from ass_lint.event_flags import EventFlag
+from ass_lint.grammar import (
+    GingerBackend,
+    GrammarBackend,
+    GrammarBackendError,
+    LanguageToolBackend,
+    check_texts,
+)
+from ass_lint.util import get_plaintext
 
-try:
-    from gingerit.gingerit import GingerIt
 
-    parser = GingerIt()  # pylint: disable=invalid-name
-except ImportError:
-    parser = None
-
-
-@cache
-def parse(text) -> Optional[dict[str, Any]]:
-    if not parser:
-        return None
-    return parser.parse(text)
+def create_backend(context: CheckContext) -> GrammarBackend:
+    if context.grammar_server:
+        return LanguageToolBackend(context.grammar_server)
+    return GingerBackend()
 
 
 class CheckGrammar(BaseEventCheck):
+    sections = frozenset({FileSection.events, FileSection.script_info})
+    text_only = True
+    max_text_length = MAX_TEXT_LENGTH
+    expensive = True
+    version = 2
+
     def __init__(self, context: CheckContext) -> None:
         super().__init__(context)
-        if not parser:
-            raise RuntimeError(
-                "grammar checker is not available, install gingerit package"
-            )
+        try:
+            self.backend = create_backend(context)
+        except GrammarBackendError as ex:
+            raise RuntimeError(str(ex)) from ex
+        self.cache: Optional[DiskCache] = context.open_cache("grammar")
+        # enough lines to keep all the backend's requests busy
+        self.event_batch_size = (
+            self.backend.batch_size * self.backend.max_in_flight
+        )
 
-    async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
-        text = ass_to_plaintext(event.text).replace("\n", " ")
-        if not text or event.is_comment or is_event_karaoke(event):
-            return
-        if not self.ctx.language.lower().startswith("en"):
+    @classmethod
+    def get_external_inputs(cls, ctx: CheckContext) -> list[Any]:
+        return [ctx.grammar_server, ctx.language]
+
+    def get_text(self, event: AssEvent) -> Optional[str]:
+        text = get_plaintext(event.text).replace("\n", " ")
+        if not text or self.ctx.event_flags.get(event) & (
+            EventFlag.COMMENT | EventFlag.KARAOKE
+        ):
+            return None
+        return text
+
+    async def run_for_event_batch(
+        self, events: list[AssEvent]
+    ) -> Iterable[BaseResult]:
+        if not self.backend.supports(self.ctx.language):
             return
 
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, parse, text
+        items = [
+            (event, text) for event in events if (text := self.get_text(event))
+        ]
+        suggestions = await check_texts(
+            self.backend,
+            [text for _event, text in items],
+            self.ctx.language,
+            self.cache,
         )
-        if result and result["result"].lower() != text.lower():
-            yield Violation(f'suggested change: {result["result"]}', [event])
+        for event, text in items:
+            suggestion = suggestions.get(text)
+            if suggestion and suggestion.lower() != text.lower():
+                yield Violation(f"suggested change: {suggestion}", [event])
+
+    async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
+        async for result in self.run_for_event_batch([event]):
+            yield result
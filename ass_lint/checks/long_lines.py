@@ -1,44 +1,61 @@
 from collections.abc import Iterable
+from typing import Any
 
 from ass_parser import AssEvent
-from ass_renderer import AssRenderer
 
-from ass_lint.common import BaseEventCheck, BaseResult, CheckContext, Violation
+from ass_lint.common import (
+    BaseEventCheck,
+    BaseResult,
+    CheckContext,
+    ExecutionMode,
+    Resource,
+    Violation,
+)
+from ass_lint.event_flags import EventFlag
 from ass_lint.util import (
     WIDTH_MULTIPLIERS,
     get_optimal_line_heights,
+    get_rendering_inputs,
     get_video_aspect_ratio,
     get_video_width,
-    is_event_karaoke,
-    measure_frame_size,
 )
 
 
 class CheckLongLines(BaseEventCheck):
+    resources = frozenset({Resource.renderer})
+    execution_mode = ExecutionMode.thread
+    expensive = True
+    version = 2
+
     def __init__(self, context: CheckContext) -> None:
         super().__init__(context)
+        self.event_concurrency = context.render_workers
         self.optimal_line_heights = get_optimal_line_heights(
             ass_file=context.ass_file,
             video_resolution=context.video_resolution,
+            cache=context.open_cache("line_heights"),
         )
         self.width_multipliers: dict[int, float] = {}
         aspect_ratio = get_video_aspect_ratio(context.ass_file)
         if aspect_ratio:
             self.width_multipliers = WIDTH_MULTIPLIERS[aspect_ratio]
 
+    @classmethod
+    def get_external_inputs(cls, ctx: CheckContext) -> list[Any]:
+        return get_rendering_inputs(ctx.get_fonts_dirs())
+
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
         if not self.width_multipliers:
             # AR information unavailable, covered by a separate check
             return
 
-        if is_event_karaoke(event):
+        if self.ctx.event_flags.get(event) & EventFlag.KARAOKE:
             return
 
-        width, height = measure_frame_size(
-            renderer=self.ctx.renderer,
-            video_resolution=self.ctx.video_resolution,
-            event=event,
-        )
+        if self.is_clearly_short(event):
+            return
+
+        width, height = await self.ctx.renderer_pool.measure_frame_size(event)
         average_height = self.optimal_line_heights.get(event.style_name, 0)
         line_count = round(height / average_height) if average_height else 0
         if not line_count:
@@ -61,3 +78,17 @@ class CheckLongLines(BaseEventCheck):
                     f"({width - optimal_width:.02f} beyond {optimal_width:.02f})",
                     [event],
                 )
+
+    def is_clearly_short(self, event: AssEvent) -> bool:
+        estimator = self.ctx.text_width
+        if not estimator:
+            return False
+        width_multiplier = self.width_multipliers.get(
+            event.text.count("\\N") + 1
+        )
+        if not width_multiplier:
+            return False
+        return estimator.is_clearly_below(
+            estimator.estimate_frame_width(event),
+            get_video_width(self.ctx.ass_file) * width_multiplier,
+        )
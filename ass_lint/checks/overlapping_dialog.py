@@ -0,0 +1,34 @@
+from collections.abc import Iterable
+
+from ass_parser import AssEvent
+
+from ass_lint.common import BaseEventCheck, BaseResult, FileSection, Violation
+from ass_lint.event_flags import EventFlag
+
+
+class CheckOverlappingDialog(BaseEventCheck):
+    sections = frozenset({FileSection.events})
+    # needs the events that come later in the file
+    streamable = False
+
+    def is_event_spoken(self, event: AssEvent) -> bool:
+        return (
+            self.ctx.event_flags.get(event)
+            & (EventFlag.DIALOG | EventFlag.COMMENT | EventFlag.EMPTY)
+            == EventFlag.DIALOG
+        )
+
+    async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
+        if not self.is_event_spoken(event):
+            return
+
+        for other in self.ctx.event_index.get_overlapping(
+            event.start, event.end
+        ):
+            # report each pair once
+            if other.index <= event.index or not self.is_event_spoken(other):
+                continue
+            overlap = min(event.end, other.end) - max(event.start, other.start)
+            yield Violation(
+                f"overlapping dialog ({overlap} ms)", [event, other]
+            )
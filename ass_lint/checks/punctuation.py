@@ -2,36 +2,48 @@ import re
 from collections.abc import Iterable
 
 from ass_parser import AssEvent
-from ass_tag_parser import ass_to_plaintext
 
-from ass_lint.common import BaseEventCheck, BaseResult, Violation
+from ass_lint import guarded_re
+from ass_lint.common import (
+    MAX_TEXT_LENGTH,
+    BaseEventCheck,
+    BaseResult,
+    FileSection,
+    Violation,
+)
+from ass_lint.event_flags import EventFlag
 from ass_lint.util import (
     NON_STUTTER_PREFIXES,
     NON_STUTTER_SUFFIXES,
     NON_STUTTER_WORDS,
     WORDS_WITH_PERIOD,
-    is_event_title,
+    get_plaintext,
 )
 
 
 class CheckPunctuation(BaseEventCheck):
+    sections = frozenset({FileSection.events, FileSection.script_info})
+    text_only = True
+    max_text_length = MAX_TEXT_LENGTH
+    version = 3
+
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
-        text = ass_to_plaintext(event.text)
+        text = get_plaintext(event.text)
 
         if text.startswith("\n") or text.endswith("\n"):
             yield Violation("extra line break", [event])
-        elif re.search(r"^\s|\s$", text):
+        elif guarded_re.search(r"^\s|\s$", text):
             yield Violation("extra whitespace", [event])
 
         if text.count("\n") >= 2:
             yield Violation("three or more lines", [event])
 
-        if re.search(r"\n[ \t]|[ \t]\n", text):
+        if guarded_re.search(r"\n[ \t]|[ \t]\n", text):
             yield Violation("whitespace around line break", [event])
 
-        if re.search(r"\n[.,?!:;…]", text):
+        if guarded_re.search(r"\n[.,?!:;…]", text):
             yield Violation("line break before punctuation", [event])
-        elif re.search(r"\s[.,?!:;…]", text):
+        elif guarded_re.search(r"\s[.,?!:;…]", text):
             yield Violation("whitespace before punctuation", [event])
 
         if "  " in text:
@@ -39,16 +51,18 @@ class CheckPunctuation(BaseEventCheck):
 
         if "..." in text:
             yield Violation("bad ellipsis (expected …)", [event])
-        elif re.search("[…,.!?:;][,.]", text):
+        elif guarded_re.search("[…,.!?:;][,.]", text):
             yield Violation("extra comma or dot", [event])
-        elif re.search(r"!!|\?\?", text):
+        elif guarded_re.search(r"!!|\?\?", text):
             yield Violation("double punctuation mark", [event])
-        elif re.search(r"…[!?]|[!?]…", text):
+        elif guarded_re.search(r"…[!?]|[!?]…", text):
             yield Violation("ellipsis around punctuation mark", [event])
-        elif re.search(r"[!?\.] …", text):
+        elif guarded_re.search(r"[!?\.] …", text):
             yield Violation("ellipsis in the middle of sentence", [event])
 
-        context = re.split(r"\W+", re.sub('[.,?!"]', "", text.lower()))
+        context = guarded_re.split(
+            r"\W+", guarded_re.sub('[.,?!"]', "", text.lower())
+        )
         if self.ctx.language.lower().startswith("en"):
             for word in [
                 "im",
@@ -83,33 +97,38 @@ class CheckPunctuation(BaseEventCheck):
         if "’" in text:
             yield Violation("bad apostrophe", [event])
 
-        if re.search("^– .* –$", text, flags=re.M):
+        if guarded_re.search("^– .* –$", text, flags=re.M):
             yield Violation("bad dash (expected —)", [event])
-        elif not re.search("^—.*—$", text, flags=re.M):
-            if len(re.findall(r"^–|[\.…!?] –", text, flags=re.M)) == 1:
+        elif not guarded_re.search("^—.*—$", text, flags=re.M):
+            if len(guarded_re.findall(r"^–|[\.…!?] –", text, flags=re.M)) == 1:
                 yield Violation("dialog with just one person", [event])
 
-            if re.search(r"[-–]$", text, flags=re.M):
+            if guarded_re.search(r"[-–]$", text, flags=re.M):
                 yield Violation("bad dash (expected —)", [event])
 
-            if re.search(r"^- |^—", text, flags=re.M):
+            if guarded_re.search(r"^- |^—", text, flags=re.M):
                 yield Violation("bad dash (expected –)", [event])
 
-            if re.search(r" - ", text, flags=re.M):
+            if guarded_re.search(r" - ", text, flags=re.M):
                 yield Violation("bad dash (expected –)", [event])
 
-        if re.search(r"\s+'(t|re|s)\b", text):
+        if guarded_re.search(r"\s+'(t|re|s)\b", text):
             yield Violation("whitespace before apostrophe", [event])
 
-        if re.search(r" —|— (?![A-Z])", text) and not is_event_title(event):
+        if (
+            guarded_re.search(r" —|— (?![A-Z])", text)
+            and not self.ctx.event_flags.get(event) & EventFlag.TITLE
+        ):
             yield Violation("whitespace around —", [event])
 
-        match = re.search(r"(\w+[\.!?])\s+[a-z]", text, flags=re.M)
+        match = guarded_re.search(r"(\w+[\.!?])\s+[a-z]", text, flags=re.M)
         if match:
             if match.group(1) not in WORDS_WITH_PERIOD:
                 yield Violation("lowercase letter after sentence end", [event])
 
-        match = re.search(r"^([A-Z][a-z]{,3})(-([a-z]+))+", text, flags=re.M)
+        match = guarded_re.search(
+            r"^([A-Z][a-z]{,3})(-([a-z]+))+", text, flags=re.M
+        )
         if match:
             if (
                 match.group(0).lower() not in NON_STUTTER_WORDS
@@ -120,12 +139,12 @@ class CheckPunctuation(BaseEventCheck):
                     "possibly wrong stutter capitalization", [event]
                 )
 
-        if re.search(r"[\.,?!:;][A-Za-z]|[a-zA-Z]…[A-Za-z]", text):
+        if guarded_re.search(r"[\.,?!:;][A-Za-z]|[a-zA-Z]…[A-Za-z]", text):
             yield Violation(
                 "missing whitespace after punctuation mark", [event]
             )
 
-        if re.search(
+        if guarded_re.search(
             "\\s|\N{ZERO WIDTH SPACE}", text.replace(" ", "").replace("\n", "")
         ):
             yield Violation("unrecognized whitespace", [event])
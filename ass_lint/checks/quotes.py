@@ -2,20 +2,28 @@ import re
 from collections.abc import Iterable
 
 from ass_parser import AssEvent
-from ass_tag_parser import ass_to_plaintext
 
+from ass_lint import guarded_re
 from ass_lint.common import (
+    MAX_TEXT_LENGTH,
     BaseEventCheck,
     BaseResult,
     DebugInformation,
+    FileSection,
     Information,
     Violation,
 )
+from ass_lint.util import get_plaintext
 
 
 class CheckQuotes(BaseEventCheck):
+    sections = frozenset({FileSection.events})
+    text_only = True
+    max_text_length = MAX_TEXT_LENGTH
+    version = 3
+
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
-        text = ass_to_plaintext(event.text)
+        text = get_plaintext(event.text)
 
         if text.count('"'):
             yield Information("plain quotation mark", [event])
@@ -26,17 +34,17 @@ class CheckQuotes(BaseEventCheck):
             yield Information("partial quote", [event])
             return
 
-        if re.search(r'[:,]["”]', text):
+        if guarded_re.search(r'[:,]["”]', text):
             yield Violation("punctuation inside quotation marks", [event])
 
-        if re.search(r'["”][\.,…?!]', text, flags=re.M):
+        if guarded_re.search(r'["”][\.,…?!]', text, flags=re.M):
             yield DebugInformation(
                 "punctuation outside quotation marks", [event]
             )
 
-        if re.search(r'[a-z]\s[„“"].+[\.…?!]["”]', text, flags=re.M):
+        if guarded_re.search(r'[a-z]\s[„“"].+[\.…?!]["”]', text, flags=re.M):
             yield Violation("punctuation inside quotation marks", [event])
-        elif re.search(r'[„“"].+[\.…?!]["”]', text, flags=re.M):
+        elif guarded_re.search(r'[„“"].+[\.…?!]["”]', text, flags=re.M):
             yield DebugInformation(
                 "punctuation inside quotation marks", [event]
             )
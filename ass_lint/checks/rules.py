@@ -0,0 +1,67 @@
+from collections.abc import Iterable
+from typing import Any
+
+from ass_parser import AssEvent
+
+from ass_lint.cache import make_cache_key
+from ass_lint.common import (
+    MAX_TEXT_LENGTH,
+    BaseEventCheck,
+    BaseResult,
+    CheckContext,
+    DebugInformation,
+    FileSection,
+    Information,
+    Violation,
+)
+from ass_lint.event_flags import EventFlag
+from ass_lint.rules import RuleMatcher, load_rule_pack
+from ass_lint.util import get_plaintext
+
+LEVEL_RESULTS = {
+    "warning": Violation,
+    "info": Information,
+    "debug": DebugInformation,
+}
+
+
+class CheckRules(BaseEventCheck):
+    """Runs the rules of the rule packs listed in the project
+    configuration.
+    """
+
+    sections = frozenset({FileSection.events, FileSection.script_info})
+    text_only = True
+    max_text_length = MAX_TEXT_LENGTH
+    version = 3
+
+    @classmethod
+    def get_external_inputs(cls, ctx: CheckContext) -> list[Any]:
+        return [
+            make_cache_key(path.read_bytes()) if path.is_file() else None
+            for path in ctx.config.rule_packs
+        ]
+
+    def __init__(self, context: CheckContext) -> None:
+        super().__init__(context)
+        self.matcher = RuleMatcher(
+            rule
+            for path in self.ctx.config.rule_packs
+            for rule in load_rule_pack(path)
+            if rule.applies_to_language(self.ctx.language)
+        )
+
+    async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
+        if not self.matcher:
+            return
+
+        flags = self.ctx.event_flags.get(event)
+        if flags & (EventFlag.COMMENT | EventFlag.EMPTY):
+            return
+
+        for rule, matched_text in self.matcher.find_matches(
+            get_plaintext(event.text), flags
+        ):
+            yield LEVEL_RESULTS[rule.level](
+                f"{rule.message} ({matched_text})", [event]
+            )
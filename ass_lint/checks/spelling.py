@@ -2,12 +2,22 @@ import logging
 from collections import defaultdict
 from collections.abc import Iterable
 from functools import cache
+from pathlib import Path
+from typing import Any, Optional
 
 import ass_tag_parser
 import regex
 
-from ass_lint.common import BaseCheck, Violation
-from ass_lint.util import is_event_karaoke, suppress_stderr
+from ass_lint.cache import make_cache_key
+from ass_lint.common import (
+    BaseCheck,
+    CheckContext,
+    ExecutionMode,
+    FileSection,
+    Violation,
+)
+from ass_lint.event_flags import EventFlag
+from ass_lint.util import get_plaintext, suppress_stderr
 
 try:
     with suppress_stderr():
@@ -53,7 +63,7 @@ class SpellChecker:
         self.blacklist = blacklist
 
         if not enchant:
-            raise SpellCheckError("Enchant not installed")
+            raise SpellCheckerError("Enchant not installed")
 
         try:
             self._dict = enchant.Dict(language)
@@ -117,38 +127,62 @@ def spell_check_ass_line(
             yield (start, end, word)
 
 
+def get_dictionary_path(ctx: CheckContext) -> Optional[Path]:
+    lang = ctx.language
+    lang_short = regex.sub("[-_].*", "", lang)
+
+    dict_names = [
+        f"dict-{lang}.txt",
+        f"dict-{lang_short}.txt",
+        f"{lang}-dict.txt",
+        f"{lang_short}-dict.txt",
+        "dict.txt",
+    ]
+
+    for dict_name in dict_names:
+        dict_path = ctx.subs_path.with_name(dict_name)
+        if dict_path.exists():
+            return dict_path
+    return None
+
+
 class CheckSpelling(BaseCheck):
+    sections = frozenset({FileSection.events, FileSection.script_info})
+    execution_mode = ExecutionMode.thread
+    version = 2
+
+    @classmethod
+    def get_external_inputs(cls, ctx: CheckContext) -> list[Any]:
+        dict_path = get_dictionary_path(ctx)
+        return [
+            ctx.language,
+            make_cache_key(dict_path.read_bytes()) if dict_path else None,
+        ]
+
     async def run(self) -> None:
         whitelist = WordList()
         blacklist = WordList()
         lang = self.ctx.language
-        lang_short = regex.sub("[-_].*", "", lang)
-
-        dict_names = [
-            f"dict-{lang}.txt",
-            f"dict-{lang_short}.txt",
-            f"{lang}-dict.txt",
-            f"{lang_short}-dict.txt",
-            "dict.txt",
-        ]
 
-        for dict_name in dict_names:
-            dict_path = self.ctx.subs_path.with_name(dict_name)
-            if dict_path.exists():
-                for line in dict_path.read_text().splitlines():
-                    if line.startswith("!"):
-                        blacklist.add_word(line[1:])
-                    else:
-                        whitelist.add_word(line)
-                break
+        dict_path = get_dictionary_path(self.ctx)
+        if dict_path:
+            for line in dict_path.read_text().splitlines():
+                if line.startswith("!"):
+                    blacklist.add_word(line[1:])
+                else:
+                    whitelist.add_word(line)
 
         spell_checker = SpellChecker(lang, whitelist, blacklist)
 
         misspelling_map = defaultdict(set)
         for event in self.ctx.ass_file.events:
-            if is_event_karaoke(event):
+            # report the words found so far
+            if self.is_out_of_time():
+                break
+            self.checked_event_count += 1
+            if self.ctx.event_flags.get(event) & EventFlag.KARAOKE:
                 continue
-            text = ass_tag_parser.ass_to_plaintext(event.text)
+            text = get_plaintext(event.text)
             for _start, _end, word in spell_check_ass_line(
                 spell_checker, text
             ):
@@ -1,19 +1,15 @@
-from collections import defaultdict
-
-from ass_lint.common import BaseCheck, Information
+from ass_lint.common import BaseCheck, FileSection, Information
 
 
 class CheckStyleStats(BaseCheck):
+    sections = frozenset({FileSection.events})
+
     async def run(self) -> None:
         results = ["Styles summary:"]
-        styles = defaultdict(int)
-
-        for event in self.ctx.ass_file.events:
-            styles[event.style_name] += 1
 
         for style, occurrences in sorted(
-            styles.items(), key=lambda kv: -kv[1]
+            self.ctx.stats.styles.items(), key=lambda kv: -kv[1]
         ):
-            results.append(f"– {occurrences} time(s): {style}")
+            results.append(f"– {occurrences} time(s): {style}")
 
         yield Information("\n".join(results))
@@ -2,10 +2,12 @@ from collections.abc import Iterable
 
 from ass_parser import AssEvent
 
-from ass_lint.common import BaseEventCheck, BaseResult, Violation
+from ass_lint.common import BaseEventCheck, BaseResult, FileSection, Violation
 
 
 class CheckStyleValidity(BaseEventCheck):
+    sections = frozenset({FileSection.events, FileSection.styles})
+
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
         if (
             event.style_name.startswith("[")
@@ -1,11 +1,20 @@
 from collections.abc import Iterable
-from typing import Optional
+from typing import Any, Optional
 
 import numpy as np
 from ass_parser import AssEvent
 
-from ass_lint.common import BaseEventCheck, BaseResult, Violation
-from ass_lint.util import is_event_karaoke
+from ass_lint.cache import get_file_identity
+from ass_lint.common import (
+    BaseEventCheck,
+    BaseResult,
+    CheckContext,
+    ExecutionMode,
+    FileSection,
+    Resource,
+    Violation,
+)
+from ass_lint.event_flags import EventFlag
 
 
 def format_delta(delta: int) -> str:
@@ -20,6 +29,11 @@ class CheckTimes(BaseEventCheck):
     in the video changes from one scene to another.
     """
 
+    sections = frozenset({FileSection.events, FileSection.script_info})
+    resources = frozenset({Resource.video})
+    execution_mode = ExecutionMode.thread
+    expensive = True
+
     WIDTH = 4
     HEIGHT = 3
     MAX_DISTANCE = 2
@@ -27,11 +41,18 @@ class CheckTimes(BaseEventCheck):
     FRAME_CACHE: dict[tuple[str, int], float] = {}
     SNAP_CACHE: dict[tuple[str, int], bool] = {}
 
+    @classmethod
+    def get_external_inputs(cls, ctx: CheckContext) -> list[Any]:
+        video_path = ctx.get_video_path()
+        return [get_file_identity(video_path) if video_path else None]
+
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
         if not self.ctx.video:
             return
 
-        if event.is_comment or is_event_karaoke(event):
+        if self.ctx.event_flags.get(event) & (
+            EventFlag.COMMENT | EventFlag.KARAOKE
+        ):
             return
 
         delta = await self.get_best_pivot(event.start)
@@ -1,29 +1,36 @@
 import re
 from collections.abc import Iterable
 from copy import copy
+from typing import Any, Optional
 
 from ass_parser import AssEvent
-from ass_renderer import AssRenderer
 
 from ass_lint.common import (
     BaseEventCheck,
     BaseResult,
     CheckContext,
+    ExecutionMode,
     Information,
+    Resource,
 )
+from ass_lint.event_flags import EventFlag
 from ass_lint.util import (
     WIDTH_MULTIPLIERS,
+    get_rendering_inputs,
     get_video_aspect_ratio,
     get_video_width,
-    is_event_karaoke,
-    is_event_title,
-    measure_frame_size,
 )
 
 
 class CheckUnnecessaryBreaks(BaseEventCheck):
+    resources = frozenset({Resource.renderer})
+    execution_mode = ExecutionMode.thread
+    expensive = True
+    version = 2
+
     def __init__(self, context: CheckContext) -> None:
         super().__init__(context)
+        self.event_concurrency = context.render_workers
         self.optimal_width: Optional[float] = None
         aspect_ratio = get_video_aspect_ratio(context.ass_file)
         if aspect_ratio:
@@ -32,6 +39,10 @@ class CheckUnnecessaryBreaks(BaseEventCheck):
                 * WIDTH_MULTIPLIERS[aspect_ratio][1]
             )
 
+    @classmethod
+    def get_external_inputs(cls, ctx: CheckContext) -> list[Any]:
+        return get_rendering_inputs(ctx.get_fonts_dirs())
+
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
         if self.optimal_width is None:
             # AR information unavailable, covered by a separate check
@@ -40,7 +51,9 @@ class CheckUnnecessaryBreaks(BaseEventCheck):
         if r"\N" not in event.text:
             return
 
-        if is_event_title(event) or is_event_karaoke(event):
+        if self.ctx.event_flags.get(event) & (
+            EventFlag.TITLE | EventFlag.KARAOKE
+        ):
             return
 
         event_copy = copy(event)
@@ -52,10 +65,14 @@ class CheckUnnecessaryBreaks(BaseEventCheck):
         if many_sentences:
             return
 
-        width, _height = measure_frame_size(
-            renderer=self.ctx.renderer,
-            video_resolution=self.ctx.video_resolution,
-            event=event_copy,
+        estimator = self.ctx.text_width
+        if estimator and estimator.is_clearly_above(
+            estimator.estimate_frame_width(event_copy), self.optimal_width
+        ):
+            return
+
+        width, _height = await self.ctx.renderer_pool.measure_frame_size(
+            event_copy
         )
 
         if width < self.optimal_width:
@@ -1,4 +1,4 @@
-from ass_lint.common import BaseCheck, Violation
+from ass_lint.common import BaseCheck, FileSection, Violation
 from ass_lint.util import (
     get_video_aspect_ratio,
     get_video_height,
@@ -7,6 +7,8 @@ from ass_lint.util import (
 
 
 class CheckVideoResolution(BaseCheck):
+    sections = frozenset({FileSection.script_info})
+
     async def run(self) -> None:
         width = get_video_width(self.ctx.ass_file)
         height = get_video_height(self.ctx.ass_file)
@@ -1,26 +1,261 @@
+import asyncio
+import collections
+import enum
+import itertools
 import logging
-from collections.abc import Iterable
-from dataclasses import dataclass
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 from ass_parser import AssEvent, AssFile
-from ass_renderer import AssRenderer
-from ass_tag_parser import ass_to_plaintext
 
-from ass_lint.video import VideoSource
+from ass_lint.cache import DiskCache, get_cache_dir
+from ass_lint.config import Config
+from ass_lint.event_flags import DRAWING_ONLY
+from ass_lint.guarded_re import PatternTimeout, shared_budget
+from ass_lint.matroska import is_matroska_path
+from ass_lint.reader import read_ass
+from ass_lint.util import (
+    DEFAULT_WIDTH_MARGIN,
+    get_plaintext,
+    get_video_height,
+    get_video_width,
+)
+
+if TYPE_CHECKING:
+    from ass_lint.diff import FileDiff
+    from ass_lint.event_flags import EventClassifier
+    from ass_lint.event_table import EventTable
+    from ass_lint.intervals import IntervalIndex
+    from ass_lint.matroska import MatroskaAttachment
+    from ass_lint.profiler import CheckProfile
+    from ass_lint.renderer_pool import RendererPool
+    from ass_lint.sampling import EventSample
+    from ass_lint.stats import FileStats
+    from ass_lint.text_width import TextWidthEstimator
+    from ass_lint.video import VideoSource
+
+
+DEFAULT_FONTS_DIRS = [Path("fonts"), Path("~/.config/ass-lint/fonts")]
+# plain text length beyond which the text checks skip an event; no real line
+# gets anywhere near it, while the patterns might take ages on such events
+MAX_TEXT_LENGTH = 1000
+
+
+class Resource(enum.Enum):
+    renderer = "renderer"
+    video = "video"
+
+
+class FileSection(enum.Enum):
+    script_info = "script_info"
+    styles = "styles"
+    events = "events"
+    extra_sections = "extra_sections"
+
+
+class ExecutionMode(enum.Enum):
+    event_loop = "event_loop"
+    thread = "thread"
+    process = "process"
+
+
+class LazyResource:
+    """Context attribute that is created on its first access.
+
+    Creation is guarded with a lock, so that checks running in separate
+    threads end up sharing a single instance.
+    """
+
+    def __init__(self, factory: Callable[["CheckContext"], Any]) -> None:
+        self.factory = factory
+        self.name = ""
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        with self._lock:
+            if self.name not in instance.__dict__:
+                logging.debug(f"creating {self.name}")
+                instance.__dict__[self.name] = self.factory(instance)
+        return instance.__dict__[self.name]
+
+
+def create_renderer_pool(ctx: "CheckContext") -> "RendererPool":
+    from ass_lint.renderer_pool import RendererPool
+
+    return RendererPool(
+        ass_file=ctx.ass_file,
+        video_resolution=ctx.video_resolution,
+        workers=ctx.render_workers,
+    )
+
+
+def create_text_width(ctx: "CheckContext") -> Optional["TextWidthEstimator"]:
+    from ass_lint.fonts import get_fonts
+    from ass_lint.text_width import TextWidthEstimator
+
+    fonts = get_fonts(tuple(ctx.get_fonts_dirs()))
+    if not fonts:
+        return None
+    return TextWidthEstimator(
+        ass_file=ctx.ass_file,
+        video_resolution=ctx.video_resolution,
+        fonts=fonts,
+        margin=ctx.width_margin,
+    )
+
+
+def create_video(ctx: "CheckContext") -> Optional["VideoSource"]:
+    from ass_lint.video import VideoError, VideoSource
+
+    video_path = ctx.get_video_path()
+    if not video_path:
+        return None
+    try:
+        return VideoSource(video_path)
+    except VideoError as ex:
+        logging.warning(ex)
+        return None
+
+
+def create_event_index(ctx: "CheckContext") -> "IntervalIndex[AssEvent]":
+    from ass_lint.intervals import make_event_index
+
+    return make_event_index(ctx.ass_file.events)
+
+
+def create_event_flags(ctx: "CheckContext") -> "EventClassifier":
+    from ass_lint.event_flags import EventClassifier
+
+    return EventClassifier(ctx.ass_file.events, ctx.config.actor_names)
+
+
+def create_event_table(ctx: "CheckContext") -> "EventTable":
+    from ass_lint.event_table import EventTable
+
+    return EventTable.from_events(
+        ctx.ass_file.events, ctx.event_flags.get_all()
+    )
+
+
+def create_stats(ctx: "CheckContext") -> "FileStats":
+    from ass_lint.stats import collect_stats
+
+    return collect_stats(ctx.ass_file.events, ctx.event_flags)
+
+
+def create_event_sample(ctx: "CheckContext") -> "EventSample":
+    from ass_lint.sampling import sample_events
+
+    return sample_events(
+        ctx.ass_file.events,
+        ctx.event_flags,
+        ctx.sample_fraction,
+        ctx.sample_seed,
+    )
+
+
+def create_font_attachments(
+    ctx: "CheckContext",
+) -> list["MatroskaAttachment"]:
+    from ass_lint.matroska import MatroskaError, read_matroska_attachments
+
+    if not is_matroska_path(ctx.subs_path):
+        return []
+    try:
+        attachments = read_matroska_attachments(ctx.subs_path)
+    except MatroskaError as ex:
+        logging.warning(ex)
+        return []
+    return [attachment for attachment in attachments if attachment.is_font]
 
 
 @dataclass
 class CheckContext:
     subs_path: Path
     ass_file: AssFile
-    renderer: AssRenderer
     video_resolution: tuple[int, int]
-    video: Optional[VideoSource]
+
+    renderer_pool = LazyResource(create_renderer_pool)
+    video = LazyResource(create_video)
+    text_width = LazyResource(create_text_width)
+    event_flags = LazyResource(create_event_flags)
+    # events on screen, indexed by time
+    event_index = LazyResource(create_event_index)
+    event_table = LazyResource(create_event_table)
+    stats = LazyResource(create_stats)
+    # events the expensive checks run for in the sampling mode
+    event_sample = LazyResource(create_event_sample)
+    # fonts attached to the Matroska container the subtitles come from
+    font_attachments = LazyResource(create_font_attachments)
 
     default_language: str = "en_US"
-    fonts_dir = Path("~/.config/ass-lint/fonts").expanduser()
+    grammar_server: Optional[str] = None
+    width_margin: float = DEFAULT_WIDTH_MARGIN
+    render_workers: int = 1
+    cache_dir: Optional[Path] = field(default_factory=get_cache_dir)
+    config: Config = field(default_factory=Config)
+    # relative directories are resolved against the subtitles' directory
+    fonts_dirs: list[Path] = field(
+        default_factory=lambda: list(DEFAULT_FONTS_DIRS)
+    )
+    # differences from the reference version in the diff mode
+    diff: Optional["FileDiff"] = None
+    # portion of the events the expensive checks run for, all if None
+    sample_fraction: Optional[float] = None
+    sample_seed: int = 0
+    # persistent caches the checks opened, closed along with the context
+    disk_caches: dict[str, DiskCache] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    disk_caches_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def get_fonts_dirs(self) -> list[Path]:
+        return [
+            self.subs_path.parent / fonts_dir.expanduser()
+            for fonts_dir in self.fonts_dirs
+        ]
+
+    def get_video_path(self) -> Optional[Path]:
+        if is_matroska_path(self.subs_path):
+            return self.subs_path
+        if video_path := self.ass_file.script_info.get("Video File"):
+            return self.subs_path.parent / video_path
+        return None
+
+    def open_cache(self, name: str) -> Optional[DiskCache]:
+        """Open a persistent cache shared by the checks of this context.
+
+        :param name: name of the cache
+        :return: the cache, or None if caching is disabled
+        """
+        if not self.cache_dir:
+            return None
+        with self.disk_caches_lock:
+            if name not in self.disk_caches:
+                self.disk_caches[name] = DiskCache(name, self.cache_dir)
+            return self.disk_caches[name]
+
+    def close(self) -> None:
+        """Release the resources created during the run."""
+        if renderer_pool := self.__dict__.get("renderer_pool"):
+            renderer_pool.close()
+        with self.disk_caches_lock:
+            for cache in self.disk_caches.values():
+                cache.close()
+            self.disk_caches.clear()
 
     @property
     def language(self) -> str:
@@ -29,6 +264,23 @@ class CheckContext:
         )
 
 
+def make_context(
+    path: Path, ass_file: Optional[AssFile] = None, **kwargs: Any
+) -> CheckContext:
+    if ass_file is None:
+        ass_file = read_ass(path)
+
+    return CheckContext(
+        subs_path=path,
+        ass_file=ass_file,
+        video_resolution=(
+            get_video_width(ass_file),
+            get_video_height(ass_file),
+        ),
+        **kwargs,
+    )
+
+
 class LogLevel:
     debug = 1
     info = 2
@@ -61,43 +313,310 @@ class Violation(BaseResult):
     log_level = LogLevel.warning
 
 
+class TimedOut(BaseResult):
+    """Marks a check that ran out of its time budget, its other results
+    covering only part of the file.
+    """
+
+    log_level = LogLevel.warning
+
+
+class Skipped(BaseResult):
+    """Marks an event a check refused to look at."""
+
+    log_level = LogLevel.info
+
+
 class BaseCheck:
+    # expensive context resources the check will access
+    resources: frozenset[Resource] = frozenset()
+    # where the scheduler should run the check: the event loop suits cheap
+    # and I/O-bound checks, threads suit checks that spend their time in
+    # GIL-releasing C code, processes suit CPU-bound Python code
+    execution_mode = ExecutionMode.event_loop
+    # part of the result cache key, bump whenever the check starts reporting
+    # different results for the same input
+    version = 1
+    # parts of the file the results depend on; the diff mode skips the check
+    # when none of them changed
+    sections: frozenset[FileSection] = frozenset(FileSection)
+
     def __init__(self, context: CheckContext) -> None:
         self.ctx = context
+        self.profile: Optional["CheckProfile"] = None
+        # time.time() after which the check should stop at the next event
+        self.deadline: Optional[float] = None
+        self.timed_out = False
+        self.checked_event_count = 0
+
+    @classmethod
+    def is_affected_by(cls, diff: "FileDiff") -> bool:
+        return bool(cls.sections & diff.changed_sections)
+
+    @classmethod
+    def get_external_inputs(cls, ctx: CheckContext) -> list[Any]:
+        """Identify what besides the subtitles the results depend on, such
+        as dictionaries, fonts or the video, for the result cache.
+
+        :param ctx: context holding at least the file's headers
+        :return: picklable values that change along with the inputs
+        """
+        return []
 
     async def run(self) -> Iterable[BaseResult]:
         raise NotImplementedError("not implemented")
 
+    def is_out_of_time(self) -> bool:
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+    def get_event_total(self) -> int:
+        return len(self.ctx.ass_file.events)
+
+    def get_timeout_result(self) -> Optional[TimedOut]:
+        if not self.timed_out:
+            return None
+        return TimedOut(
+            f"{type(self).__name__}: timed out after "
+            f"{self.checked_event_count}/{self.get_event_total()} events"
+        )
+
+
+def get_result_sort_key(result: BaseResult) -> float:
+    if not result.events:
+        return math.inf
+    return min(event.index for event in result.events)
+
+
+def is_event_non_empty(event: AssEvent) -> bool:
+    return bool(get_plaintext(event.text)) and not event.is_comment
+
 
 class BaseEventCheck(BaseCheck):
+    # whether the check only looks at the event itself and its non-empty
+    # neighbours, and can thus run while the events are still being read
+    streamable = True
+    # how many events may be checked at the same time, for checks that
+    # await work done outside of the event loop
+    event_concurrency = 1
+    # whether the check is slow enough per event to run just for a sample
+    # of the events in the sampling mode
+    expensive = False
+    # whether the check only looks at the text, and can thus skip the events
+    # that only draw shapes
+    text_only = False
+    # events with longer plain text get skipped
+    max_text_length: Optional[int] = None
+    # how many events run_for_event_batch gets at once; the time budget is
+    # checked in between the batches
+    event_batch_size = 1
+
     def __init__(self, context: CheckContext) -> None:
         super().__init__(context)
         self.construct_event_map()
 
     async def run(self) -> Iterable[BaseResult]:
-        for event in self.ctx.ass_file.events:
-            logging.debug(f"{self}: running for event #{event.number}")
-            async for violation in self.run_for_event(event):
-                yield violation
+        if not self.is_sampled():
+            async for result in self.run_for_events(self.get_events()):
+                yield result
+            return
+
+        sample = self.ctx.event_sample
+        found = 0
+        estimate = 0.0
+        async for result in self.run_for_events(self.get_events()):
+            # the checks report their findings at different levels
+            if not isinstance(result, (Skipped, TimedOut)):
+                found += 1
+                estimate += (
+                    sample.get_weight(result.events[0].index)
+                    if result.events
+                    else 1.0
+                )
+            yield result
+        yield Information(
+            f"{type(self).__name__}: sampled {len(sample)}/"
+            f"{sample.population} events "
+            f"({len(sample) / max(1, sample.population):.0%}), "
+            f"found {found} findings, about {round(estimate)} estimated "
+            f"in total"
+        )
+
+    def is_sampled(self) -> bool:
+        # the diff mode narrows the events down already
+        return (
+            self.expensive
+            and self.ctx.sample_fraction is not None
+            and self.ctx.diff is None
+        )
+
+    def get_events(self) -> Iterable[AssEvent]:
+        """In the diff mode, pick just the events whose results might
+        differ from the reference version; in the sampling mode, pick the
+        sampled events for the expensive checks.
+        """
+        events = self.ctx.ass_file.events
+        if self.is_sampled():
+            return [
+                events[idx] for idx in sorted(self.ctx.event_sample.weights)
+            ]
+        diff = self.ctx.diff
+        if (
+            diff is None
+            or not self.streamable
+            or (self.sections - {FileSection.events}) & diff.changed_sections
+        ):
+            return events
+        return [events[idx] for idx in sorted(diff.affected_indices)]
+
+    def get_event_total(self) -> int:
+        return len(self.get_events())
+
+    async def run_for_events(
+        self, events: Iterable[AssEvent]
+    ) -> Iterable[BaseResult]:
+        if self.event_concurrency > 1:
+            async for result in self._run_for_events_concurrently(events):
+                yield result
+            return
+
+        events = iter(events)
+        while batch := list(itertools.islice(events, self.event_batch_size)):
+            if self.is_out_of_time():
+                return
+            async for result in self._run_for_batch_guarded(batch):
+                yield result
+            self.checked_event_count += len(batch)
+
+    async def run_for_event_batch(
+        self, events: list[AssEvent]
+    ) -> Iterable[BaseResult]:
+        """Check several events at once, for checks that hand the events
+        over to something else in bulk. Checks them one by one by default.
+
+        :param events: events to check, never skipped ones
+        :return: results of the events, in their order
+        """
+        for event in events:
+            # the patterns of an event share one time budget
+            with shared_budget():
+                async for result in self.run_for_event(event):
+                    yield result
 
     async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
         raise NotImplementedError("not implemented")
 
-    def construct_event_map(self) -> None:
-        non_empty_events = [
-            event
-            for event in self.ctx.ass_file.events
-            if ass_to_plaintext(event.text) and not event.is_comment
+    def is_skipped(self, event: AssEvent) -> bool:
+        return (
+            self.text_only
+            and self.ctx.event_flags.get(event) & DRAWING_ONLY == DRAWING_ONLY
+        )
+
+    def get_too_long_length(self, event: AssEvent) -> Optional[int]:
+        # the plain text is never longer than the raw one
+        if (
+            self.max_text_length is None
+            or len(event.text) <= self.max_text_length
+        ):
+            return None
+        length = len(get_plaintext(event.text))
+        return length if length > self.max_text_length else None
+
+    async def _run_for_batch_guarded(
+        self, events: list[AssEvent]
+    ) -> Iterable[BaseResult]:
+        """Run the check for given events, leaving out the skipped ones and
+        those with too long text, and stop at the first pattern that takes
+        too long on them.
+        """
+        name = type(self).__name__
+        batch = []
+        results: list[BaseResult] = []
+        for event in events:
+            if self.is_skipped(event):
+                continue
+            if length := self.get_too_long_length(event):
+                results.append(
+                    Skipped(
+                        f"{name}: skipped: too long ({length} characters)",
+                        [event],
+                    )
+                )
+            else:
+                batch.append(event)
+
+        if batch:
+            logging.debug(
+                f"{self}: running for events "
+                + ", ".join(f"#{event.number}" for event in batch)
+            )
+            with (
+                self.profile.measure_events(batch)
+                if self.profile
+                else nullcontext()
+            ):
+                try:
+                    async for result in self.run_for_event_batch(batch):
+                        results.append(result)
+                except PatternTimeout as ex:
+                    results.append(TimedOut(f"{name}: skipped: {ex}", batch))
+        # keep the order of the events
+        for result in sorted(results, key=get_result_sort_key):
+            yield result
+
+    async def _run_for_events_concurrently(
+        self, events: Iterable[AssEvent]
+    ) -> Iterable[BaseResult]:
+        # keep a bounded window of events in flight and report them in order
+        pending: collections.deque[asyncio.Task] = collections.deque()
+        try:
+            for event in events:
+                if self.is_out_of_time():
+                    return
+                # skipped events go through the window too, so that they
+                # get counted in order
+                pending.append(
+                    asyncio.create_task(self._collect_event_results(event))
+                )
+                if len(pending) >= self.event_concurrency * 2:
+                    for result in await pending.popleft():
+                        yield result
+                    self.checked_event_count += 1
+            while pending:
+                # the events still in flight are abandoned
+                if self.is_out_of_time():
+                    return
+                for result in await pending.popleft():
+                    yield result
+                self.checked_event_count += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _collect_event_results(
+        self, event: AssEvent
+    ) -> list[BaseResult]:
+        return [
+            result async for result in self._run_for_batch_guarded([event])
         ]
 
+    def construct_event_map(self) -> None:
         self.forwards_event_map = {}
         self.backwards_event_map = {}
-        last: Optional[AssEvent] = None
-        for event in non_empty_events:
+        self.last_non_empty_event: Optional[AssEvent] = None
+        self.extend_event_map(self.ctx.ass_file.events)
+
+    def extend_event_map(self, events: Iterable[AssEvent]) -> None:
+        last = self.last_non_empty_event
+        for event in events:
+            if not is_event_non_empty(event):
+                continue
             if last:
                 self.forwards_event_map[last.index] = event
                 self.backwards_event_map[event.index] = last
             last = event
+        self.last_non_empty_event = last
 
     def get_prev_non_empty_event(self, event: AssEvent) -> Optional[AssEvent]:
         return self.backwards_event_map.get(event.index)
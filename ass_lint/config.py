@@ -0,0 +1,92 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from ass_lint.event_flags import ACTOR_CATEGORIES, DEFAULT_ACTOR_NAMES
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+CONFIG_FILE_NAME = "ass-lint.toml"
+
+
+class ConfigError(Exception):
+    pass
+
+
+@dataclass
+class Config:
+    # actor names of each event category, e.g. {"sign": ["sign", "TS"]}
+    actor_names: dict[str, list[str]] = field(
+        default_factory=lambda: {
+            category: list(names)
+            for category, names in DEFAULT_ACTOR_NAMES.items()
+        }
+    )
+    # TOML files of user-defined rules for the rules check
+    rule_packs: list[Path] = field(default_factory=list)
+
+
+def find_config(subs_path: Path) -> Optional[Path]:
+    """Look for the project configuration in the subtitles' directory and
+    its parents.
+
+    :param subs_path: path to the checked file
+    :return: path to the configuration, if any
+    """
+    for directory in subs_path.absolute().parents:
+        if (directory / CONFIG_FILE_NAME).is_file():
+            return directory / CONFIG_FILE_NAME
+    return None
+
+
+def parse_config(data: dict[str, Any], base_dir: Path = Path(".")) -> Config:
+    """Validate the project configuration.
+
+    :param data: parsed TOML
+    :param base_dir: directory the relative paths are resolved against
+    :return: the configuration
+    """
+    config = Config()
+    actors = data.get("actors", {})
+    if not isinstance(actors, dict):
+        raise ConfigError("actors must be a table")
+    for category, names in actors.items():
+        if category not in ACTOR_CATEGORIES:
+            raise ConfigError(f"unknown actor category: {category}")
+        if not isinstance(names, list) or not all(
+            isinstance(name, str) for name in names
+        ):
+            raise ConfigError(f"actors.{category} must be a list of names")
+        config.actor_names[category] = names
+
+    rules = data.get("rules", {})
+    if not isinstance(rules, dict):
+        raise ConfigError("rules must be a table")
+    packs = rules.get("packs", [])
+    if not isinstance(packs, list) or not all(
+        isinstance(pack, str) for pack in packs
+    ):
+        raise ConfigError("rules.packs must be a list of paths")
+    config.rule_packs = [base_dir / Path(pack).expanduser() for pack in packs]
+    return config
+
+
+def load_config(path: Optional[Path]) -> Config:
+    if path is None:
+        return Config()
+    if tomllib is None:
+        raise ConfigError(
+            f"can't read {path}, install tomli package to read TOML files"
+        )
+    try:
+        with path.open("rb") as handle:
+            data = tomllib.load(handle)
+    except (OSError, tomllib.TOMLDecodeError) as ex:
+        raise ConfigError(f"can't read {path} ({ex})") from ex
+    return parse_config(data, path.parent)
@@ -0,0 +1,269 @@
+import difflib
+import subprocess
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Hashable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ass_parser import AssEvent, AssFile
+
+from ass_lint.common import FileSection, is_event_non_empty
+from ass_lint.matroska import is_matroska_path, read_matroska_ass
+from ass_lint.reader import AssReader
+
+# gaps without unique lines in common that take more comparisons than this
+# are reported as replaced as a whole, as difflib compares every pair of
+# their lines
+MAX_GAP_COMPARISONS = 1000000
+
+
+class DiffError(Exception):
+    pass
+
+
+@dataclass
+class FileDiff:
+    """Differences between the checked file and its reference version."""
+
+    changed_sections: set[FileSection] = field(default_factory=set)
+    # changed and inserted events along with their non-empty neighbours,
+    # as indices into the checked file's events
+    affected_indices: set[int] = field(default_factory=set)
+
+    def get_key(self) -> tuple[list[str], list[int]]:
+        return (
+            sorted(section.value for section in self.changed_sections),
+            sorted(self.affected_indices),
+        )
+
+
+def load_reference_data(path: Path, since: str) -> bytes:
+    """Load the reference version of the checked file.
+
+    :param path: path to the checked file
+    :param since: path to the reference file, or a git revision of the
+        checked file
+    :return: contents of the reference ASS file
+    """
+    reference_path = Path(since)
+    if reference_path.is_file():
+        if is_matroska_path(reference_path):
+            return read_matroska_ass(reference_path)
+        return reference_path.read_bytes()
+
+    try:
+        return subprocess.run(
+            ["git", "show", f"{since}:./{path.name}"],
+            cwd=path.parent,
+            check=True,
+            capture_output=True,
+        ).stdout
+    except FileNotFoundError as ex:
+        raise DiffError(f"{since} is not a file and git is missing") from ex
+    except subprocess.CalledProcessError as ex:
+        raise DiffError(
+            f"{since} is neither a file nor a git revision of {path}: "
+            + ex.stderr.decode(errors="replace").strip()
+        ) from ex
+
+
+def get_event_key(event: AssEvent) -> Hashable:
+    return (
+        event.layer,
+        event.start,
+        event.end,
+        event.style_name,
+        event.actor,
+        event.margin_left,
+        event.margin_right,
+        event.margin_vertical,
+        event.effect,
+        event.text,
+        event.is_comment,
+    )
+
+
+def get_section_keys(ass_file: AssFile) -> dict[FileSection, Hashable]:
+    return {
+        FileSection.script_info: tuple(
+            ass_file.script_info.produce_ass_lines()
+        ),
+        FileSection.styles: tuple(ass_file.styles.produce_ass_lines()),
+        FileSection.events: tuple(map(get_event_key, ass_file.events)),
+        FileSection.extra_sections: tuple(
+            line
+            for section in ass_file.extra_sections
+            for line in section.produce_ass_lines()
+        ),
+    }
+
+
+def get_affected_indices(
+    events: list[AssEvent],
+    changed_indices: Iterable[int],
+    deletion_indices: Iterable[int],
+) -> set[int]:
+    """Extend the changed events with the events whose non-empty neighbours
+    might have changed along.
+
+    :param events: events of the checked file
+    :param changed_indices: indices of the changed and inserted events
+    :param deletion_indices: indices of the events preceded by a deletion
+        (possibly one past the last event)
+    :return: indices of the events to check
+    """
+    non_empty = [event.index for event in events if is_event_non_empty(event)]
+
+    def add_neighbours(prev_pos: int, next_pos: int) -> None:
+        if prev_pos >= 0:
+            ret.add(non_empty[prev_pos])
+        if next_pos < len(non_empty):
+            ret.add(non_empty[next_pos])
+
+    ret = set(changed_indices)
+    for idx in list(ret):
+        add_neighbours(
+            bisect_left(non_empty, idx) - 1, bisect_right(non_empty, idx)
+        )
+    for idx in deletion_indices:
+        pos = bisect_left(non_empty, idx)
+        add_neighbours(pos - 1, pos)
+    return ret
+
+
+def get_unique_matches(
+    a: Sequence[Hashable], b: Sequence[Hashable]
+) -> list[tuple[int, int]]:
+    """Match the lines occurring exactly once in both sequences, keeping the
+    longest run of matches that are in the same order in both.
+
+    :param a: the old lines
+    :param b: the new lines
+    :return: pairs of indices into a and b, ascending
+    """
+    a_counts = Counter(a)
+    b_counts = Counter(b)
+    b_indices = {key: j for j, key in enumerate(b) if b_counts[key] == 1}
+    pairs = [
+        (i, b_indices[key])
+        for i, key in enumerate(a)
+        if a_counts[key] == 1 and key in b_indices
+    ]
+
+    # longest increasing subsequence of the indices into b
+    tails: list[int] = []
+    tail_pairs: list[int] = []
+    prev_pairs: list[int] = []
+    for pos, (_i, j) in enumerate(pairs):
+        length = bisect_left(tails, j)
+        if length == len(tails):
+            tails.append(j)
+            tail_pairs.append(pos)
+        else:
+            tails[length] = j
+            tail_pairs[length] = pos
+        prev_pairs.append(tail_pairs[length - 1] if length else -1)
+
+    ret = []
+    pos = tail_pairs[-1] if tail_pairs else -1
+    while pos != -1:
+        ret.append(pairs[pos])
+        pos = prev_pairs[pos]
+    return ret[::-1]
+
+
+def get_changed_ranges(
+    a: Sequence[Hashable], b: Sequence[Hashable]
+) -> Iterator[tuple[int, int, int, int]]:
+    """Diff two sequences patience-style: anchor them on the lines unique
+    to both first, and only run difflib on what remains between the anchors.
+
+    :param a: the old lines
+    :param b: the new lines
+    :return: ranges of a replaced by ranges of b, in order, as
+        (a_start, a_end, b_start, b_end)
+    """
+    gaps = [(0, len(a), 0, len(b))]
+    while gaps:
+        a_start, a_end, b_start, b_end = gaps.pop()
+        while a_start < a_end and b_start < b_end and a[a_start] == b[b_start]:
+            a_start += 1
+            b_start += 1
+        while (
+            a_start < a_end
+            and b_start < b_end
+            and a[a_end - 1] == b[b_end - 1]
+        ):
+            a_end -= 1
+            b_end -= 1
+        if a_start == a_end and b_start == b_end:
+            continue
+        if a_start == a_end or b_start == b_end:
+            yield a_start, a_end, b_start, b_end
+            continue
+
+        if matches := get_unique_matches(a[a_start:a_end], b[b_start:b_end]):
+            # pushed in reverse so that the ranges come out in order
+            bounds = [(-1, -1), *matches, (a_end - a_start, b_end - b_start)]
+            for (i1, j1), (i2, j2) in reversed(list(zip(bounds, bounds[1:]))):
+                gaps.append(
+                    (
+                        a_start + i1 + 1,
+                        a_start + i2,
+                        b_start + j1 + 1,
+                        b_start + j2,
+                    )
+                )
+            continue
+
+        if (a_end - a_start) * (b_end - b_start) > MAX_GAP_COMPARISONS:
+            yield a_start, a_end, b_start, b_end
+            continue
+        matcher = difflib.SequenceMatcher(
+            None, a[a_start:a_end], b[b_start:b_end], autojunk=False
+        )
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != "equal":
+                yield a_start + i1, a_start + i2, b_start + j1, b_start + j2
+
+
+def diff_files(ass_file: AssFile, reference: AssFile) -> FileDiff:
+    """Compare the checked file with its reference version.
+
+    :param ass_file: the checked file
+    :param reference: the reference version
+    :return: the changed sections and the events to check
+    """
+    keys = get_section_keys(ass_file)
+    reference_keys = get_section_keys(reference)
+    diff = FileDiff(
+        changed_sections={
+            section
+            for section in keys
+            if keys[section] != reference_keys[section]
+        }
+    )
+    if FileSection.events not in diff.changed_sections:
+        return diff
+
+    changed_indices: list[int] = []
+    deletion_indices: list[int] = []
+    for i1, i2, j1, j2 in get_changed_ranges(
+        reference_keys[FileSection.events], keys[FileSection.events]
+    ):
+        changed_indices.extend(range(j1, j2))
+        if i2 - i1 > j2 - j1:
+            deletion_indices.append(j2)
+    diff.affected_indices = get_affected_indices(
+        list(ass_file.events), changed_indices, deletion_indices
+    )
+    return diff
+
+
+def diff_against_reference(
+    path: Path, ass_file: AssFile, since: str
+) -> FileDiff:
+    return diff_files(
+        ass_file, AssReader(path, data=load_reference_data(path, since)).read()
+    )
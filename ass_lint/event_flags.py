@@ -0,0 +1,106 @@
+import array
+import enum
+import re
+import threading
+from collections.abc import Mapping, Sequence
+
+from ass_parser import AssEvent
+
+from ass_lint.util import DRAWING_RE, get_plaintext, strip_brackets
+
+OVERRIDE_TAGS_RE = re.compile(r"{[^}]*\\")
+
+
+class EventFlag(enum.IntFlag):
+    SIGN = enum.auto()
+    TITLE = enum.auto()
+    KARAOKE = enum.auto()
+    CREDITS = enum.auto()
+    DIALOG = enum.auto()
+    COMMENT = enum.auto()
+    EMPTY = enum.auto()
+    DRAWING = enum.auto()
+    OVERRIDE_TAGS = enum.auto()
+
+
+# events drawing shapes without any text
+DRAWING_ONLY = EventFlag.DRAWING | EventFlag.EMPTY
+
+ACTOR_CATEGORIES = {
+    "sign": EventFlag.SIGN,
+    "title": EventFlag.TITLE,
+    "karaoke": EventFlag.KARAOKE,
+    "credits": EventFlag.CREDITS,
+}
+# actor names, without the surrounding brackets, of each category
+DEFAULT_ACTOR_NAMES = {
+    "sign": ["sign", "episode title", "series title"],
+    "title": ["title"],
+    "karaoke": ["karaoke"],
+    "credits": ["credits"],
+}
+
+
+def get_actor_flags(
+    actor_names: Mapping[str, Sequence[str]],
+) -> dict[str, EventFlag]:
+    return {
+        name: ACTOR_CATEGORIES[category]
+        for category, names in actor_names.items()
+        for name in names
+    }
+
+
+def classify_event(
+    event: AssEvent, actor_flags: Mapping[str, EventFlag]
+) -> EventFlag:
+    flags = actor_flags.get(strip_brackets(event.actor), EventFlag(0))
+    if not flags:
+        flags |= EventFlag.DIALOG
+    if event.is_comment:
+        flags |= EventFlag.COMMENT
+    if not get_plaintext(event.text):
+        flags |= EventFlag.EMPTY
+    if OVERRIDE_TAGS_RE.search(event.text):
+        flags |= EventFlag.OVERRIDE_TAGS
+        if DRAWING_RE.search(event.text):
+            flags |= EventFlag.DRAWING
+    return flags
+
+
+class EventClassifier:
+    """Classifies each event of a file once, storing the flags in a compact
+    array indexed like the events.
+
+    The events are classified on first use, so that the classifier works
+    while the events are still being read.
+    """
+
+    def __init__(
+        self,
+        events: Sequence[AssEvent],
+        actor_names: Mapping[str, Sequence[str]] = DEFAULT_ACTOR_NAMES,
+    ) -> None:
+        self.events = events
+        self.actor_flags = get_actor_flags(actor_names)
+        self._flags = array.array("H")
+        self._lock = threading.Lock()
+
+    def get(self, event: AssEvent) -> EventFlag:
+        if event.parent is not self.events:
+            return classify_event(event, self.actor_flags)
+        index = event.index
+        if index >= len(self._flags):
+            self._classify_until(index + 1)
+        return EventFlag(self._flags[index])
+
+    def get_all(self) -> array.array:
+        self._classify_until(len(self.events))
+        return self._flags
+
+    def _classify_until(self, count: int) -> None:
+        with self._lock:
+            for i in range(len(self._flags), count):
+                self._flags.append(
+                    classify_event(self.events[i], self.actor_flags)
+                )
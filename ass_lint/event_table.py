@@ -0,0 +1,90 @@
+import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from ass_parser import AssEvent
+
+from ass_lint.event_flags import EventClassifier, EventFlag
+from ass_lint.util import count_plaintext_characters, get_plaintext
+
+
+@dataclass
+class EventTable:
+    """Columnar view of the events, one array row per event.
+
+    Lets the checks evaluate their rules over the whole file at once rather
+    than event by event.
+    """
+
+    start: np.ndarray
+    end: np.ndarray
+    duration: np.ndarray
+    style_index: np.ndarray
+    actor_index: np.ndarray
+    is_comment: np.ndarray
+    is_non_empty: np.ndarray
+    char_count: np.ndarray
+    # index of the next non-empty event, -1 for none
+    next_non_empty: np.ndarray
+    # EventFlag values
+    flags: np.ndarray
+    styles: list[str]
+    actors: list[str]
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @classmethod
+    def from_events(
+        cls,
+        events: Sequence[AssEvent],
+        flags: Optional[array.array] = None,
+    ) -> "EventTable":
+        if flags is None:
+            flags = EventClassifier(events).get_all()
+        styles: dict[str, int] = {}
+        actors: dict[str, int] = {}
+        count = len(events)
+        start = np.empty(count, dtype=np.int64)
+        end = np.empty(count, dtype=np.int64)
+        style_index = np.empty(count, dtype=np.int32)
+        actor_index = np.empty(count, dtype=np.int32)
+        is_comment = np.empty(count, dtype=bool)
+        is_non_empty = np.empty(count, dtype=bool)
+        char_count = np.empty(count, dtype=np.int32)
+        for i, event in enumerate(events):
+            plaintext = get_plaintext(event.text)
+            start[i] = event.start
+            end[i] = event.end
+            style_index[i] = styles.setdefault(event.style_name, len(styles))
+            actor_index[i] = actors.setdefault(event.actor, len(actors))
+            is_comment[i] = event.is_comment
+            is_non_empty[i] = bool(plaintext) and not event.is_comment
+            char_count[i] = count_plaintext_characters(plaintext)
+
+        # for each event, the first non-empty event that follows it
+        non_empty_indices = np.flatnonzero(is_non_empty)
+        following = np.searchsorted(
+            non_empty_indices, np.arange(count), side="right"
+        )
+        next_non_empty = np.append(non_empty_indices, -1)[following]
+
+        return cls(
+            start=start,
+            end=end,
+            duration=end - start,
+            style_index=style_index,
+            actor_index=actor_index,
+            is_comment=is_comment,
+            is_non_empty=is_non_empty,
+            char_count=char_count,
+            next_non_empty=next_non_empty.astype(np.int32),
+            flags=np.frombuffer(flags, dtype=np.uint16).copy(),
+            styles=list(styles),
+            actors=list(actors),
+        )
+
+    def has_flag(self, flag: EventFlag) -> np.ndarray:
+        return (self.flags & flag) != 0
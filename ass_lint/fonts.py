@@ -0,0 +1,250 @@
+import logging
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from pathlib import Path
+from typing import BinaryIO, Optional, Protocol, Union
+
+import fontTools.ttLib as font_tools
+import numpy as np
+from ass_parser import AssFile
+
+from ass_lint.attachments import FONTS_SECTION_NAME, get_attachments
+from ass_lint.cache import DiskCache, get_file_identity, make_cache_key
+
+TT_NAME_ID_FONT_FAMILY = 1
+TT_NAME_ID_FULL_NAME = 4
+TT_NAME_ID_TYPOGRAPHIC_FAMILY = 16
+TT_PLATFORM_MICROSOFT = 3
+
+COLLECTION_EXTENSIONS = {".ttc", ".otc"}
+FONT_EXTENSIONS = {".ttf", ".otf", *COLLECTION_EXTENSIONS}
+# bump whenever FontInfo changes its attributes, as the persistent cache
+# keeps pickled instances
+FONT_INFO_FORMAT = 2
+# below that, starting the processes takes longer than parsing the fonts
+MIN_PARALLEL_FONT_COUNT = 32
+
+
+class FontInfo:
+    def __init__(self, font_path, font_number: int = 0):
+        font = font_tools.TTFont(font_path, fontNumber=font_number)
+
+        # the file the font comes from, unless it's embedded
+        self.font_path = font_path if isinstance(font_path, Path) else None
+        # index of the font within a collection
+        self.font_number = font_number
+        self.names = []
+        self.is_bold = bool(font["OS/2"].fsSelection & (1 << 5))
+        self.is_italic = bool(font["OS/2"].fsSelection & 1)
+        # sorted array rather than a set, CJK fonts cover tens of thousands
+        # of codepoints
+        self.codepoints = np.unique(
+            np.fromiter(
+                (
+                    codepoint
+                    for table in font["cmap"].tables
+                    for codepoint in table.cmap
+                ),
+                dtype=np.uint32,
+            )
+        )
+
+        for record in font["name"].names:
+            if record.platformID != TT_PLATFORM_MICROSOFT:
+                continue
+
+            if record.nameID not in {
+                TT_NAME_ID_FONT_FAMILY,
+                TT_NAME_ID_FULL_NAME,
+                TT_NAME_ID_TYPOGRAPHIC_FAMILY,
+            }:
+                continue
+
+            self.names.append(record.string.decode("utf-16-be"))
+
+    def get_missing_codepoints(self, codepoints: np.ndarray) -> np.ndarray:
+        return codepoints[~np.isin(codepoints, self.codepoints)]
+
+
+def get_codepoints(text: str) -> np.ndarray:
+    return np.unique(np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32))
+
+
+def iter_font_paths(fonts_dirs: Iterable[Path]) -> Iterable[Path]:
+    seen = set()
+    for fonts_dir in fonts_dirs:
+        if not fonts_dir.is_dir():
+            continue
+        for path in sorted(fonts_dir.rglob("*")):
+            if path.suffix.lower() not in FONT_EXTENSIONS:
+                continue
+            if not path.is_file() or path.resolve() in seen:
+                continue
+            seen.add(path.resolve())
+            yield path
+
+
+def get_fonts_fingerprint(fonts_dirs: Iterable[Path]) -> str:
+    return make_cache_key(
+        *(get_file_identity(path) for path in iter_font_paths(fonts_dirs))
+    )
+
+
+def load_font_info(
+    source: Union[Path, BinaryIO], font_number: int = 0
+) -> Optional[FontInfo]:
+    try:
+        return FontInfo(source, font_number)
+    except Exception as ex:
+        logging.debug(f"{source}: {ex}")
+        return None
+
+
+def load_font_file(path: Path) -> list[tuple[Path, FontInfo]]:
+    """Parse a font file, or each font of a font collection.
+
+    :param path: path to the font file
+    :return: the fonts along with their paths; the fonts of a collection get
+        pseudo-paths with their index in the collection, e.g. font.ttc#1
+    """
+    if path.suffix.lower() not in COLLECTION_EXTENSIONS:
+        font_info = load_font_info(path)
+        return [(path, font_info)] if font_info else []
+    try:
+        collection = font_tools.TTCollection(path, lazy=True)
+    except Exception as ex:
+        logging.debug(f"{path}: {ex}")
+        return []
+    font_count = len(collection.fonts)
+    collection.close()
+    return [
+        (path.with_name(f"{path.name}#{font_number}"), font_info)
+        for font_number in range(font_count)
+        if (font_info := load_font_info(path, font_number))
+    ]
+
+
+@cache
+def get_fonts(
+    fonts_dirs: tuple[Path, ...], workers: Optional[int] = None
+) -> dict[Path, FontInfo]:
+    """Find and parse the fonts within given directories and their
+    subdirectories.
+
+    :param fonts_dirs: directories to scan, in order of precedence
+    :param workers: number of processes to parse the fonts with, defaults to
+        the CPU count
+    :return: mapping of font paths to their information
+    """
+    paths = list(iter_font_paths(fonts_dirs))
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(paths) >= MIN_PARALLEL_FONT_COUNT:
+        with ProcessPoolExecutor(workers) as executor:
+            font_files = list(
+                executor.map(
+                    load_font_file,
+                    paths,
+                    chunksize=max(1, len(paths) // (workers * 4)),
+                )
+            )
+    else:
+        font_files = [load_font_file(path) for path in paths]
+
+    return {
+        path: font_info
+        for font_file in font_files
+        for path, font_info in font_file
+    }
+
+
+class EmbeddedFont(Protocol):
+    @property
+    def path(self) -> Path: ...
+
+    @property
+    def content_hash(self) -> str: ...
+
+    def decode(self) -> BinaryIO: ...
+
+
+# shared by all the files checked within a single process
+_embedded_font_memo: dict[str, Optional[FontInfo]] = {}
+
+
+def get_embedded_fonts(
+    ass_file: AssFile,
+    cache: Optional[DiskCache] = None,
+    attachments: Iterable[EmbeddedFont] = (),
+) -> dict[Path, FontInfo]:
+    """Parse the fonts embedded in the [Fonts] section and given attachments.
+
+    The fonts are decoded in memory, and their parsed information is cached
+    by the hash of their encoded content.
+
+    :param ass_file: file to get the fonts of
+    :param cache: persistent cache of the parsed fonts
+    :param attachments: extra font attachments, e.g. from a Matroska file
+    :return: mapping of pseudo-paths to font information
+    """
+    attachments = [
+        *get_attachments(ass_file, FONTS_SECTION_NAME),
+        *attachments,
+    ]
+    hashes = {
+        attachment.path: attachment.content_hash for attachment in attachments
+    }
+    font_infos = {
+        content_hash: _embedded_font_memo[content_hash]
+        for content_hash in hashes.values()
+        if content_hash in _embedded_font_memo
+    }
+    if cache:
+        cache_keys = {
+            content_hash: make_cache_key(FONT_INFO_FORMAT, content_hash)
+            for content_hash in hashes.values()
+            if content_hash not in font_infos
+        }
+        cached = cache.get_many(cache_keys.values())
+        font_infos.update(
+            (content_hash, cached[key])
+            for content_hash, key in cache_keys.items()
+            if key in cached
+        )
+
+    new_font_infos: dict[str, Optional[FontInfo]] = {}
+    for attachment in attachments:
+        content_hash = hashes[attachment.path]
+        if content_hash in font_infos or content_hash in new_font_infos:
+            continue
+        new_font_infos[content_hash] = load_font_info(attachment.decode())
+    if cache and new_font_infos:
+        cache.set_many(
+            {
+                make_cache_key(FONT_INFO_FORMAT, content_hash): font_info
+                for content_hash, font_info in new_font_infos.items()
+            }
+        )
+    font_infos.update(new_font_infos)
+    _embedded_font_memo.update(font_infos)
+
+    return {
+        path: font_info
+        for path, content_hash in hashes.items()
+        if (font_info := font_infos[content_hash])
+    }
+
+
+def locate_font(
+    fonts: dict[Path, FontInfo], family: str, is_bold: bool, is_italic: bool
+) -> Optional[tuple[int, Path, FontInfo]]:
+    candidates = []
+    for font_path, font in fonts.items():
+        if family.lower() in [n.lower() for n in font.names]:
+            weight = (font.is_bold == is_bold) + (font.is_italic == is_italic)
+            candidates.append((weight, font_path, font))
+    candidates.sort(key=lambda i: -i[0])
+    if not candidates:
+        return None
+    return candidates[0]
@@ -0,0 +1,321 @@
+import asyncio
+import http.client
+import json
+import queue
+import urllib.parse
+from collections.abc import Iterable
+from dataclasses import dataclass
+from importlib import metadata
+from typing import Any, Optional
+
+from ass_lint.cache import DiskCache, make_cache_key
+
+
+class GrammarBackendError(Exception):
+    pass
+
+
+class GrammarBackend:
+    name = "base"
+    batch_size = 1
+    max_batch_chars = 10000
+    max_in_flight = 1
+
+    def supports(self, language: str) -> bool:
+        raise NotImplementedError("not implemented")
+
+    async def get_version(self) -> str:
+        raise NotImplementedError("not implemented")
+
+    async def check(
+        self, texts: list[str], language: str
+    ) -> list[Optional[str]]:
+        """Check given lines of text.
+
+        :param texts: lines to check
+        :param language: language of the lines, e.g. en_US
+        :return: corrected line for each input line, or None
+        """
+        raise NotImplementedError("not implemented")
+
+    def close(self) -> None:
+        pass
+
+
+class GingerBackend(GrammarBackend):
+    name = "ginger"
+
+    def __init__(self) -> None:
+        try:
+            from gingerit.gingerit import GingerIt
+        except ImportError as ex:
+            raise GrammarBackendError(
+                "grammar checker is not available, install gingerit package"
+            ) from ex
+        self._parser = GingerIt()
+
+    def supports(self, language: str) -> bool:
+        return language.lower().startswith("en")
+
+    async def get_version(self) -> str:
+        try:
+            return metadata.version("gingerit")
+        except metadata.PackageNotFoundError:
+            return "unknown"
+
+    async def check(
+        self, texts: list[str], language: str
+    ) -> list[Optional[str]]:
+        loop = asyncio.get_running_loop()
+        ret: list[Optional[str]] = []
+        for text in texts:
+            result = await loop.run_in_executor(None, self._parser.parse, text)
+            ret.append(result["result"] if result else None)
+        return ret
+
+
+def apply_replacements(text: str, matches: list[tuple[int, int, str]]) -> str:
+    last_start = len(text)
+    for offset, length, replacement in sorted(matches, reverse=True):
+        if offset + length > last_start:
+            # overlapping matches
+            continue
+        text = text[:offset] + replacement + text[offset + length :]
+        last_start = offset
+    return text
+
+
+def get_utf16_offset_map(text: str) -> Optional[list[int]]:
+    """Map UTF-16 code unit offsets, as reported by Java-based servers, to
+    string indices.
+
+    :param text: text to map offsets of
+    :return: list of indices for each UTF-16 offset, or None if the text
+        consists only of BMP characters
+    """
+    if all(ord(char) <= 0xFFFF for char in text):
+        return None
+    ret = []
+    for idx, char in enumerate(text):
+        ret.append(idx)
+        if ord(char) > 0xFFFF:
+            ret.append(idx)
+    ret.append(len(text))
+    return ret
+
+
+@dataclass
+class _Response:
+    status: int
+    reason: str
+    data: bytes
+
+
+class LanguageToolBackend(GrammarBackend):
+    """Client for a LanguageTool-compatible HTTP server.
+
+    Packs multiple lines into a single request, one paragraph per line, and
+    reuses a pool of keep-alive connections.
+    """
+
+    name = "languagetool"
+    batch_size = 50
+    max_in_flight = 4
+    timeout = 60
+
+    def __init__(self, url: str) -> None:
+        parsed_url = urllib.parse.urlsplit(url)
+        if parsed_url.scheme not in {"http", "https"}:
+            raise GrammarBackendError(f"unsupported grammar server: {url}")
+        self.url = url
+        self._scheme = parsed_url.scheme
+        self._netloc = parsed_url.netloc
+        self._path = parsed_url.path.rstrip("/") + "/v2/check"
+        self._pool: queue.LifoQueue[http.client.HTTPConnection] = (
+            queue.LifoQueue()
+        )
+        self._version: Optional[str] = None
+
+    def supports(self, language: str) -> bool:
+        return True
+
+    async def get_version(self) -> str:
+        if self._version is None:
+            response = await self._post({"text": "", "language": "en-US"})
+            software = response.get("software", {})
+            self._version = (
+                f'{software.get("name")} {software.get("version")} '
+                f'{software.get("buildDate")}'
+            )
+        return self._version
+
+    async def check(
+        self, texts: list[str], language: str
+    ) -> list[Optional[str]]:
+        starts = []
+        pos = 0
+        for text in texts:
+            starts.append(pos)
+            pos += len(text) + 2
+
+        joined_text = "\n\n".join(texts)
+        response = await self._post(
+            {"text": joined_text, "language": language.replace("_", "-")}
+        )
+        utf16_map = get_utf16_offset_map(joined_text)
+
+        matches: list[list[tuple[int, int, str]]] = [[] for _ in texts]
+        for match in response.get("matches", []):
+            if not match.get("replacements"):
+                continue
+            offset = match["offset"]
+            length = match["length"]
+            if utf16_map:
+                length = utf16_map[offset + length] - utf16_map[offset]
+                offset = utf16_map[offset]
+            for idx in range(len(texts) - 1, -1, -1):
+                if offset >= starts[idx]:
+                    break
+            offset -= starts[idx]
+            if offset + length > len(texts[idx]):
+                continue
+            matches[idx].append(
+                (offset, length, match["replacements"][0]["value"])
+            )
+
+        return [
+            apply_replacements(text, text_matches) if text_matches else None
+            for text, text_matches in zip(texts, matches)
+        ]
+
+    async def _post(self, data: dict[str, str]) -> dict[str, Any]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._post_sync, urllib.parse.urlencode(data)
+        )
+
+    def _post_sync(self, body: str) -> dict[str, Any]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        try:
+            try:
+                response = self._request(conn, body)
+            except (http.client.HTTPException, OSError):
+                # the server might have closed an idle connection
+                conn.close()
+                conn = self._connect()
+                response = self._request(conn, body)
+        except (http.client.HTTPException, OSError) as ex:
+            conn.close()
+            raise GrammarBackendError(f"grammar server error ({ex})") from ex
+
+        self._pool.put(conn)
+        if response.status != 200:
+            raise GrammarBackendError(
+                f"grammar server error ({response.status} {response.reason})"
+            )
+        return json.loads(response.data)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(
+                self._netloc, timeout=self.timeout
+            )
+        return http.client.HTTPConnection(self._netloc, timeout=self.timeout)
+
+    def _request(
+        self, conn: http.client.HTTPConnection, body: str
+    ) -> "_Response":
+        conn.request(
+            "POST",
+            self._path,
+            body=body.encode(),
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Accept": "application/json",
+            },
+        )
+        response = conn.getresponse()
+        return _Response(
+            status=response.status,
+            reason=response.reason,
+            data=response.read(),
+        )
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def iter_batches(
+    texts: list[str], batch_size: int, max_batch_chars: int
+) -> Iterable[list[str]]:
+    batch: list[str] = []
+    batch_chars = 0
+    for text in texts:
+        if batch and (
+            len(batch) >= batch_size
+            or batch_chars + len(text) > max_batch_chars
+        ):
+            yield batch
+            batch = []
+            batch_chars = 0
+        batch.append(text)
+        batch_chars += len(text)
+    if batch:
+        yield batch
+
+
+async def check_texts(
+    backend: GrammarBackend,
+    texts: Iterable[str],
+    language: str,
+    cache: Optional[DiskCache] = None,
+) -> dict[str, Optional[str]]:
+    """Check given lines, querying the backend only for lines that aren't
+    cached yet.
+
+    :param backend: backend to check the lines with
+    :param texts: lines to check
+    :param language: language of the lines, e.g. en_US
+    :param cache: persistent cache of the backend results
+    :return: mapping of lines to their corrected versions, or None
+    """
+    texts = list(dict.fromkeys(texts))
+    if not texts:
+        return {}
+
+    version = await backend.get_version()
+    keys = {
+        text: make_cache_key(backend.name, version, language, text)
+        for text in texts
+    }
+    cached = cache.get_many(keys.values()) if cache else {}
+    ret = {text: cached[keys[text]] for text in texts if keys[text] in cached}
+
+    semaphore = asyncio.Semaphore(backend.max_in_flight)
+
+    async def check_batch(batch: list[str]) -> None:
+        async with semaphore:
+            suggestions = await backend.check(batch, language)
+        results = dict(zip(batch, suggestions))
+        ret.update(results)
+        if cache:
+            cache.set_many({keys[text]: results[text] for text in batch})
+
+    await asyncio.gather(
+        *(
+            check_batch(batch)
+            for batch in iter_batches(
+                [text for text in texts if text not in ret],
+                backend.batch_size,
+                backend.max_batch_chars,
+            )
+        )
+    )
+    return ret
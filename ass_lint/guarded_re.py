@@ -0,0 +1,134 @@
+import functools
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, Union
+
+# seconds all the patterns together may take on a single event
+PATTERN_TIMEOUT = 0.25
+
+
+class PatternTimeout(Exception):
+    """Raised when the patterns take too long on some text, usually because
+    one of them backtracks over a pathological event.
+    """
+
+    def __init__(self, pattern: str) -> None:
+        super().__init__(f"pattern timed out: {pattern}")
+        self.pattern = pattern
+
+
+class PatternBudget:
+    """Time the patterns may still take on the current event."""
+
+    def __init__(self, seconds: float) -> None:
+        self.remaining = seconds
+
+
+_budget: ContextVar[Optional[PatternBudget]] = ContextVar(
+    "pattern_budget", default=None
+)
+
+
+@contextmanager
+def shared_budget(seconds: Optional[float] = None) -> Iterator[None]:
+    """Make the patterns run in the meantime draw from one time budget,
+    rather than each of them getting a full PATTERN_TIMEOUT.
+
+    :param seconds: the budget, PATTERN_TIMEOUT by default
+    """
+    token = _budget.set(
+        PatternBudget(PATTERN_TIMEOUT if seconds is None else seconds)
+    )
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern: str, flags: int = 0) -> Any:
+    # the re flags have the same values in the regex module
+    import regex
+
+    return regex.compile(pattern, flags)
+
+
+def _run(
+    pattern: Union[str, Any], flags: int, call: Callable[[Any, float], Any]
+) -> Any:
+    compiled = (
+        compile_pattern(pattern, flags)
+        if isinstance(pattern, str)
+        else pattern
+    )
+    budget = _budget.get()
+    timeout = PATTERN_TIMEOUT if budget is None else budget.remaining
+    if timeout <= 0:
+        raise PatternTimeout(compiled.pattern)
+    start = time.perf_counter()
+    try:
+        return call(compiled, timeout)
+    except TimeoutError as ex:
+        raise PatternTimeout(compiled.pattern) from ex
+    finally:
+        if budget is not None:
+            budget.remaining -= time.perf_counter() - start
+
+
+def search(
+    pattern: Union[str, Any], text: str, flags: int = 0
+) -> Optional[Any]:
+    """Same as re.search, but raises PatternTimeout rather than running past
+    the time budget.
+
+    :param pattern: pattern, or a compiled regex pattern
+    :param text: text to search
+    :param flags: re flags, for uncompiled patterns
+    :return: the match, if any
+    """
+    return _run(
+        pattern,
+        flags,
+        lambda compiled, timeout: compiled.search(text, timeout=timeout),
+    )
+
+
+def findall(pattern: Union[str, Any], text: str, flags: int = 0) -> list[Any]:
+    return _run(
+        pattern,
+        flags,
+        lambda compiled, timeout: compiled.findall(text, timeout=timeout),
+    )
+
+
+def finditer(pattern: Union[str, Any], text: str, flags: int = 0) -> list[Any]:
+    # collected upfront, so that only the matching counts towards the budget
+    return _run(
+        pattern,
+        flags,
+        lambda compiled, timeout: list(
+            compiled.finditer(text, timeout=timeout)
+        ),
+    )
+
+
+def split(pattern: Union[str, Any], text: str, flags: int = 0) -> list[str]:
+    return _run(
+        pattern,
+        flags,
+        lambda compiled, timeout: compiled.split(text, timeout=timeout),
+    )
+
+
+def sub(
+    pattern: Union[str, Any], replacement: str, text: str, flags: int = 0
+) -> str:
+    return _run(
+        pattern,
+        flags,
+        lambda compiled, timeout: compiled.sub(
+            replacement, text, timeout=timeout
+        ),
+    )
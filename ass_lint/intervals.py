@@ -0,0 +1,79 @@
+from collections.abc import Iterable
+from typing import Generic, TypeVar
+
+from ass_parser import AssEvent
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """Static index of half-open time intervals.
+
+    The intervals are sorted by their start and viewed as a balanced binary
+    search tree, each node remembering the latest end within its subtree.
+    Building takes O(n log n), finding the k intervals that overlap a given
+    range takes O(log n + k).
+    """
+
+    def __init__(self, intervals: Iterable[tuple[int, int, T]]) -> None:
+        # empty intervals never overlap anything
+        items = sorted(
+            (item for item in intervals if item[0] < item[1]),
+            key=lambda item: (item[0], item[1]),
+        )
+        self.starts = [start for start, _end, _value in items]
+        self.ends = [end for _start, end, _value in items]
+        self.values = [value for _start, _end, value in items]
+        self.max_ends = list(self.ends)
+        self._build(0, len(items))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get_overlapping(self, start: int, end: int) -> list[T]:
+        """Find the intervals overlapping given range.
+
+        :param start: start of the range, inclusive
+        :param end: end of the range, exclusive
+        :return: values of the overlapping intervals, sorted by their start
+        """
+        ret: list[T] = []
+        if start < end:
+            self._query(0, len(self.values), start, end, ret)
+        return ret
+
+    def get_at(self, time: int) -> list[T]:
+        return self.get_overlapping(time, time + 1)
+
+    def _build(self, low: int, high: int) -> int:
+        if low >= high:
+            return -1
+        mid = (low + high) // 2
+        self.max_ends[mid] = max(
+            self.ends[mid], self._build(low, mid), self._build(mid + 1, high)
+        )
+        return self.max_ends[mid]
+
+    def _query(
+        self, low: int, high: int, start: int, end: int, ret: list[T]
+    ) -> None:
+        if low >= high:
+            return
+        mid = (low + high) // 2
+        if self.max_ends[mid] <= start:
+            return
+        self._query(low, mid, start, end, ret)
+        if self.starts[mid] >= end:
+            # so do all the intervals to the right
+            return
+        if self.ends[mid] > start:
+            ret.append(self.values[mid])
+        self._query(mid + 1, high, start, end, ret)
+
+
+def make_event_index(events: Iterable[AssEvent]) -> IntervalIndex[AssEvent]:
+    return IntervalIndex(
+        (event.start, event.end, event)
+        for event in events
+        if not event.is_comment
+    )
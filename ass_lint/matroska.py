@@ -0,0 +1,606 @@
+import hashlib
+import io
+import struct
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+MATROSKA_SUFFIXES = {".mkv", ".mks", ".mka", ".webm"}
+
+# element IDs, with their length markers
+EBML_ID = 0x1A45DFA3
+SEGMENT_ID = 0x18538067
+SEEK_HEAD_ID = 0x114D9B74
+SEEK_ID = 0x4DBB
+SEEK_ID_ID = 0x53AB
+SEEK_POSITION_ID = 0x53AC
+INFO_ID = 0x1549A966
+TIMESTAMP_SCALE_ID = 0x2AD7B1
+TRACKS_ID = 0x1654AE6B
+TRACK_ENTRY_ID = 0xAE
+TRACK_NUMBER_ID = 0xD7
+TRACK_TYPE_ID = 0x83
+CODEC_ID_ID = 0x86
+CODEC_PRIVATE_ID = 0x63A2
+TRACK_NAME_ID = 0x536E
+LANGUAGE_ID = 0x22B59C
+FLAG_DEFAULT_ID = 0x88
+CONTENT_ENCODINGS_ID = 0x6D80
+CONTENT_ENCODING_ID = 0x6240
+CONTENT_ENCODING_SCOPE_ID = 0x5032
+CONTENT_COMPRESSION_ID = 0x5034
+CONTENT_COMP_ALGO_ID = 0x4254
+CONTENT_COMP_SETTINGS_ID = 0x4255
+ATTACHMENTS_ID = 0x1941A469
+ATTACHED_FILE_ID = 0x61A7
+FILE_NAME_ID = 0x466E
+FILE_MIME_TYPE_ID = 0x4660
+FILE_DATA_ID = 0x465C
+CUES_ID = 0x1C53BB6B
+CLUSTER_ID = 0x1F43B675
+CLUSTER_TIMESTAMP_ID = 0xE7
+BLOCK_GROUP_ID = 0xA0
+BLOCK_ID = 0xA1
+BLOCK_DURATION_ID = 0x9B
+SIMPLE_BLOCK_ID = 0xA3
+
+TOP_LEVEL_IDS = {
+    SEEK_HEAD_ID,
+    INFO_ID,
+    TRACKS_ID,
+    ATTACHMENTS_ID,
+    CUES_ID,
+    CLUSTER_ID,
+    0x1043A770,  # Chapters
+    0x1254C367,  # Tags
+}
+
+TRACK_TYPE_SUBTITLE = 0x11
+ASS_CODEC_IDS = {"S_TEXT/ASS", "S_TEXT/SSA"}
+COMP_ALGO_ZLIB = 0
+COMP_ALGO_HEADER_STRIPPING = 3
+SCOPE_BLOCKS = 1
+SCOPE_PRIVATE = 2
+DEFAULT_TIMESTAMP_SCALE = 1000000
+UNKNOWN_SIZE = -1
+
+FONT_MIME_TYPES = {
+    "application/x-truetype-font",
+    "application/x-font-ttf",
+    "application/x-font-otf",
+    "application/vnd.ms-opentype",
+    "application/font-sfnt",
+    "font/ttf",
+    "font/otf",
+    "font/sfnt",
+}
+FONT_EXTENSIONS = {".ttf", ".otf"}
+
+
+class MatroskaError(Exception):
+    pass
+
+
+def is_matroska_path(path: Path) -> bool:
+    return path.suffix.lower() in MATROSKA_SUFFIXES
+
+
+@dataclass
+class MatroskaTrack:
+    number: int
+    track_type: int = 0
+    codec_id: str = ""
+    codec_private: bytes = b""
+    name: str = ""
+    language: str = "eng"
+    is_default: bool = True
+    compression: Optional[tuple[int, bytes]] = None
+    compression_scope: int = SCOPE_BLOCKS
+
+    @property
+    def is_ass(self) -> bool:
+        return (
+            self.track_type == TRACK_TYPE_SUBTITLE
+            and self.codec_id in ASS_CODEC_IDS
+        )
+
+
+@dataclass
+class MatroskaAttachment:
+    name: str
+    mime_type: str
+    data: bytes = field(repr=False)
+
+    @property
+    def path(self) -> Path:
+        return Path("[Attachments]") / self.name
+
+    @property
+    def is_font(self) -> bool:
+        return (
+            self.mime_type.lower() in FONT_MIME_TYPES
+            or Path(self.name).suffix.lower() in FONT_EXTENSIONS
+        )
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+    def decode(self) -> io.BytesIO:
+        return io.BytesIO(self.data)
+
+
+@dataclass
+class MatroskaBlock:
+    track_number: int
+    timestamp: int
+    duration: Optional[int]
+    data: bytes
+
+
+def _read_vint(handle: BinaryIO, keep_marker: bool) -> tuple[int, int]:
+    first = handle.read(1)
+    if not first:
+        raise EOFError
+    first_byte = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first_byte & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise MatroskaError("invalid variable size integer")
+    rest = _read_exactly(handle, length - 1)
+    value = first_byte if keep_marker else first_byte & (mask - 1)
+    for byte in rest:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return (UNKNOWN_SIZE, length)
+    return (value, length)
+
+
+def _read_exactly(handle: BinaryIO, size: int) -> bytes:
+    data = handle.read(size)
+    if len(data) != size:
+        raise EOFError
+    return data
+
+
+def _read_uint(data: bytes) -> int:
+    return int.from_bytes(data, "big")
+
+
+def _read_float(data: bytes) -> float:
+    if len(data) == 4:
+        return struct.unpack(">f", data)[0]
+    return struct.unpack(">d", data)[0]
+
+
+def _read_string(data: bytes) -> str:
+    return data.rstrip(b"\0").decode("utf-8", errors="replace")
+
+
+class MatroskaReader:
+    """Reads the subtitle tracks and attachments of a Matroska file.
+
+    Only the metadata elements and the blocks of the requested track are
+    read; the clusters are scanned block by block, skipping the data of the
+    other tracks, so that the video data is never read.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._handle = path.open("rb")
+        self.timestamp_scale = DEFAULT_TIMESTAMP_SCALE
+        self.tracks: list[MatroskaTrack] = []
+        self._positions: dict[int, int] = {}
+        self._first_cluster: Optional[int] = None
+        try:
+            self._read_header()
+        except EOFError as ex:
+            self.close()
+            raise MatroskaError("unexpected end of file") from ex
+        except MatroskaError:
+            self.close()
+            raise
+
+    def __enter__(self) -> "MatroskaReader":
+        return self
+
+    def __exit__(self, *_args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def get_ass_track(self, number: Optional[int] = None) -> MatroskaTrack:
+        tracks = [track for track in self.tracks if track.is_ass]
+        if number is not None:
+            tracks = [track for track in tracks if track.number == number]
+        if not tracks:
+            raise MatroskaError(f"{self.path}: no ASS subtitle track found")
+        return next((track for track in tracks if track.is_default), tracks[0])
+
+    def get_attachments(self) -> list[MatroskaAttachment]:
+        try:
+            return self._read_attachments()
+        except EOFError as ex:
+            raise MatroskaError(f"{self.path}: unexpected end of file") from ex
+
+    def _read_attachments(self) -> list[MatroskaAttachment]:
+        position = self._positions.get(ATTACHMENTS_ID)
+        if position is None:
+            return []
+        ret = []
+        for element_id, data in self._iter_children_at(position):
+            if element_id != ATTACHED_FILE_ID:
+                continue
+            values = dict(self._iter_children(io.BytesIO(data), len(data)))
+            ret.append(
+                MatroskaAttachment(
+                    name=_read_string(values.get(FILE_NAME_ID, b"")),
+                    mime_type=_read_string(values.get(FILE_MIME_TYPE_ID, b"")),
+                    data=values.get(FILE_DATA_ID, b""),
+                )
+            )
+        return ret
+
+    def iter_blocks(self, track: MatroskaTrack) -> Iterator[MatroskaBlock]:
+        """Read the blocks of given track, in storage order.
+
+        :param track: track to read the blocks of
+        :return: the blocks
+        """
+        # the cues aren't required to cover each subtitle block, and nothing
+        # tells how many blocks there are, so all the clusters get scanned
+        position = self._first_cluster
+        try:
+            while position is not None:
+                if (
+                    self._segment_end is not None
+                    and position >= self._segment_end
+                ):
+                    break
+                self._handle.seek(position)
+                try:
+                    element_id, size, header_size = self._read_element_header()
+                except EOFError:
+                    # the segment is cut short otherwise
+                    if self._segment_end is None:
+                        break
+                    raise
+                if element_id == CLUSTER_ID:
+                    yield from self._scan_cluster(track, position)
+                    if size == UNKNOWN_SIZE:
+                        position = self._unknown_size_end
+                        continue
+                elif size == UNKNOWN_SIZE:
+                    break
+                position += header_size + size
+        except EOFError as ex:
+            raise MatroskaError(f"{self.path}: unexpected end of file") from ex
+
+    def get_codec_private(self, track: MatroskaTrack) -> bytes:
+        return self._decompress(track, track.codec_private, SCOPE_PRIVATE)
+
+    def read_ass(self, track: Optional[MatroskaTrack] = None) -> bytes:
+        """Reconstruct an ASS file out of given subtitle track.
+
+        :param track: track to read, by default the default ASS track
+        :return: the ASS file contents
+        """
+        if track is None:
+            track = self.get_ass_track()
+        header = self.get_codec_private(track).decode("utf-8-sig")
+        field_names = ["Layer", "Start", "End", "Style", "Name"]
+        field_names += ["MarginL", "MarginR", "MarginV", "Effect", "Text"]
+        for line in header.splitlines():
+            if line.startswith("Format:") and "Text" in line:
+                field_names = [
+                    name.strip() for name in line.split(":", 1)[1].split(",")
+                ]
+        block_field_names = ["ReadOrder"] + [
+            name for name in field_names if name not in {"Start", "End"}
+        ]
+
+        events = []
+        for block in self.iter_blocks(track):
+            values = dict(
+                zip(
+                    block_field_names,
+                    block.data.decode("utf-8", errors="replace").split(
+                        ",", len(block_field_names) - 1
+                    ),
+                )
+            )
+            values["Start"] = _format_time(block.timestamp)
+            values["End"] = _format_time(
+                block.timestamp + (block.duration or 0)
+            )
+            events.append(
+                (
+                    int(values.get("ReadOrder") or 0),
+                    "Dialogue: "
+                    + ",".join(values.get(name, "") for name in field_names),
+                )
+            )
+        events.sort(key=lambda item: item[0])
+
+        lines = header.rstrip("\r\n").splitlines()
+        if "[Events]" not in (line.strip() for line in lines):
+            lines += ["", "[Events]", "Format: " + ", ".join(field_names)]
+        lines += [line for _read_order, line in events]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _read_header(self) -> None:
+        element_id, size, _header_size = self._read_element_header()
+        if element_id != EBML_ID:
+            raise MatroskaError(f"{self.path}: not a Matroska file")
+        self._handle.seek(size, io.SEEK_CUR)
+
+        element_id, size, _header_size = self._read_element_header()
+        if element_id != SEGMENT_ID:
+            raise MatroskaError(f"{self.path}: segment not found")
+        self._segment_start = self._handle.tell()
+        self._segment_end = (
+            None if size == UNKNOWN_SIZE else self._segment_start + size
+        )
+
+        # read the top level elements until the first cluster, following the
+        # seek head to the elements stored after the clusters
+        position = self._segment_start
+        pending_seek_heads = []
+        while True:
+            self._handle.seek(position)
+            try:
+                element_id, size, header_size = self._read_element_header()
+            except EOFError:
+                break
+            if element_id == CLUSTER_ID:
+                self._first_cluster = position
+                break
+            self._positions.setdefault(element_id, position)
+            if element_id == SEEK_HEAD_ID:
+                pending_seek_heads.append(position)
+            if size == UNKNOWN_SIZE:
+                break
+            position += header_size + size
+
+        while pending_seek_heads:
+            for element_id, data in self._iter_children_at(
+                pending_seek_heads.pop()
+            ):
+                if element_id != SEEK_ID:
+                    continue
+                values = dict(self._iter_children(io.BytesIO(data), len(data)))
+                if SEEK_ID_ID not in values or SEEK_POSITION_ID not in values:
+                    continue
+                target_id = _read_uint(values[SEEK_ID_ID])
+                target = self._segment_start + _read_uint(
+                    values[SEEK_POSITION_ID]
+                )
+                if target_id == SEEK_HEAD_ID and (
+                    target not in self._positions.values()
+                ):
+                    pending_seek_heads.append(target)
+                if target_id == CLUSTER_ID:
+                    continue
+                self._positions.setdefault(target_id, target)
+
+        if INFO_ID in self._positions:
+            for element_id, data in self._iter_children_at(
+                self._positions[INFO_ID]
+            ):
+                if element_id == TIMESTAMP_SCALE_ID:
+                    self.timestamp_scale = _read_uint(data)
+
+        if TRACKS_ID in self._positions:
+            for element_id, data in self._iter_children_at(
+                self._positions[TRACKS_ID]
+            ):
+                if element_id == TRACK_ENTRY_ID:
+                    self.tracks.append(self._parse_track(data))
+
+    def _parse_track(self, data: bytes) -> MatroskaTrack:
+        track = MatroskaTrack(number=0)
+        for element_id, value in self._iter_children(
+            io.BytesIO(data), len(data)
+        ):
+            if element_id == TRACK_NUMBER_ID:
+                track.number = _read_uint(value)
+            elif element_id == TRACK_TYPE_ID:
+                track.track_type = _read_uint(value)
+            elif element_id == CODEC_ID_ID:
+                track.codec_id = _read_string(value)
+            elif element_id == CODEC_PRIVATE_ID:
+                track.codec_private = value
+            elif element_id == TRACK_NAME_ID:
+                track.name = _read_string(value)
+            elif element_id == LANGUAGE_ID:
+                track.language = _read_string(value)
+            elif element_id == FLAG_DEFAULT_ID:
+                track.is_default = bool(_read_uint(value))
+            elif element_id == CONTENT_ENCODINGS_ID:
+                self._parse_content_encodings(track, value)
+        return track
+
+    def _parse_content_encodings(
+        self, track: MatroskaTrack, data: bytes
+    ) -> None:
+        for element_id, encoding in self._iter_children(
+            io.BytesIO(data), len(data)
+        ):
+            if element_id != CONTENT_ENCODING_ID:
+                continue
+            values = dict(
+                self._iter_children(io.BytesIO(encoding), len(encoding))
+            )
+            if CONTENT_COMPRESSION_ID not in values:
+                raise MatroskaError("encrypted tracks are not supported")
+            compression = dict(
+                self._iter_children(
+                    io.BytesIO(values[CONTENT_COMPRESSION_ID]),
+                    len(values[CONTENT_COMPRESSION_ID]),
+                )
+            )
+            algo = _read_uint(compression.get(CONTENT_COMP_ALGO_ID, b"\0"))
+            if algo not in {COMP_ALGO_ZLIB, COMP_ALGO_HEADER_STRIPPING}:
+                raise MatroskaError(f"unsupported compression ({algo})")
+            track.compression = (
+                algo,
+                compression.get(CONTENT_COMP_SETTINGS_ID, b""),
+            )
+            track.compression_scope = _read_uint(
+                values.get(CONTENT_ENCODING_SCOPE_ID, b"\1")
+            )
+
+    def _decompress(
+        self, track: MatroskaTrack, data: bytes, scope: int
+    ) -> bytes:
+        if not track.compression or not track.compression_scope & scope:
+            return data
+        algo, settings = track.compression
+        if algo == COMP_ALGO_ZLIB:
+            return zlib.decompress(data)
+        return settings + data
+
+    def _scan_cluster(
+        self, track: MatroskaTrack, cluster_start: int
+    ) -> Iterator[MatroskaBlock]:
+        self._handle.seek(cluster_start)
+        _element_id, size, header_size = self._read_element_header()
+        end = (
+            None
+            if size == UNKNOWN_SIZE
+            else cluster_start + header_size + size
+        )
+        cluster_timestamp = 0
+        position = cluster_start + header_size
+        while end is None or position < end:
+            self._handle.seek(position)
+            try:
+                element_id, size, header_size = self._read_element_header()
+            except EOFError:
+                if end is None:
+                    break
+                raise
+            if end is None and element_id in TOP_LEVEL_IDS:
+                break
+            if element_id == CLUSTER_TIMESTAMP_ID:
+                cluster_timestamp = _read_uint(
+                    _read_exactly(self._handle, size)
+                )
+            elif element_id in {SIMPLE_BLOCK_ID, BLOCK_GROUP_ID}:
+                block = self._read_block_element(
+                    track, element_id, size, cluster_timestamp
+                )
+                if block:
+                    yield block
+            position += header_size + size
+        self._unknown_size_end = position
+
+    def _read_block_element(
+        self,
+        track: MatroskaTrack,
+        element_id: int,
+        size: int,
+        cluster_timestamp: int,
+    ) -> Optional[MatroskaBlock]:
+        if element_id == SIMPLE_BLOCK_ID:
+            return self._read_block(track, size, cluster_timestamp, None)
+        if element_id != BLOCK_GROUP_ID:
+            return None
+
+        end = self._handle.tell() + size
+        block_position: Optional[tuple[int, int]] = None
+        duration: Optional[int] = None
+        while self._handle.tell() < end:
+            child_id, child_size, _header_size = self._read_element_header()
+            if child_id == BLOCK_ID:
+                block_position = (self._handle.tell(), child_size)
+                self._handle.seek(child_size, io.SEEK_CUR)
+            elif child_id == BLOCK_DURATION_ID:
+                duration = _read_uint(_read_exactly(self._handle, child_size))
+            else:
+                self._handle.seek(child_size, io.SEEK_CUR)
+        if not block_position:
+            return None
+        self._handle.seek(block_position[0])
+        return self._read_block(
+            track, block_position[1], cluster_timestamp, duration
+        )
+
+    def _read_block(
+        self,
+        track: MatroskaTrack,
+        size: int,
+        cluster_timestamp: int,
+        duration: Optional[int],
+    ) -> Optional[MatroskaBlock]:
+        start = self._handle.tell()
+        track_number, track_number_size = _read_vint(
+            self._handle, keep_marker=False
+        )
+        if track_number != track.number:
+            # skip other tracks' data without reading it
+            self._handle.seek(start + size)
+            return None
+        relative_timestamp, flags = struct.unpack(
+            ">hB", _read_exactly(self._handle, 3)
+        )
+        if flags & 0x06:
+            raise MatroskaError("laced subtitle blocks are not supported")
+        data = _read_exactly(self._handle, size - track_number_size - 3)
+        return MatroskaBlock(
+            track_number=track_number,
+            timestamp=self._scale(cluster_timestamp + relative_timestamp),
+            duration=self._scale(duration) if duration is not None else None,
+            data=self._decompress(track, data, SCOPE_BLOCKS),
+        )
+
+    def _scale(self, timestamp: int) -> int:
+        return round(timestamp * self.timestamp_scale / 1000000)
+
+    def _read_element_header(self) -> tuple[int, int, int]:
+        element_id, id_size = _read_vint(self._handle, keep_marker=True)
+        size, size_size = _read_vint(self._handle, keep_marker=False)
+        return (element_id, size, id_size + size_size)
+
+    def _iter_children_at(self, position: int) -> Iterator[tuple[int, bytes]]:
+        self._handle.seek(position)
+        _element_id, size, _header_size = self._read_element_header()
+        if size == UNKNOWN_SIZE:
+            raise MatroskaError(
+                "unknown-size metadata elements are unsupported"
+            )
+        data = _read_exactly(self._handle, size)
+        yield from self._iter_children(io.BytesIO(data), len(data))
+
+    @staticmethod
+    def _iter_children(
+        handle: BinaryIO, size: int
+    ) -> Iterator[tuple[int, bytes]]:
+        while handle.tell() < size:
+            element_id, _id_size = _read_vint(handle, keep_marker=True)
+            child_size, _size_size = _read_vint(handle, keep_marker=False)
+            yield (element_id, _read_exactly(handle, child_size))
+
+
+def _format_time(milliseconds: int) -> str:
+    centiseconds = round(max(milliseconds, 0) / 10)
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    seconds, centiseconds = divmod(centiseconds, 100)
+    return f"{hours}:{minutes:02d}:{seconds:02d}.{centiseconds:02d}"
+
+
+def read_matroska_ass(path: Path) -> bytes:
+    with MatroskaReader(path) as reader:
+        return reader.read_ass()
+
+
+def read_matroska_attachments(path: Path) -> list[MatroskaAttachment]:
+    with MatroskaReader(path) as reader:
+        return reader.get_attachments()
@@ -0,0 +1,165 @@
+import bisect
+import cProfile
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, TypeVar
+
+from ass_parser import AssEvent
+
+# upper bounds of the per-event latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS = (0.1, 1.0, 10.0, 100.0, 1000.0)
+
+TItem = TypeVar("TItem")
+
+
+def format_bucket(idx: int) -> str:
+    if idx < len(HISTOGRAM_BUCKETS):
+        return f"<{HISTOGRAM_BUCKETS[idx]:g}ms"
+    return f">={HISTOGRAM_BUCKETS[-1]:g}ms"
+
+
+@dataclass
+class CheckProfile:
+    name: str
+    construction_time: float = 0.0
+    run_time: float = 0.0
+    event_times: list[tuple[float, Optional[int]]] = field(
+        default_factory=list
+    )
+
+    @property
+    def total_time(self) -> float:
+        return self.construction_time + self.run_time
+
+    @contextmanager
+    def measure_event(self, event: AssEvent) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.event_times.append(
+                (time.perf_counter() - start, event.number)
+            )
+
+    @contextmanager
+    def measure_events(self, events: list[AssEvent]) -> Iterator[None]:
+        # events checked together share the time equally
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - start) / max(1, len(events))
+            self.event_times.extend(
+                (duration, event.number) for event in events
+            )
+
+    def get_histogram(self) -> list[int]:
+        histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        for duration, _number in self.event_times:
+            histogram[bisect.bisect(HISTOGRAM_BUCKETS, duration * 1000)] += 1
+        return histogram
+
+    def get_slowest_events(self, count: int) -> list[tuple[float, int]]:
+        return sorted(self.event_times, key=lambda item: -item[0])[:count]
+
+
+class Profiler:
+    def __init__(
+        self,
+        slowest_count: int = 5,
+        cprofile_check: Optional[str] = None,
+        cprofile_dir: Path = Path("."),
+    ) -> None:
+        self.slowest_count = slowest_count
+        self.cprofile_check = cprofile_check
+        self.cprofile_dir = cprofile_dir
+        self.profiles: list[CheckProfile] = []
+        self._cprofiles: dict[str, cProfile.Profile] = {}
+
+    def create_profile(self, name: str) -> CheckProfile:
+        profile = CheckProfile(name=name)
+        self.profiles.append(profile)
+        if name == self.cprofile_check:
+            self._cprofiles[name] = cProfile.Profile()
+        return profile
+
+    @contextmanager
+    def _cprofile(self, profile: CheckProfile) -> Iterator[None]:
+        cprofile = self._cprofiles.get(profile.name)
+        if cprofile:
+            cprofile.enable()
+        try:
+            yield
+        finally:
+            if cprofile:
+                cprofile.disable()
+
+    @contextmanager
+    def measure_construction(self, profile: CheckProfile) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            with self._cprofile(profile):
+                yield
+        finally:
+            profile.construction_time += time.perf_counter() - start
+
+    async def measure_run(
+        self, profile: CheckProfile, results: AsyncIterator[TItem]
+    ) -> AsyncIterator[TItem]:
+        """Time only the work done inside the check, excluding whatever the
+        consumer does between the results.
+        """
+        iterator = results.__aiter__()
+        while True:
+            start = time.perf_counter()
+            try:
+                with self._cprofile(profile):
+                    result = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                profile.run_time += time.perf_counter() - start
+            yield result
+
+    def dump_cprofiles(self) -> list[Path]:
+        paths = []
+        for name, cprofile in self._cprofiles.items():
+            path = self.cprofile_dir / f"{name}.prof"
+            cprofile.dump_stats(str(path))
+            paths.append(path)
+        return paths
+
+    def format_summary(self) -> str:
+        header = (
+            f"{'check':<28} {'init ms':>9} {'run ms':>10} {'events':>7} "
+            + " ".join(
+                f"{format_bucket(idx):>8}"
+                for idx in range(len(HISTOGRAM_BUCKETS) + 1)
+            )
+        )
+        lines = ["Profile summary:", header, "-" * len(header)]
+        profiles = sorted(self.profiles, key=lambda p: -p.total_time)
+        for profile in profiles:
+            lines.append(
+                f"{profile.name:<28} "
+                f"{profile.construction_time * 1000:>9.2f} "
+                f"{profile.run_time * 1000:>10.2f} "
+                f"{len(profile.event_times):>7} "
+                + " ".join(f"{count:>8}" for count in profile.get_histogram())
+            )
+
+        for profile in profiles:
+            slowest = profile.get_slowest_events(self.slowest_count)
+            if not slowest:
+                continue
+            lines.append(
+                f"Slowest events for {profile.name}: "
+                + ", ".join(
+                    f"#{number or '?'} ({duration * 1000:.2f} ms)"
+                    for duration, number in slowest
+                )
+            )
+        return "\n".join(lines)
@@ -0,0 +1,237 @@
+import io
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from ass_parser import (
+    AssEvent,
+    AssEventList,
+    AssFile,
+    AssKeyValueMapping,
+    AssStringTable,
+    CorruptAssLineError,
+)
+from ass_parser.ass_sections.const import (
+    EVENTS_SECTION_NAME,
+    SCRIPT_INFO_SECTION_NAME,
+    SECTION_HEADING_RE,
+    STYLES_SECTION_NAME,
+)
+
+from ass_lint.attachments import (
+    ATTACHMENT_NAME_KEYS,
+    ATTACHMENT_SECTION_NAMES,
+    AssAttachment,
+    AssAttachmentSection,
+    AttachmentSource,
+)
+from ass_lint.matroska import is_matroska_path, read_matroska_ass
+
+MIN_CHUNK_SIZE = 256
+MAX_CHUNK_SIZE = 16384
+
+
+class _EventCollector(AssEventList):
+    """Event list that only collects the parsed events, so that they can be
+    moved to the final list in bulk rather than one by one.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.collected: list[AssEvent] = []
+
+    def append(self, value: AssEvent) -> None:
+        self.collected.append(value)
+
+
+class AssReader:
+    """Incremental ASS reader.
+
+    Reads the sections preceding [Events] first, then parses the events
+    lazily in chunks of growing size, so that the checks can start before the
+    whole file is read. Sections following [Events] are consumed once all the
+    events are read.
+
+    Matroska files are read too, the ASS file being rebuilt from the
+    subtitle track.
+    """
+
+    def __init__(self, path: Path, data: Optional[bytes] = None) -> None:
+        self.path = path
+        # contents to parse instead of the file, such as an older revision
+        self.data = data
+        self.ass_file = AssFile()
+        self._line_end = 0
+        self._lines = self._read_lines()
+        self._pending_heading: Optional[tuple[int, str]] = None
+        self._in_events = False
+
+    def read(self) -> AssFile:
+        self.read_header()
+        for _chunk in self.iter_event_chunks():
+            pass
+        return self.ass_file
+
+    def read_header(self) -> AssFile:
+        while heading := self._next_heading():
+            if self._get_section_name(heading) == EVENTS_SECTION_NAME:
+                self._in_events = True
+                break
+            self._read_section(heading)
+        return self.ass_file
+
+    def iter_event_chunks(self) -> Iterator[list[AssEvent]]:
+        if self._in_events:
+            yield from self._read_events()
+            self._in_events = False
+        while heading := self._next_heading():
+            if self._get_section_name(heading) == EVENTS_SECTION_NAME:
+                yield from self._read_events()
+            else:
+                self._read_section(heading)
+
+    def _open(self) -> BinaryIO:
+        if self.data is None and is_matroska_path(self.path):
+            self.data = read_matroska_ass(self.path)
+        if self.data is not None:
+            return io.BytesIO(self.data)
+        return self.path.open("rb")
+
+    def _read_lines(self) -> Iterator[tuple[int, str]]:
+        with self._open() as handle:
+            for line_num, raw_line in enumerate(handle, start=1):
+                # where the attachments end
+                self._line_end += len(raw_line)
+                line = raw_line.decode("utf-8")
+                if line.startswith("\N{BOM}"):
+                    line = line[len("\N{BOM}") :]
+                line = line.strip()
+                if line:
+                    yield (line_num, line)
+
+    def _next_heading(self) -> Optional[tuple[int, str]]:
+        if self._pending_heading:
+            heading, self._pending_heading = self._pending_heading, None
+            return heading
+        for line_num, line in self._lines:
+            if line.startswith(";"):
+                continue
+            if SECTION_HEADING_RE.match(line):
+                return (line_num, line)
+            raise CorruptAssLineError(line_num, line, "expected a section")
+        return None
+
+    def _read_section_body(
+        self, keep_comments: bool = False
+    ) -> Iterator[tuple[int, str]]:
+        for line_num, line in self._lines:
+            if SECTION_HEADING_RE.match(line):
+                self._pending_heading = (line_num, line)
+                return
+            if keep_comments or not line.startswith(";"):
+                yield (line_num, line)
+
+    @staticmethod
+    def _get_section_name(heading: tuple[int, str]) -> str:
+        return SECTION_HEADING_RE.match(heading[1]).group("section_name")
+
+    def _read_section(self, heading: tuple[int, str]) -> None:
+        name = self._get_section_name(heading)
+        if name in ATTACHMENT_SECTION_NAMES:
+            section = AssAttachmentSection(name=name)
+            section.attachments.extend(self._read_attachments(name))
+            self.ass_file.extra_sections.append(section)
+            return
+
+        lines = [heading, *self._read_section_body()]
+        if name == STYLES_SECTION_NAME:
+            self.ass_file.styles.consume_ass_lines(lines)
+        elif name == SCRIPT_INFO_SECTION_NAME:
+            self.ass_file.script_info.consume_ass_lines(lines)
+        elif any(line.startswith("Format:") for _num, line in lines):
+            section = AssStringTable(name=name)
+            section.consume_ass_lines(lines)
+            self.ass_file.extra_sections.append(section)
+        else:
+            section = AssKeyValueMapping(name=name)
+            section.consume_ass_lines(lines)
+            self.ass_file.extra_sections.append(section)
+
+    def _read_attachments(self, section_name: str) -> Iterator[AssAttachment]:
+        """Find the attachments of a [Fonts] or [Graphics] section, leaving
+        their encoded lines in the file until they're needed.
+        """
+        name_key = ATTACHMENT_NAME_KEYS[section_name]
+        attachment: Optional[AssAttachment] = None
+        # encoded attachment lines might start with a semicolon
+        for _line_num, line in self._read_section_body(keep_comments=True):
+            if line.startswith(f"{name_key}:"):
+                if attachment:
+                    yield attachment
+                attachment = AssAttachment(
+                    name=line.split(":", 1)[1].strip(),
+                    section_name=section_name,
+                    source=AttachmentSource(
+                        path=self.path,
+                        start=self._line_end,
+                        end=self._line_end,
+                        data=self.data,
+                    ),
+                )
+            elif attachment:
+                attachment.source.end = self._line_end
+        if attachment:
+            yield attachment
+
+    def _read_events(self) -> Iterator[list[AssEvent]]:
+        body = self._read_section_body()
+        field_names: Optional[list[str]] = None
+        collector = _EventCollector()
+        chunk_size = MIN_CHUNK_SIZE
+
+        for line_num, line in body:
+            try:
+                item_type, rest = line.split(":", 1)
+            except ValueError as exc:
+                raise CorruptAssLineError(
+                    line_num, line, "expected a colon"
+                ) from exc
+
+            if field_names is None:
+                if item_type != "Format":
+                    raise CorruptAssLineError(
+                        line_num,
+                        line,
+                        'expected the table header to be named "Format"',
+                    )
+                field_names = [p.strip() for p in rest.strip().split(",")]
+                continue
+
+            field_values = rest.strip().split(",", len(field_names) - 1)
+            if len(field_names) != len(field_values):
+                raise CorruptAssLineError(
+                    line_num, line, f"expected {len(field_names)} values"
+                )
+            try:
+                collector.consume_ass_table_row(
+                    item_type, dict(zip(field_names, field_values))
+                )
+            except (ValueError, IndexError) as exc:
+                raise CorruptAssLineError(line_num, line, str(exc)) from exc
+
+            if len(collector.collected) >= chunk_size:
+                yield self._flush_events(collector)
+                chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+
+        if collector.collected:
+            yield self._flush_events(collector)
+
+    def _flush_events(self, collector: _EventCollector) -> list[AssEvent]:
+        chunk = collector.collected
+        collector.collected = []
+        self.ass_file.events.extend(chunk)
+        return chunk
+
+
+def read_ass(path: Path) -> AssFile:
+    return AssReader(path).read()
@@ -0,0 +1,97 @@
+import asyncio
+import queue
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from copy import copy
+from typing import TYPE_CHECKING
+
+from ass_parser import AssEvent, AssFile
+
+from ass_lint.util import (
+    make_metrics_only_style,
+    measure_frame_size,
+    strip_raster_only_tags,
+)
+
+if TYPE_CHECKING:
+    from ass_renderer import AssRenderer
+
+
+class RendererPool:
+    """Pool of renderers that can measure events in parallel.
+
+    Each renderer is only ever used by one thread at a time, as measuring an
+    event replaces the renderer's source; what the pool saves is setting up
+    libass and its fonts for each measurement. libass is called through
+    ctypes, which releases the GIL, so the measurements run in worker
+    threads.
+
+    In the metrics-only mode borders, shadows and the blur of the borders
+    are disabled, so that libass rasterises just the glyph fill that the
+    measurements look at.
+    """
+
+    def __init__(
+        self,
+        ass_file: AssFile,
+        video_resolution: tuple[int, int],
+        workers: int = 1,
+        metrics_only: bool = True,
+    ) -> None:
+        self.video_resolution = video_resolution
+        self.workers = max(1, workers)
+        self.metrics_only = metrics_only
+        self._outlines = {
+            style.name: style.outline for style in ass_file.styles
+        }
+        self._styles_file = AssFile()
+        self._styles_file.styles[:] = [
+            make_metrics_only_style(style) if metrics_only else copy(style)
+            for style in ass_file.styles
+        ]
+        self._styles_file.script_info.update(ass_file.script_info)
+        self._renderers: queue.LifoQueue["AssRenderer"] = queue.LifoQueue()
+        self._executor = ThreadPoolExecutor(
+            self.workers, thread_name_prefix="renderer"
+        )
+
+    @contextmanager
+    def checkout(self) -> Iterator["AssRenderer"]:
+        try:
+            renderer = self._renderers.get_nowait()
+        except queue.Empty:
+            renderer = self._create_renderer()
+        try:
+            yield renderer
+        finally:
+            self._renderers.put(renderer)
+
+    def measure_frame_size_sync(self, event: AssEvent) -> tuple[int, int]:
+        if self.metrics_only:
+            event = copy(event)
+            event.text = strip_raster_only_tags(
+                event.text, self._outlines.get(event.style_name, 0)
+            )
+        with self.checkout() as renderer:
+            return measure_frame_size(
+                renderer, self._styles_file, self.video_resolution, event
+            )
+
+    async def measure_frame_size(self, event: AssEvent) -> tuple[int, int]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.measure_frame_size_sync, event
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        while True:
+            try:
+                self._renderers.get_nowait()
+            except queue.Empty:
+                break
+
+    def _create_renderer(self) -> "AssRenderer":
+        from ass_renderer import AssRenderer
+
+        return AssRenderer()
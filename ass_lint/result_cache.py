@@ -0,0 +1,121 @@
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Optional
+
+from ass_lint.cache import DiskCache, get_file_identity, make_cache_key
+from ass_lint.common import BaseCheck, BaseResult, CheckContext
+from ass_lint.matroska import MatroskaError, MatroskaReader, is_matroska_path
+from ass_lint.scheduler import RESULT_CLASSES
+
+# bump whenever the cached entries change their format
+RESULT_CACHE_FORMAT = 1
+
+
+def get_ass_lint_version() -> str:
+    try:
+        return metadata.version("ass_lint")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def get_content_key(path: Path) -> Any:
+    # Matroska files are too large to hash, so hash what the checks read out
+    # of them instead: the script and the attachments
+    if is_matroska_path(path):
+        try:
+            with MatroskaReader(path) as reader:
+                return make_cache_key(
+                    reader.read_ass(),
+                    *(
+                        make_cache_key(attachment.name, attachment.data)
+                        for attachment in reader.get_attachments()
+                    ),
+                )
+        except MatroskaError:
+            return get_file_identity(path)
+    return make_cache_key(path.read_bytes())
+
+
+def get_result_cache_key(
+    ctx: CheckContext, checks: list[type[BaseCheck]], *options: Any
+) -> str:
+    """Compute the key of a file's results.
+
+    :param ctx: context holding at least the file's headers
+    :param checks: selected checks
+    :param options: options affecting how the results are reported
+    :return: cache key
+    """
+    return make_cache_key(
+        RESULT_CACHE_FORMAT,
+        get_ass_lint_version(),
+        get_content_key(ctx.subs_path),
+        ctx.config,
+        ctx.diff.get_key() if ctx.diff else None,
+        (
+            (ctx.sample_fraction, ctx.sample_seed)
+            if ctx.sample_fraction
+            else None
+        ),
+        [
+            (
+                f"{check_cls.__module__}.{check_cls.__qualname__}",
+                check_cls.version,
+                check_cls.get_external_inputs(ctx),
+            )
+            for check_cls in checks
+        ],
+        *options,
+    )
+
+
+class ResultCache:
+    """Final results of whole files, as reported."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self._cache = DiskCache("results", cache_dir)
+
+    def get(self, key: str) -> Optional[list[BaseResult]]:
+        serialized_results = self._cache.get(key)
+        if serialized_results is None:
+            return None
+        return [
+            RESULT_CLASSES[class_name](text)
+            for class_name, text in serialized_results
+        ]
+
+    def set(self, key: str, results: list[BaseResult]) -> None:
+        self._cache.set(
+            key, [(type(result).__name__, repr(result)) for result in results]
+        )
+
+    def close(self) -> None:
+        self._cache.close()
+
+
+class WarningCounter(logging.Filter):
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            self.count += 1
+        return True
+
+
+@contextmanager
+def count_warnings() -> Iterator[WarningCounter]:
+    """Count the warnings logged in the meantime, as that's how failing
+    checks are reported, so that incomplete results don't get cached.
+    """
+    counter = WarningCounter()
+    logger = logging.getLogger()
+    logger.addFilter(counter)
+    try:
+        yield counter
+    finally:
+        logger.removeFilter(counter)
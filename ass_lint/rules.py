@@ -0,0 +1,191 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import regex
+
+from ass_lint import guarded_re
+from ass_lint.config import ConfigError, tomllib
+from ass_lint.event_flags import ACTOR_CATEGORIES, EventFlag
+
+RULE_CATEGORIES = {**ACTOR_CATEGORIES, "dialog": EventFlag.DIALOG}
+RULE_LEVELS = ("warning", "info", "debug")
+# rules combined into a single alternation; a hit only tells that some of
+# them might match, so smaller groups mean fewer rules to try afterwards
+MAX_GROUP_SIZE = 64
+
+GLOBAL_FLAGS_RE = regex.compile(r"^\(\?([a-zA-Z]+)\)")
+# group references get renumbered or clash once combined
+GROUP_REFERENCE_RE = regex.compile(r"\\[1-9g]|\(\?P?<(?![=!])|\(\?P=")
+# flags past the start would apply to the rules that follow, and so would
+# the version flags; the recursive calls refer to groups as well
+INLINE_FLAGS_RE = regex.compile(r"\(\?[-a-zA-Z0-9]+\)")
+
+
+@dataclass(frozen=True)
+class Rule:
+    pattern: str
+    message: str
+    level: str = "warning"
+    # event categories the rule applies to, all if empty
+    categories: frozenset[str] = frozenset()
+    # language prefixes the rule applies to, e.g. "en" or "pt_BR", all if
+    # empty
+    languages: tuple[str, ...] = ()
+
+    @property
+    def category_flags(self) -> EventFlag:
+        flags = EventFlag(0)
+        for category in self.categories or RULE_CATEGORIES:
+            flags |= RULE_CATEGORIES[category]
+        return flags
+
+    def applies_to_language(self, language: str) -> bool:
+        return not self.languages or any(
+            language.lower().startswith(prefix.lower())
+            for prefix in self.languages
+        )
+
+
+def parse_rule(data: Any, source: str) -> Rule:
+    if not isinstance(data, dict):
+        raise ConfigError(f"{source}: a rule must be a table")
+    pattern = data.get("pattern")
+    message = data.get("message")
+    if not isinstance(pattern, str) or not isinstance(message, str):
+        raise ConfigError(f"{source}: a rule needs a pattern and a message")
+    try:
+        regex.compile(pattern)
+    except regex.error as ex:
+        raise ConfigError(f"{source}: bad pattern {pattern!r} ({ex})") from ex
+
+    level = data.get("level", "warning")
+    if level not in RULE_LEVELS:
+        raise ConfigError(f"{source}: unknown level: {level}")
+    categories = data.get("categories", [])
+    if not isinstance(categories, list) or not all(
+        category in RULE_CATEGORIES for category in categories
+    ):
+        raise ConfigError(
+            f"{source}: categories must be a list of "
+            + ", ".join(RULE_CATEGORIES)
+        )
+    languages = data.get("languages", [])
+    if isinstance(languages, str):
+        languages = [languages]
+    if not isinstance(languages, list) or not all(
+        isinstance(language, str) for language in languages
+    ):
+        raise ConfigError(f"{source}: languages must be a list of strings")
+    return Rule(
+        pattern=pattern,
+        message=message,
+        level=level,
+        categories=frozenset(categories),
+        languages=tuple(languages),
+    )
+
+
+def load_rule_pack(path: Path) -> list[Rule]:
+    """Load a TOML rule pack, with each rule in its own [[rule]] table.
+
+    :param path: path to the rule pack
+    :return: the rules in the order of the file
+    """
+    if tomllib is None:
+        raise ConfigError(
+            f"can't read {path}, install tomli package to read TOML files"
+        )
+    try:
+        with path.open("rb") as handle:
+            data = tomllib.load(handle)
+    except (OSError, tomllib.TOMLDecodeError) as ex:
+        raise ConfigError(f"can't read {path} ({ex})") from ex
+    rules = data.get("rule", [])
+    if not isinstance(rules, list):
+        raise ConfigError(f"{path}: rule must be an array of tables")
+    return [
+        parse_rule(rule, f"{path}, rule {i}")
+        for i, rule in enumerate(rules, start=1)
+    ]
+
+
+def is_combinable(pattern: str) -> bool:
+    if GROUP_REFERENCE_RE.search(pattern):
+        return False
+    rest = pattern
+    if match := GLOBAL_FLAGS_RE.match(pattern):
+        # a trailing comment would comment out the closing parenthesis
+        if "x" in match.group(1):
+            return False
+        rest = pattern[match.end() :]
+    return not INLINE_FLAGS_RE.search(rest)
+
+
+def get_combinable_pattern(pattern: str) -> str:
+    # flags at the start of a pattern would apply to all the alternatives
+    if match := GLOBAL_FLAGS_RE.match(pattern):
+        return f"(?{match.group(1)}:{pattern[match.end():]})"
+    return f"(?:{pattern})"
+
+
+class RuleMatcher:
+    """Runs many rules over texts at roughly the cost of a few.
+
+    The rules are combined into alternations, each serving as a prefilter:
+    the rules of a group only run for texts the group's alternation found
+    something in, which most texts don't.
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self.rules = list(rules)
+        self.patterns = [regex.compile(rule.pattern) for rule in self.rules]
+        self.category_flags = [rule.category_flags for rule in self.rules]
+        self.groups: list[tuple[regex.Pattern, list[int]]] = []
+        # rules that can't be combined run for every text
+        self.standalone: list[int] = []
+
+        combinable = []
+        for idx, rule in enumerate(self.rules):
+            if is_combinable(rule.pattern):
+                combinable.append(idx)
+            else:
+                self.standalone.append(idx)
+        for start in range(0, len(combinable), MAX_GROUP_SIZE):
+            indices = combinable[start : start + MAX_GROUP_SIZE]
+            try:
+                group_pattern = regex.compile(
+                    "|".join(
+                        get_combinable_pattern(self.rules[idx].pattern)
+                        for idx in indices
+                    )
+                )
+            except regex.error:
+                self.standalone.extend(indices)
+            else:
+                self.groups.append((group_pattern, indices))
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def find_matches(
+        self, text: str, flags: Optional[EventFlag] = None
+    ) -> Iterator[tuple[Rule, str]]:
+        """Find the rules matching given text.
+
+        :param text: text to match
+        :param flags: flags of the event the text comes from, to pick the
+            rules applying to its category
+        :return: the matching rules, in their original order, along with the
+            first matched text of each
+        """
+        candidates = list(self.standalone)
+        for group_pattern, indices in self.groups:
+            if guarded_re.search(group_pattern, text):
+                candidates.extend(indices)
+        for idx in sorted(candidates):
+            if flags is not None and not flags & self.category_flags[idx]:
+                continue
+            if match := guarded_re.search(self.patterns[idx], text):
+                yield (self.rules[idx], match.group(0))
@@ -0,0 +1,78 @@
+import math
+import random
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from ass_parser import AssEvent
+
+from ass_lint.event_flags import EventClassifier, EventFlag
+
+CATEGORY_FLAGS = (
+    EventFlag.SIGN
+    | EventFlag.TITLE
+    | EventFlag.KARAOKE
+    | EventFlag.CREDITS
+    | EventFlag.DIALOG
+)
+
+
+@dataclass
+class EventSample:
+    """Stratified sample of the events, for quick runs of the expensive
+    checks.
+    """
+
+    # number of events the sample was drawn from
+    population: int = 0
+    # indices of the sampled events, each mapped to how many events of its
+    # stratum it stands for
+    weights: dict[int, float] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def __contains__(self, idx: int) -> bool:
+        return idx in self.weights
+
+    def get_weight(self, idx: int) -> float:
+        return self.weights.get(idx, 1.0)
+
+
+def get_stratum_key(event: AssEvent, flags: EventFlag) -> tuple[str, int]:
+    return (event.style_name, int(flags & CATEGORY_FLAGS))
+
+
+def sample_events(
+    events: Iterable[AssEvent],
+    classifier: EventClassifier,
+    fraction: float,
+    seed: int = 0,
+) -> EventSample:
+    """Draw the same fraction of the events of each style and actor
+    category, skipping the comments.
+
+    Each stratum gets its own generator seeded with its key, so that edits
+    in one stratum don't reshuffle the others.
+
+    :param events: events to sample
+    :param classifier: flags of the events
+    :param fraction: portion of each stratum to draw, at least one event
+    :param seed: seed of the sample
+    :return: the sample
+    """
+    strata: dict[tuple[str, int], list[int]] = defaultdict(list)
+    for event in events:
+        flags = classifier.get(event)
+        if not flags & EventFlag.COMMENT:
+            strata[get_stratum_key(event, flags)].append(event.index)
+
+    sample = EventSample(
+        population=sum(len(indices) for indices in strata.values())
+    )
+    for key, indices in strata.items():
+        count = min(len(indices), max(1, math.ceil(len(indices) * fraction)))
+        rng = random.Random(f"{seed}:{key[0]}:{key[1]}")
+        for idx in rng.sample(indices, count):
+            sample.weights[idx] = len(indices) / count
+    return sample
@@ -0,0 +1,288 @@
+import asyncio
+import enum
+import importlib
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from contextlib import ExitStack, nullcontext
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from ass_parser import AssFile
+
+from ass_lint.common import (
+    BaseCheck,
+    BaseResult,
+    CheckContext,
+    DebugInformation,
+    ExecutionMode,
+    Information,
+    Skipped,
+    TimedOut,
+    Violation,
+    get_result_sort_key,
+)
+from ass_lint.profiler import CheckProfile, Profiler
+from ass_lint.util import benchmark
+
+RESULT_CLASSES = {
+    cls.__name__: cls
+    for cls in (DebugInformation, Information, Violation, Skipped, TimedOut)
+}
+
+SerializedResult = tuple[str, str, Optional[list[int]]]
+
+
+class ResultOrder(enum.Enum):
+    check = "check"
+    event = "event"
+
+
+@dataclass
+class TimeBudget:
+    """Wall-clock limits within which the checks stop at the next event
+    and report what they found so far.
+    """
+
+    # seconds each check may take
+    per_check: Optional[float] = None
+    # time.time() by which all the checks should stop
+    deadline: Optional[float] = None
+
+    def get_check_deadline(self) -> Optional[float]:
+        deadlines = [self.deadline]
+        if self.per_check is not None:
+            deadlines.append(time.time() + self.per_check)
+        return min(
+            (deadline for deadline in deadlines if deadline is not None),
+            default=None,
+        )
+
+
+def construct_check(
+    ctx: CheckContext,
+    check_cls: type[BaseCheck],
+    profiler: Optional[Profiler],
+) -> Optional[BaseCheck]:
+    profile = profiler.create_profile(check_cls.__name__) if profiler else None
+    try:
+        with (
+            profiler.measure_construction(profile)
+            if profile
+            else nullcontext()
+        ):
+            check = check_cls(ctx)
+    except Exception as ex:
+        logging.warning(ex)
+        return None
+    check.profile = profile
+    return check
+
+
+async def collect_results(
+    ctx: CheckContext,
+    check_cls: type[BaseCheck],
+    profiler: Optional[Profiler],
+    time_budget: Optional[TimeBudget] = None,
+) -> list[BaseResult]:
+    deadline = time_budget.get_check_deadline() if time_budget else None
+    check = construct_check(ctx, check_cls, profiler)
+    if not check:
+        return []
+    check.deadline = deadline
+    results = check.run()
+    if profiler and check.profile:
+        results = profiler.measure_run(check.profile, results)
+    ret = [result async for result in results]
+    if timeout_result := check.get_timeout_result():
+        ret.append(timeout_result)
+    return ret
+
+
+def collect_results_in_thread(
+    ctx: CheckContext,
+    check_cls: type[BaseCheck],
+    profiler: Optional[Profiler],
+    time_budget: Optional[TimeBudget] = None,
+) -> list[BaseResult]:
+    return asyncio.run(collect_results(ctx, check_cls, profiler, time_budget))
+
+
+def serialize_result(result: BaseResult) -> SerializedResult:
+    return (
+        type(result).__name__,
+        result.text,
+        [event.index for event in result.events] if result.events else None,
+    )
+
+
+def deserialize_result(
+    ctx: CheckContext, serialized_result: SerializedResult
+) -> BaseResult:
+    class_name, text, indices = serialized_result
+    return RESULT_CLASSES[class_name](
+        text,
+        (
+            [ctx.ass_file.events[idx] for idx in indices]
+            if indices is not None
+            else None
+        ),
+    )
+
+
+def collect_results_in_process(
+    context_factory: Callable[..., CheckContext],
+    ass_file: AssFile,
+    check_module: str,
+    check_name: str,
+    profiler_options: Optional[dict[str, Any]],
+    time_budget: Optional[TimeBudget] = None,
+) -> tuple[list[SerializedResult], list[CheckProfile]]:
+    check_cls = getattr(importlib.import_module(check_module), check_name)
+    profiler = Profiler(**profiler_options) if profiler_options else None
+    # the file comes parsed already, rather than read again by each worker
+    ctx = context_factory(ass_file=ass_file)
+    try:
+        results = collect_results_in_thread(
+            ctx, check_cls, profiler, time_budget
+        )
+    finally:
+        ctx.close()
+    if profiler:
+        profiler.dump_cprofiles()
+    return (
+        [serialize_result(result) for result in results],
+        profiler.profiles if profiler else [],
+    )
+
+
+class Scheduler:
+    """Runs independent checks concurrently.
+
+    Each check runs in the event loop, in a thread or in a separate process,
+    depending on its execution mode. The results are merged back into a
+    deterministic order regardless of which check finishes first.
+    """
+
+    def __init__(
+        self,
+        ctx: CheckContext,
+        context_factory: Callable[..., CheckContext],
+        jobs: int = 1,
+        order: ResultOrder = ResultOrder.check,
+        profiler: Optional[Profiler] = None,
+        time_budget: Optional[TimeBudget] = None,
+    ) -> None:
+        self.ctx = ctx
+        self.context_factory = context_factory
+        self.jobs = max(1, jobs)
+        self.order = order
+        self.profiler = profiler
+        self.time_budget = time_budget
+
+    async def run(
+        self, checks: list[type[BaseCheck]]
+    ) -> AsyncIterator[BaseResult]:
+        semaphore = asyncio.Semaphore(self.jobs)
+
+        with ExitStack() as stack:
+            executors: dict[ExecutionMode, Executor] = {}
+            modes = {check_cls.execution_mode for check_cls in checks}
+            if ExecutionMode.thread in modes:
+                executors[ExecutionMode.thread] = stack.enter_context(
+                    ThreadPoolExecutor(self.jobs)
+                )
+            if ExecutionMode.process in modes:
+                executors[ExecutionMode.process] = stack.enter_context(
+                    ProcessPoolExecutor(self.jobs)
+                )
+
+            # start the offloaded checks first so that they don't wait for
+            # the ones occupying the event loop
+            tasks: dict[int, asyncio.Task] = {}
+            for idx in sorted(
+                range(len(checks)),
+                key=lambda idx: checks[idx].execution_mode
+                == ExecutionMode.event_loop,
+            ):
+                tasks[idx] = asyncio.create_task(
+                    self._run_check(checks[idx], semaphore, executors)
+                )
+
+            if self.order == ResultOrder.check:
+                for idx in range(len(checks)):
+                    for result in await tasks[idx]:
+                        yield result
+            else:
+                results = []
+                for idx in range(len(checks)):
+                    results.extend(await tasks[idx])
+                for result in sorted(results, key=get_result_sort_key):
+                    yield result
+
+    async def _run_check(
+        self,
+        check_cls: type[BaseCheck],
+        semaphore: asyncio.Semaphore,
+        executors: dict[ExecutionMode, Executor],
+    ) -> list[BaseResult]:
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            with benchmark(check_cls.__name__):
+                try:
+                    if check_cls.execution_mode == ExecutionMode.thread:
+                        return await loop.run_in_executor(
+                            executors[ExecutionMode.thread],
+                            collect_results_in_thread,
+                            self.ctx,
+                            check_cls,
+                            self.profiler,
+                            self.time_budget,
+                        )
+
+                    if check_cls.execution_mode == ExecutionMode.process:
+                        return await self._run_check_in_process(
+                            check_cls, executors[ExecutionMode.process]
+                        )
+
+                    return await collect_results(
+                        self.ctx, check_cls, self.profiler, self.time_budget
+                    )
+                except Exception as ex:
+                    logging.warning(f"{check_cls.__name__}: {ex}")
+                    return []
+
+    async def _run_check_in_process(
+        self, check_cls: type[BaseCheck], executor: Executor
+    ) -> list[BaseResult]:
+        profiler_options = None
+        if self.profiler:
+            profiler_options = {
+                "slowest_count": self.profiler.slowest_count,
+                "cprofile_check": self.profiler.cprofile_check,
+                "cprofile_dir": self.profiler.cprofile_dir,
+            }
+        (
+            serialized_results,
+            profiles,
+        ) = await asyncio.get_running_loop().run_in_executor(
+            executor,
+            collect_results_in_process,
+            self.context_factory,
+            self.ctx.ass_file,
+            check_cls.__module__,
+            check_cls.__name__,
+            profiler_options,
+            self.time_budget,
+        )
+        if self.profiler:
+            self.profiler.profiles.extend(profiles)
+        return [
+            deserialize_result(self.ctx, serialized_result)
+            for serialized_result in serialized_results
+        ]
@@ -0,0 +1,73 @@
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from ass_parser import AssEvent
+
+from ass_lint.event_flags import EventClassifier, EventFlag
+from ass_lint.util import count_plaintext_characters, get_plaintext
+
+PUNCTUATION_CHARS = "!…"
+
+
+@dataclass
+class FileStats:
+    """Aggregates of a whole file, gathered in a single pass over the events.
+
+    New aggregates belong here rather than in a separate pass of their own.
+    """
+
+    actors: Counter[str] = field(default_factory=Counter)
+    styles: Counter[str] = field(default_factory=Counter)
+    # ignores titles and karaoke
+    punctuation: Counter[str] = field(default_factory=Counter)
+    # the remaining ones ignore comments
+    style_durations: Counter[str] = field(default_factory=Counter)
+    style_characters: Counter[str] = field(default_factory=Counter)
+    on_screen_time: int = 0
+
+    def add_event(
+        self, event: AssEvent, flags: EventFlag, plaintext: str
+    ) -> None:
+        self.actors[event.actor] += 1
+        self.styles[event.style_name] += 1
+        if not flags & (EventFlag.TITLE | EventFlag.KARAOKE):
+            for char in PUNCTUATION_CHARS:
+                self.punctuation[char] += plaintext.count(char)
+        if not event.is_comment:
+            self.style_durations[event.style_name] += event.duration
+            self.style_characters[
+                event.style_name
+            ] += count_plaintext_characters(plaintext)
+
+
+def get_on_screen_time(intervals: Iterable[tuple[int, int]]) -> int:
+    """Sum the time covered by at least one of given intervals.
+
+    :param intervals: start and end of each interval
+    :return: the covered time
+    """
+    ret = 0
+    last_end = None
+    for start, end in sorted(intervals):
+        if last_end is not None and start < last_end:
+            start = last_end
+        if end > start:
+            ret += end - start
+            last_end = end
+    return ret
+
+
+def collect_stats(
+    events: Iterable[AssEvent], classifier: EventClassifier
+) -> FileStats:
+    stats = FileStats()
+    intervals = []
+    for event in events:
+        stats.add_event(
+            event, classifier.get(event), get_plaintext(event.text)
+        )
+        if not event.is_comment:
+            intervals.append((event.start, event.end))
+    stats.on_screen_time = get_on_screen_time(intervals)
+    return stats
@@ -3,17 +3,25 @@ from unittest.mock import Mock
 import pytest
 from ass_parser import AssEventList
 
+from ass_lint.event_flags import EventClassifier
+
 
 @pytest.fixture
 def context() -> Mock:
+    events = AssEventList()
     return Mock(
         ass_file=Mock(
-            events=AssEventList(),
+            events=events,
             script_info={
                 "PlayResX": 1280,
                 "PlayResY": 720,
             },
         ),
+        event_flags=EventClassifier(events),
+        diff=None,
+        sample_fraction=None,
         renderer=Mock(),
+        render_workers=1,
+        text_width=None,
         video_resolution=(1280, 720),
     )
@@ -4,6 +4,7 @@ import pytest
 from ass_parser import AssEvent
 
 from ass_lint.checks.durations import CheckDurations
+from ass_lint.event_table import EventTable
 
 
 @pytest.fixture(name="check_durations")
@@ -133,3 +134,39 @@ async def test_check_durations_good_gap(
         result async for result in check_durations.run_for_event(event1)
     ]
     assert len(results) == 0
+
+
+@pytest.mark.asyncio
+async def test_check_durations_whole_file(
+    check_durations: CheckDurations,
+) -> None:
+    events = [
+        AssEvent(start=0, end=100, text="test"),
+        AssEvent(start=200, end=400, text="test test test test"),
+        AssEvent(start=450, end=450, text="test", is_comment=True),
+        AssEvent(start=500, end=1000, text="{\\an8}"),
+        AssEvent(start=550, end=1000, text="test"),
+        AssEvent(start=1100, end=1500, text="test", actor="karaoke"),
+        AssEvent(start=1600, end=2000, text="test", actor="[karaoke]"),
+        AssEvent(start=2100, end=2500, text="test"),
+    ]
+    check_durations.ctx.ass_file.events.extend(events)
+    check_durations.ctx.event_table = EventTable.from_events(
+        check_durations.ctx.ass_file.events
+    )
+    check_durations.construct_event_map()
+    results = [repr(result) async for result in check_durations.run()]
+    assert results == [
+        "#1: duration shorter than 250 ms",
+        "#1+#2: gap shorter than 250 ms (100 ms)",
+        "#2: duration shorter than 500 ms",
+        "#2+#5: gap shorter than 250 ms (150 ms)",
+        "#5+#6: gap shorter than 250 ms (100 ms)",
+        "#7+#8: gap shorter than 250 ms (100 ms)",
+    ]
+    assert results == [
+        repr(result)
+        async for result in check_durations.run_for_events(
+            check_durations.ctx.ass_file.events
+        )
+    ]
@@ -0,0 +1,157 @@
+import json
+import threading
+import urllib.parse
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from ass_parser import AssEvent
+
+from ass_lint.cache import DiskCache
+from ass_lint.checks.grammar import CheckGrammar
+from ass_lint.common import MAX_TEXT_LENGTH
+
+
+class FakeLanguageToolHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        text = urllib.parse.parse_qs(body.decode(), keep_blank_values=True)[
+            "text"
+        ][0]
+        self.server.requests.append(text)
+        self.server.ports.add(self.client_address[1])
+
+        matches = []
+        start = 0
+        while (offset := text.find("teh", start)) != -1:
+            matches.append(
+                {
+                    "offset": offset,
+                    "length": 3,
+                    "replacements": [{"value": "the"}],
+                }
+            )
+            start = offset + 3
+
+        data = json.dumps(
+            {
+                "software": {"name": "Fake", "version": "1.0"},
+                "matches": matches,
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+@pytest.fixture(name="server")
+def fixture_server() -> Iterator[ThreadingHTTPServer]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeLanguageToolHandler)
+    server.requests = []
+    server.ports = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(name="check_grammar")
+def fixture_check_grammar(
+    context: Mock, server: ThreadingHTTPServer, tmp_path: Path
+) -> CheckGrammar:
+    context.grammar_server = f"http://127.0.0.1:{server.server_port}"
+    context.open_cache = lambda name: DiskCache(name, tmp_path)
+    context.language = "en_US"
+    return CheckGrammar(context=context)
+
+
+def add_events(check_grammar: CheckGrammar, texts: list[str]) -> None:
+    for text in texts:
+        check_grammar.ctx.ass_file.events.append(
+            AssEvent(start=0, end=1000, text=text)
+        )
+    check_grammar.construct_event_map()
+
+
+@pytest.mark.asyncio
+async def test_check_grammar(check_grammar: CheckGrammar) -> None:
+    add_events(check_grammar, ["This is teh line.", "This is fine."])
+    results = [result async for result in check_grammar.run()]
+    assert len(results) == 1
+    assert results[0].text == "suggested change: This is the line."
+    assert results[0].events[0].number == 1
+
+
+@pytest.mark.asyncio
+async def test_check_grammar_batching(
+    check_grammar: CheckGrammar, server: ThreadingHTTPServer
+) -> None:
+    add_events(check_grammar, [f"Line {i} has teh typo." for i in range(120)])
+    results = [result async for result in check_grammar.run()]
+    assert len(results) == 120
+    assert [result.events[0].number for result in results] == list(
+        range(1, 121)
+    )
+    # one request for the version, the rest are batches of 50 lines
+    assert len(server.requests) == 1 + 3
+    assert len(server.ports) <= check_grammar.backend.max_in_flight
+
+
+@pytest.mark.asyncio
+async def test_check_grammar_persistent_cache(
+    check_grammar: CheckGrammar, server: ThreadingHTTPServer
+) -> None:
+    add_events(check_grammar, ["This is teh line.", "This is fine."])
+    results1 = [result async for result in check_grammar.run()]
+    requests = len(server.requests)
+
+    check_grammar2 = CheckGrammar(context=check_grammar.ctx)
+    results2 = [result async for result in check_grammar2.run()]
+    assert [result.text for result in results1] == [
+        result.text for result in results2
+    ]
+    # only the version is queried
+    assert len(server.requests) == requests + 1
+
+
+@pytest.mark.asyncio
+async def test_check_grammar_ignores_comments(
+    check_grammar: CheckGrammar,
+) -> None:
+    check_grammar.ctx.ass_file.events.append(
+        AssEvent(start=0, end=1000, text="teh", is_comment=True)
+    )
+    check_grammar.construct_event_map()
+    results = [result async for result in check_grammar.run()]
+    assert not results
+
+
+@pytest.mark.asyncio
+async def test_check_grammar_skips_events(
+    check_grammar: CheckGrammar, server: ThreadingHTTPServer
+) -> None:
+    add_events(
+        check_grammar,
+        [
+            "This is teh line.",
+            "{\\p1}m 0 0 l 1 1{\\p0}",
+            "teh " * MAX_TEXT_LENGTH,
+        ],
+    )
+    results = [result async for result in check_grammar.run()]
+    assert [result.text for result in results] == [
+        "suggested change: This is the line.",
+        f"CheckGrammar: skipped: too long ({MAX_TEXT_LENGTH * 4} characters)",
+    ]
+    assert check_grammar.checked_event_count == 3
+    assert all("teh teh" not in text for text in server.requests)
@@ -0,0 +1,45 @@
+from unittest.mock import Mock
+
+import pytest
+from ass_parser import AssEvent
+
+from ass_lint.checks.overlapping_dialog import CheckOverlappingDialog
+from ass_lint.intervals import make_event_index
+
+
+async def run_check(context: Mock, events: list[AssEvent]) -> list[str]:
+    context.ass_file.events.extend(events)
+    context.event_index = make_event_index(context.ass_file.events)
+    check = CheckOverlappingDialog(context=context)
+    return [repr(result) async for result in check.run()]
+
+
+@pytest.mark.asyncio
+async def test_overlapping_dialog(context: Mock) -> None:
+    results = await run_check(
+        context,
+        [
+            AssEvent(start=0, end=1000, text="first"),
+            AssEvent(start=800, end=2000, text="second"),
+            AssEvent(start=2000, end=3000, text="third"),
+            AssEvent(start=500, end=600, text="fourth"),
+        ],
+    )
+    assert results == [
+        "#1+#4: overlapping dialog (100 ms)",
+        "#1+#2: overlapping dialog (200 ms)",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_overlapping_signs_and_comments(context: Mock) -> None:
+    results = await run_check(
+        context,
+        [
+            AssEvent(start=0, end=1000, text="dialog"),
+            AssEvent(start=0, end=1000, text="sign", actor="[sign]"),
+            AssEvent(start=0, end=1000, text="comment", is_comment=True),
+            AssEvent(start=0, end=1000, text="{\\an8}"),
+        ],
+    )
+    assert results == []
@@ -0,0 +1,117 @@
+import random
+import time
+from unittest.mock import Mock
+
+import pytest
+from ass_parser import AssEvent
+
+from ass_lint import guarded_re
+from ass_lint.checks.double_words import CheckDoubleWords
+from ass_lint.checks.line_continuation import CheckLineContinuation
+from ass_lint.checks.punctuation import CheckPunctuation
+from ass_lint.checks.quotes import CheckQuotes
+from ass_lint.common import MAX_TEXT_LENGTH, BaseEventCheck, Skipped, TimedOut
+
+CHECKS = [
+    CheckDoubleWords,
+    CheckLineContinuation,
+    CheckPunctuation,
+    CheckQuotes,
+]
+# pieces the patterns of the checks backtrack over
+FRAGMENTS = [
+    '"',
+    "„",
+    "”",
+    ".",
+    "…",
+    "!",
+    " ",
+    "\\N",
+    "-",
+    "–",
+    "a",
+    "Ab",
+    "ab ",
+]
+MAX_EVENT_TIME = 1.0
+
+
+def make_fuzzed_texts(seed: int, count: int, length: int) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        fragments = rng.sample(FRAGMENTS, 3)
+        text = ""
+        while len(text) < length:
+            text += rng.choice(fragments) * rng.randint(1, 50)
+        texts.append(text[:length])
+    return texts
+
+
+def make_check(
+    check_cls: type[BaseEventCheck], context: Mock
+) -> BaseEventCheck:
+    context.language = "en_US"
+    return check_cls(context=context)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("check_cls", CHECKS)
+async def test_pathological_events_time(
+    check_cls: type[BaseEventCheck], context: Mock
+) -> None:
+    texts = [
+        '"' * (MAX_TEXT_LENGTH // 2) + "." * (MAX_TEXT_LENGTH // 2),
+        "ab " * (MAX_TEXT_LENGTH // 3),
+        *make_fuzzed_texts(0, 20, MAX_TEXT_LENGTH),
+        *make_fuzzed_texts(1, 5, MAX_TEXT_LENGTH * 50),
+    ]
+    check = make_check(check_cls, context)
+    check.ctx.ass_file.events.extend(AssEvent(text=text) for text in texts)
+    check.construct_event_map()
+    for event in check.ctx.ass_file.events:
+        start = time.perf_counter()
+        [result async for result in check.run_for_events([event])]
+        assert time.perf_counter() - start < MAX_EVENT_TIME
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("check_cls", CHECKS)
+async def test_too_long_events(
+    check_cls: type[BaseEventCheck], context: Mock
+) -> None:
+    check = make_check(check_cls, context)
+    event = AssEvent(text="{\\i1}" + "a. " * MAX_TEXT_LENGTH)
+    check.ctx.ass_file.events.append(event)
+    check.construct_event_map()
+    results = [result async for result in check.run()]
+    assert len(results) == 1
+    assert isinstance(results[0], Skipped)
+    assert results[0].text == (
+        f"{check_cls.__name__}: skipped: too long "
+        f"({MAX_TEXT_LENGTH * 3} characters)"
+    )
+    assert results[0].events == [event]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("check_cls", CHECKS)
+async def test_timed_out_events(
+    check_cls: type[BaseEventCheck],
+    context: Mock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # no time left for any pattern
+    monkeypatch.setattr(guarded_re, "PATTERN_TIMEOUT", 0)
+    check = make_check(check_cls, context)
+    event = AssEvent(text='lower "case" case, . !!')
+    check.ctx.ass_file.events.extend([AssEvent(text="text"), event])
+    check.construct_event_map()
+    results = [result async for result in check.run_for_events([event])]
+    # the results found before the timeout are kept
+    assert isinstance(results[-1], TimedOut)
+    assert results[-1].text.startswith(
+        f"{check_cls.__name__}: skipped: pattern timed out: "
+    )
+    assert results[-1].events == [event]
@@ -146,3 +146,19 @@ async def test_check_quotes(
         violation_text_re, log_level = expected_violation
         assert re.match(violation_text_re, result.text)
         assert result.log_level == log_level
+
+
+@pytest.mark.asyncio
+async def test_check_quotes_skips_drawings(check_quotes: CheckQuotes) -> None:
+    check_quotes.ctx.ass_file.events.extend(
+        [
+            AssEvent(text="{\\p1}m 0 0 l 1 1{\\p0}"),
+            AssEvent(text='{\\p1}m 0 0 l 1 1{\\p0}"what'),
+        ]
+    )
+    check_quotes.construct_event_map()
+    results = [result async for result in check_quotes.run()]
+    assert [result.text for result in results] == [
+        "plain quotation mark",
+        "partial quote",
+    ]
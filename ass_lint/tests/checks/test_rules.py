@@ -0,0 +1,66 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from ass_parser import AssEvent
+
+from ass_lint.checks import rules
+from ass_lint.checks.rules import CheckRules
+from ass_lint.config import Config
+
+RULE_PACK = """
+[[rule]]
+pattern = "Senpai"
+message = "honorifics are lowercase"
+
+[[rule]]
+pattern = "okey dokey"
+message = "banned phrase"
+categories = ["dialog"]
+
+[[rule]]
+pattern = "colour"
+message = "American spelling"
+level = "info"
+languages = ["en_US"]
+
+[[rule]]
+pattern = "kolor"
+message = "never reported"
+languages = ["pl"]
+"""
+
+
+@pytest.mark.asyncio
+async def test_rules(context: Mock, tmp_path: Path) -> None:
+    (tmp_path / "house.toml").write_text(RULE_PACK)
+    context.config = Config(rule_packs=[tmp_path / "house.toml"])
+    context.language = "en_US"
+    context.ass_file.events.extend(
+        [
+            AssEvent(text="Okay, Senpai."),
+            AssEvent(text="okey dokey, what colour?"),
+            AssEvent(text="okey dokey", actor="[sign]"),
+            AssEvent(text="Senpai kolor", is_comment=True),
+        ]
+    )
+    check = CheckRules(context)
+    assert [repr(result) async for result in check.run()] == [
+        "#1: honorifics are lowercase (Senpai)",
+        "#2: banned phrase (okey dokey)",
+        "#2: American spelling (colour)",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rules_without_rule_packs(
+    context: Mock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    context.config = Config()
+    context.language = "en_US"
+    context.ass_file.events.append(AssEvent(text="Okay, Senpai."))
+    monkeypatch.setattr(
+        rules, "get_plaintext", Mock(side_effect=AssertionError)
+    )
+    check = CheckRules(context)
+    assert [result async for result in check.run()] == []
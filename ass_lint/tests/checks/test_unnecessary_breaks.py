@@ -1,5 +1,5 @@
 from typing import Optional
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from ass_parser import AssEvent
@@ -32,17 +32,41 @@ async def test_check_unnecessary_breaks(
     check_unnecessary_breaks.ctx.ass_file.events.append(event)
     check_unnecessary_breaks.construct_event_map()
 
-    with patch(
-        "ass_lint.checks.unnecessary_breaks.measure_frame_size",
-        return_value=(100, 0),
-    ):
-        results = [
-            result
-            async for result in check_unnecessary_breaks.run_for_event(event)
-        ]
+    check_unnecessary_breaks.ctx.renderer_pool.measure_frame_size = AsyncMock(
+        return_value=(100, 0)
+    )
+    results = [
+        result
+        async for result in check_unnecessary_breaks.run_for_event(event)
+    ]
 
     if violation_text is None:
         assert len(results) == 0
     else:
         assert len(results) == 1
         assert results[0].text == violation_text
+
+
+@pytest.mark.asyncio
+async def test_check_unnecessary_breaks_estimated_width(
+    check_unnecessary_breaks: CheckUnnecessaryBreaks,
+):
+    event = AssEvent(text="text\\Ntext")
+    check_unnecessary_breaks.ctx.ass_file.events.append(event)
+    check_unnecessary_breaks.construct_event_map()
+    check_unnecessary_breaks.ctx.text_width = Mock(
+        estimate_frame_width=Mock(return_value=1000),
+        is_clearly_above=lambda width, limit: width > limit,
+    )
+
+    measure_frame_size = AsyncMock()
+    check_unnecessary_breaks.ctx.renderer_pool.measure_frame_size = (
+        measure_frame_size
+    )
+    results = [
+        result
+        async for result in check_unnecessary_breaks.run_for_event(event)
+    ]
+
+    assert not results
+    measure_frame_size.assert_not_called()
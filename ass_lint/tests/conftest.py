@@ -0,0 +1,84 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib import newTable
+from fontTools.ttLib.tables._k_e_r_n import KernTable_format_0
+
+
+def make_glyph(width: int):
+    pen = TTGlyphPen(None)
+    pen.moveTo((50, 0))
+    pen.lineTo((50, 500))
+    pen.lineTo((width - 50, 500))
+    pen.lineTo((width - 50, 0))
+    pen.closePath()
+    return pen.glyph()
+
+
+def build_font(
+    path: Path,
+    family: str,
+    extra_chars: str = "",
+    is_bold: bool = False,
+    is_italic: bool = False,
+) -> None:
+    """Build a font covering space, a, b and given extra characters, which
+    are drawn with the glyph of a.
+    """
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder([".notdef", "space", "a", "b"])
+    builder.setupCharacterMap(
+        {
+            0x20: "space",
+            0x61: "a",
+            0x62: "b",
+            **{ord(char): "a" for char in extra_chars},
+        }
+    )
+    builder.setupGlyf(
+        {
+            ".notdef": make_glyph(500),
+            "space": TTGlyphPen(None).glyph(),
+            "a": make_glyph(500),
+            "b": make_glyph(600),
+        }
+    )
+    builder.setupHorizontalMetrics(
+        {
+            ".notdef": (500, 50),
+            "space": (250, 0),
+            "a": (500, 50),
+            "b": (600, 50),
+        }
+    )
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": family, "styleName": "Regular"})
+    builder.setupOS2(
+        usWinAscent=800,
+        usWinDescent=200,
+        fsSelection=(
+            (0x20 if is_bold else 0)
+            | (0x01 if is_italic else 0)
+            | (0x40 if not is_bold and not is_italic else 0)
+        ),
+    )
+    builder.setupPost()
+
+    kern = newTable("kern")
+    kern.version = 0
+    subtable = KernTable_format_0()
+    subtable.version = 0
+    subtable.coverage = 1
+    subtable.format = 0
+    subtable.kernTable = {("a", "b"): -100}
+    kern.kernTables = [subtable]
+    builder.font["kern"] = kern
+    builder.save(str(path))
+
+
+@pytest.fixture(name="build_font")
+def fixture_build_font() -> Callable[..., None]:
+    return build_font
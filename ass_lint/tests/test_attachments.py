@@ -0,0 +1,43 @@
+import pytest
+
+from ass_lint import attachments
+from ass_lint.attachments import (
+    AssAttachment,
+    decode_attachment,
+    encode_attachment,
+)
+
+
+@pytest.mark.parametrize(
+    "data, expected_lines",
+    [
+        (b"", []),
+        (b"\0", ["!!"]),
+        (b"\0\0", ["!!!"]),
+        (b"\0\0\0", ["!!!!"]),
+        (b"\xff\xff\xff", ["````"]),
+        (b"abc", ["97*D"]),
+    ],
+)
+def test_encode_decode(data: bytes, expected_lines: list[str]) -> None:
+    assert encode_attachment(data) == expected_lines
+    assert decode_attachment(expected_lines).read() == data
+
+
+def test_decode_in_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(attachments, "DECODE_CHUNK_SIZE", 81)
+    data = bytes(range(256)) * 7 + b"x"
+    lines = encode_attachment(data)
+    assert all(len(line) <= 80 for line in lines)
+    assert decode_attachment(lines).read() == data
+
+
+def test_content_hash() -> None:
+    assert (
+        AssAttachment("a.ttf", ["abcd", "ef"]).content_hash
+        == AssAttachment("b.ttf", ["abcd", "ef"]).content_hash
+    )
+    assert (
+        AssAttachment("a.ttf", ["abcd", "ef"]).content_hash
+        != AssAttachment("a.ttf", ["abcd", "eg"]).content_hash
+    )
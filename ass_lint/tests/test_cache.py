@@ -0,0 +1,81 @@
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+from ass_parser import AssFile
+
+from ass_lint.cache import (
+    DiskCache,
+    get_file_identity,
+    make_cache_key,
+    prune_caches,
+)
+from ass_lint.common import make_context
+
+
+def test_make_cache_key() -> None:
+    assert make_cache_key("a", 1) == make_cache_key("a", 1)
+    assert make_cache_key("a", 1) != make_cache_key("a", "1")
+    assert make_cache_key("ab", "c") != make_cache_key("a", "bc")
+
+
+def test_disk_cache(tmp_path: Path) -> None:
+    cache = DiskCache("test", tmp_path)
+    cache.set("a", {"value": 1})
+    cache.set_many({"b": None, "c": [1, 2]})
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("missing", 5) == 5
+    assert cache.get_many(["b", "c", "missing"]) == {"b": None, "c": [1, 2]}
+    cache.close()
+
+    cache = DiskCache("test", tmp_path)
+    assert cache.get("a") == {"value": 1}
+    cache.close()
+
+
+def test_disk_cache_prune_by_age(tmp_path: Path) -> None:
+    cache = DiskCache("test", tmp_path)
+    cache.set("a", 1)
+    time.sleep(0.05)
+    cache.set("b", 2)
+    assert cache.prune(max_age=0.025) == 1
+    assert cache.get_many(["a", "b"]) == {"b": 2}
+
+
+def test_disk_cache_prune_by_size(tmp_path: Path) -> None:
+    cache = DiskCache("test", tmp_path)
+    cache.set("a", "x" * 100)
+    time.sleep(0.01)
+    cache.set("b", "y" * 100)
+    assert cache.prune(max_size=150) == 1
+    assert cache.get_many(["a", "b"]) == {"b": "y" * 100}
+
+
+def test_prune_caches(tmp_path: Path) -> None:
+    for name in ("first", "second"):
+        cache = DiskCache(name, tmp_path)
+        cache.set("old", "value")
+        cache.close()
+    assert prune_caches(tmp_path, max_size=0) == 2
+    assert DiskCache("first", tmp_path).get("old") is None
+
+
+def test_get_file_identity(tmp_path: Path) -> None:
+    path = tmp_path / "video.mkv"
+    assert get_file_identity(path) is None
+    path.write_bytes(b"abc")
+    assert get_file_identity(path) == (str(path), 3)
+
+
+def test_context_closes_caches(tmp_path: Path) -> None:
+    ctx = make_context(Path("test.ass"), AssFile(), cache_dir=tmp_path)
+    cache = ctx.open_cache("test")
+    assert cache is not None
+    assert ctx.open_cache("test") is cache
+    ctx.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        cache.get("key")
+
+    ctx = make_context(Path("test.ass"), AssFile(), cache_dir=None)
+    assert ctx.open_cache("test") is None
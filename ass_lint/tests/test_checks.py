@@ -0,0 +1,74 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from ass_lint.checks import CHECKS, get_check_specs, get_checks
+
+HEAVY_MODULES = {
+    "ass_renderer",
+    "enchant",
+    "fontTools",
+    "gingerit",
+    "numpy",
+    "regex",
+}
+
+
+def get_imported_modules(code: str) -> set[str]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            module = line.rsplit("|", 1)[1].strip()
+            modules.add(module.split(".")[0])
+    return modules
+
+
+def test_get_checks_full() -> None:
+    assert [spec.name for spec in get_check_specs(full=True)] == [
+        spec.name for spec in CHECKS
+    ]
+
+
+def test_get_checks_not_full() -> None:
+    names = [spec.name for spec in get_check_specs(full=False)]
+    assert "grammar" not in names
+    assert "times" not in names
+    assert "durations" in names
+
+
+def test_get_checks_only() -> None:
+    checks = list(get_checks(full=False, only=["quotes", "times"]))
+    assert [check.__name__ for check in checks] == [
+        "CheckQuotes",
+        "CheckTimes",
+    ]
+
+
+def test_get_checks_skip() -> None:
+    names = [spec.name for spec in get_check_specs(full=False, skip=["fonts"])]
+    assert "fonts" not in names
+    assert "quotes" in names
+
+
+def test_get_checks_unknown() -> None:
+    with pytest.raises(ValueError):
+        list(get_checks(full=False, only=["nonexistent"]))
+
+
+def test_lazy_imports() -> None:
+    modules = get_imported_modules(
+        "import ass_lint.__main__\n"
+        "from ass_lint.checks import get_checks\n"
+        "list(get_checks(full=False, only=['durations', 'quotes']))\n"
+    )
+    assert "ass_lint" in modules
+    assert not modules & HEAVY_MODULES
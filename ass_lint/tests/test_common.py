@@ -1,6 +1,9 @@
-from ass_parser import AssEvent, AssEventList
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from ass_lint.common import Violation
+from ass_parser import AssEvent, AssEventList, AssFile
+
+from ass_lint.common import CheckContext, LazyResource, Violation
 
 
 def test_violation_single_event() -> None:
@@ -16,3 +19,29 @@ def test_violation_multiple_events() -> None:
     event_list.append(AssEvent(start=0, end=0))
     violation = Violation("test", [event_list[0], event_list[1]])
     assert repr(violation) == "#1+#2: test"
+
+
+def test_lazy_resource_created_once() -> None:
+    calls = []
+
+    class Owner:
+        resource = LazyResource(lambda owner: calls.append(owner) or object())
+
+    owner = Owner()
+    assert not calls
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(executor.map(lambda _: owner.resource, range(32)))
+    assert len(calls) == 1
+    assert all(value is values[0] for value in values)
+
+
+def test_check_context_resources_are_lazy() -> None:
+    ass_file = AssFile()
+    ass_file.script_info["Video File"] = "nonexistent.mkv"
+    ctx = CheckContext(
+        subs_path=Path("test.ass"),
+        ass_file=ass_file,
+        video_resolution=(1280, 720),
+    )
+    assert "renderer_pool" not in vars(ctx)
+    assert "video" not in vars(ctx)
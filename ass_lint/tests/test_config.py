@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+
+from ass_lint.config import (
+    Config,
+    ConfigError,
+    find_config,
+    load_config,
+    parse_config,
+)
+
+
+def test_default_config() -> None:
+    assert load_config(None).actor_names["karaoke"] == ["karaoke"]
+
+
+def test_load_config(tmp_path: Path) -> None:
+    (tmp_path / "ass-lint.toml").write_text(
+        '[actors]\nsign = ["sign", "TS"]\nkaraoke = ["OP", "ED"]\n'
+    )
+    (tmp_path / "episode").mkdir()
+    config_path = find_config(tmp_path / "episode" / "01.ass")
+    assert config_path == tmp_path / "ass-lint.toml"
+    config = load_config(config_path)
+    assert config.actor_names["sign"] == ["sign", "TS"]
+    assert config.actor_names["karaoke"] == ["OP", "ED"]
+    assert config.actor_names["title"] == Config().actor_names["title"]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"actors": []},
+        {"actors": {"narrator": ["N"]}},
+        {"actors": {"sign": "TS"}},
+    ],
+)
+def test_parse_config_invalid(data: dict) -> None:
+    with pytest.raises(ConfigError):
+        parse_config(data)
+
+
+def test_load_config_invalid_toml(tmp_path: Path) -> None:
+    (tmp_path / "ass-lint.toml").write_text("[actors\n")
+    with pytest.raises(ConfigError):
+        load_config(tmp_path / "ass-lint.toml")
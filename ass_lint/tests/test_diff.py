@@ -0,0 +1,172 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from ass_parser import AssEvent, AssFile
+
+from ass_lint.checks.durations import CheckDurations
+from ass_lint.checks.video_resolution import CheckVideoResolution
+from ass_lint.common import FileSection, make_context
+from ass_lint.diff import (
+    DiffError,
+    diff_against_reference,
+    diff_files,
+    get_affected_indices,
+    get_changed_ranges,
+    load_reference_data,
+)
+from ass_lint.reader import read_ass
+
+HEADER = """[Script Info]
+PlayResX: {width}
+PlayResY: 720
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+def make_ass_text(texts: list[str], width: int = 1280) -> str:
+    return HEADER.format(width=width) + "".join(
+        f"Dialogue: 0,0:00:{i:02d}.00,0:00:{i:02d}.20,Default,,0,0,0,,"
+        f"{text}\n"
+        for i, text in enumerate(texts)
+    )
+
+
+def make_ass_file(texts: list[str]) -> AssFile:
+    ass_file = AssFile()
+    ass_file.events.extend(AssEvent(text=text) for text in texts)
+    return ass_file
+
+
+TEXTS = [f"line {i}" for i in range(10)]
+
+
+@pytest.mark.parametrize(
+    "texts, expected_indices",
+    [
+        (TEXTS, set()),
+        # a changed event and its neighbours
+        (TEXTS[:4] + ["changed"] + TEXTS[5:], {3, 4, 5}),
+        # an inserted event
+        (TEXTS[:4] + ["inserted"] + TEXTS[4:], {3, 4, 5}),
+        # the events that became adjacent
+        (TEXTS[:4] + TEXTS[5:], {3, 4}),
+        (TEXTS[:-1], {8}),
+        (TEXTS[1:], {0}),
+        # empty events are skipped when looking for the neighbours
+        (TEXTS[:3] + ["", "changed", ""] + TEXTS[6:], {2, 3, 4, 5, 6}),
+    ],
+)
+def test_diff_files(texts: list[str], expected_indices: set[int]) -> None:
+    diff = diff_files(make_ass_file(texts), make_ass_file(TEXTS))
+    assert diff.affected_indices == expected_indices
+    assert diff.changed_sections == (
+        {FileSection.events} if texts != TEXTS else set()
+    )
+
+
+def apply_changed_ranges(a: list[str], b: list[str]) -> list[str]:
+    ret = []
+    prev_end = 0
+    for i1, i2, j1, j2 in get_changed_ranges(a, b):
+        assert i1 >= prev_end
+        ret.extend(a[prev_end:i1])
+        ret.extend(b[j1:j2])
+        prev_end = i2
+    return ret + a[prev_end:]
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("abcabba", "cbabac"),
+        ("aaaa", "aaba"),
+        ("xaybzc", "zbyaxc"),
+        ("", "abc"),
+        ("abc", ""),
+    ],
+)
+def test_get_changed_ranges(a: str, b: str) -> None:
+    assert apply_changed_ranges(list(a), list(b)) == list(b)
+
+
+def test_diff_files_repeated_lines() -> None:
+    texts = [text for i in range(5000) for text in (f"line {i}", "")]
+    changed = texts.copy()
+    changed[2000] = "changed"
+    del changed[6000:6004]
+    diff = diff_files(make_ass_file(changed), make_ass_file(texts))
+    assert diff.affected_indices == {1998, 2000, 2002, 5998, 6000}
+
+
+def test_get_affected_indices() -> None:
+    events = make_ass_file(["a", "", "b", "", "c"]).events
+    assert get_affected_indices(events, [2], []) == {0, 2, 4}
+    assert get_affected_indices(events, [1], []) == {0, 1, 2}
+    assert get_affected_indices(events, [], [4]) == {2, 4}
+    assert get_affected_indices(events, [], [5]) == {4}
+
+
+def test_changed_sections(tmp_path: Path) -> None:
+    (tmp_path / "ref.ass").write_text(make_ass_text(TEXTS))
+    path = tmp_path / "test.ass"
+    path.write_text(make_ass_text(TEXTS, width=1920))
+
+    diff = diff_against_reference(
+        path, read_ass(path), str(tmp_path / "ref.ass")
+    )
+    assert diff.changed_sections == {FileSection.script_info}
+    assert not diff.affected_indices
+    assert CheckVideoResolution.is_affected_by(diff)
+    assert not CheckDurations.is_affected_by(diff)
+
+
+@pytest.mark.asyncio
+async def test_event_check_runs_for_affected_events(tmp_path: Path) -> None:
+    reference_texts = ["a long enough line"] * 10
+    texts = list(reference_texts)
+    texts[3] = texts[7] = "another long enough line"
+    (tmp_path / "ref.ass").write_text(make_ass_text(reference_texts))
+    path = tmp_path / "test.ass"
+    path.write_text(make_ass_text(texts))
+
+    ass_file = read_ass(path)
+    diff = diff_against_reference(path, ass_file, str(tmp_path / "ref.ass"))
+    check = CheckDurations(make_context(path, ass_file, diff=diff))
+    assert [event.index for event in check.get_events()] == [2, 3, 4, 6, 7, 8]
+    assert [
+        [event.index for event in result.events]
+        async for result in check.run()
+    ] == [[2], [3], [4], [6], [7], [8]]
+
+
+@pytest.mark.skipif(not shutil.which("git"), reason="git is not installed")
+def test_load_reference_data_from_git(tmp_path: Path) -> None:
+    def git(*args: str) -> None:
+        subprocess.run(
+            [
+                "git",
+                "-c",
+                "user.name=test",
+                "-c",
+                "user.email=test@example.com",
+                *args,
+            ],
+            cwd=tmp_path,
+            check=True,
+            capture_output=True,
+        )
+
+    path = tmp_path / "test.ass"
+    path.write_text(make_ass_text(TEXTS))
+    git("init")
+    git("add", "test.ass")
+    git("commit", "-m", "initial")
+    path.write_text(make_ass_text(TEXTS[1:]))
+
+    assert load_reference_data(path, "HEAD") == make_ass_text(TEXTS).encode()
+    with pytest.raises(DiffError):
+        load_reference_data(path, "missing-revision")
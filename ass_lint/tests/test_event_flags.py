@@ -0,0 +1,70 @@
+import pytest
+from ass_parser import AssEvent, AssEventList
+
+from ass_lint.event_flags import (
+    DEFAULT_ACTOR_NAMES,
+    EventClassifier,
+    EventFlag,
+    classify_event,
+    get_actor_flags,
+)
+
+
+@pytest.mark.parametrize(
+    "event, expected",
+    [
+        (AssEvent(text="hi"), EventFlag.DIALOG),
+        (AssEvent(text="hi", actor="[sign]"), EventFlag.SIGN),
+        (AssEvent(text="hi", actor="(episode title)"), EventFlag.SIGN),
+        (AssEvent(text="hi", actor="title"), EventFlag.TITLE),
+        (AssEvent(text="hi", actor="karaoke"), EventFlag.KARAOKE),
+        (AssEvent(text="hi", actor="credits"), EventFlag.CREDITS),
+        (AssEvent(text="hi", actor="Sign"), EventFlag.DIALOG),
+        (
+            AssEvent(text="hi", is_comment=True),
+            EventFlag.DIALOG | EventFlag.COMMENT,
+        ),
+        (AssEvent(text=""), EventFlag.DIALOG | EventFlag.EMPTY),
+        (AssEvent(text="{comment}hi"), EventFlag.DIALOG),
+        (
+            AssEvent(text="{\\pos(1,2)}hi"),
+            EventFlag.DIALOG | EventFlag.OVERRIDE_TAGS,
+        ),
+        (
+            AssEvent(text="{\\an7\\p1}m 0 0 l 1 1{\\p0}", actor="sign"),
+            EventFlag.SIGN
+            | EventFlag.EMPTY
+            | EventFlag.OVERRIDE_TAGS
+            | EventFlag.DRAWING,
+        ),
+    ],
+)
+def test_classify_event(event: AssEvent, expected: EventFlag) -> None:
+    assert (
+        classify_event(event, get_actor_flags(DEFAULT_ACTOR_NAMES)) == expected
+    )
+
+
+def test_event_classifier_custom_actors() -> None:
+    events = AssEventList()
+    events.append(AssEvent(text="a", actor="TS"))
+    events.append(AssEvent(text="b", actor="sign"))
+    classifier = EventClassifier(events, {"sign": ["TS"]})
+    assert classifier.get(events[0]) == EventFlag.SIGN
+    assert classifier.get(events[1]) == EventFlag.DIALOG
+
+
+def test_event_classifier_growing_list() -> None:
+    events = AssEventList()
+    classifier = EventClassifier(events)
+    events.append(AssEvent(text="a"))
+    assert classifier.get(events[0]) == EventFlag.DIALOG
+    events.append(AssEvent(text="b", actor="karaoke"))
+    assert classifier.get(events[1]) == EventFlag.KARAOKE
+    assert list(classifier.get_all()) == [
+        EventFlag.DIALOG,
+        EventFlag.KARAOKE,
+    ]
+    assert classifier.get(AssEvent(text="c", is_comment=True)) == (
+        EventFlag.DIALOG | EventFlag.COMMENT
+    )
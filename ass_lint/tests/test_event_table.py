@@ -0,0 +1,42 @@
+from ass_parser import AssEvent, AssEventList
+
+from ass_lint.event_flags import EventFlag
+from ass_lint.event_table import EventTable
+
+
+def test_from_events() -> None:
+    events = AssEventList()
+    events.append(AssEvent(start=0, end=100, text="a b", style_name="A"))
+    events.append(AssEvent(start=100, end=300, text="{\\an8}", actor="x"))
+    events.append(AssEvent(start=200, end=250, text="c", is_comment=True))
+    events.append(
+        AssEvent(start=300, end=400, text="déjà vu!", style_name="B")
+    )
+    table = EventTable.from_events(events)
+    assert len(table) == 4
+    assert table.start.tolist() == [0, 100, 200, 300]
+    assert table.duration.tolist() == [100, 200, 50, 100]
+    assert table.styles == ["A", "", "B"]
+    assert table.style_index.tolist() == [0, 1, 1, 2]
+    assert table.actors == ["", "x"]
+    assert table.actor_index.tolist() == [0, 1, 0, 0]
+    assert table.is_comment.tolist() == [False, False, True, False]
+    assert table.is_non_empty.tolist() == [True, False, False, True]
+    assert table.char_count.tolist() == [2, 0, 1, 6]
+    assert table.next_non_empty.tolist() == [3, 3, 3, -1]
+
+
+def test_has_flag() -> None:
+    events = AssEventList()
+    events.append(AssEvent(start=0, end=0, actor="[karaoke]"))
+    events.append(AssEvent(start=0, end=0, actor="sign"))
+    events.append(AssEvent(start=0, end=0, actor="karaoke"))
+    table = EventTable.from_events(events)
+    assert table.has_flag(EventFlag.KARAOKE).tolist() == [True, False, True]
+    assert table.has_flag(EventFlag.DIALOG).tolist() == [False, False, False]
+
+
+def test_empty() -> None:
+    table = EventTable.from_events(AssEventList())
+    assert len(table) == 0
+    assert table.next_non_empty.tolist() == []
@@ -0,0 +1,234 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pytest
+from ass_parser import AssEvent, AssFile, AssStyle
+from fontTools.ttLib import TTCollection, TTFont
+
+from ass_lint import fonts as fonts_module
+from ass_lint.attachments import (
+    AssAttachment,
+    AssAttachmentSection,
+    encode_attachment,
+)
+from ass_lint.cache import DiskCache
+from ass_lint.checks.fonts import get_used_font_styles
+from ass_lint.common import CheckContext
+from ass_lint.fonts import (
+    FontInfo,
+    get_codepoints,
+    get_embedded_fonts,
+    get_fonts,
+    locate_font,
+)
+
+
+def test_get_codepoints() -> None:
+    assert get_codepoints("baab").tolist() == [0x61, 0x62]
+    assert get_codepoints("𝒜あa").tolist() == [0x61, 0x3042, 0x1D49C]
+    assert get_codepoints("").tolist() == []
+
+
+def test_font_info(tmp_path: Path, build_font: Callable[..., None]) -> None:
+    build_font(tmp_path / "test.ttf", "Test Sans", extra_chars="あい")
+    font = FontInfo(tmp_path / "test.ttf")
+    assert "Test Sans" in font.names
+    assert not font.is_bold
+    assert not font.is_italic
+    assert font.codepoints.tolist() == [0x20, 0x61, 0x62, 0x3042, 0x3044]
+    assert (
+        "".join(
+            map(chr, font.get_missing_codepoints(get_codepoints("abcあうい")))
+        )
+        == "cう"
+    )
+
+
+def test_locate_font(tmp_path: Path, build_font: Callable[..., None]) -> None:
+    build_font(tmp_path / "regular.ttf", "Test Sans")
+    build_font(tmp_path / "bold.ttf", "Test Sans", is_bold=True)
+    fonts = get_fonts((tmp_path,))
+    assert locate_font(fonts, "test sans", True, False)[1].name == "bold.ttf"
+    assert (
+        locate_font(fonts, "Test Sans", False, False)[1].name == "regular.ttf"
+    )
+    assert locate_font(fonts, "Other", False, False) is None
+
+
+def test_get_fonts_collection(
+    tmp_path: Path, build_font: Callable[..., None]
+) -> None:
+    build_font(tmp_path / "regular.ttf", "Test Sans")
+    build_font(tmp_path / "bold.ttf", "Test Sans", is_bold=True)
+    collection = TTCollection()
+    collection.fonts = [
+        TTFont(tmp_path / "regular.ttf"),
+        TTFont(tmp_path / "bold.ttf"),
+    ]
+    fonts_dir = tmp_path / "fonts"
+    fonts_dir.mkdir()
+    collection.save(fonts_dir / "test.ttc")
+
+    fonts = get_fonts((fonts_dir,))
+    assert [path.name for path in fonts] == ["test.ttc#0", "test.ttc#1"]
+    _weight, path, font = locate_font(fonts, "Test Sans", True, False)
+    assert path.name == "test.ttc#1"
+    assert font.font_path == fonts_dir / "test.ttc"
+    assert font.font_number == 1
+
+
+def test_get_used_font_styles() -> None:
+    ass_file = AssFile()
+    ass_file.styles.append(
+        AssStyle(name="Default", font_name="Sans", bold=False, italic=False)
+    )
+    ass_file.events.extend(
+        [
+            AssEvent(
+                text="ab{\\b1}c{\\fnSerif}d{\\fn}e", style_name="Default"
+            ),
+            AssEvent(text="ignored", style_name="Default", is_comment=True),
+            AssEvent(text="ignored", style_name="Unknown"),
+        ]
+    )
+    font_styles = get_used_font_styles(ass_file)
+    assert {
+        font_specs: "".join(map(chr, codepoints))
+        for font_specs, codepoints in font_styles.items()
+    } == {
+        ("Sans", False, False): "ab",
+        ("Sans", True, False): "ce",
+        ("Serif", True, False): "d",
+    }
+    assert all(
+        codepoints.dtype == np.uint32 for codepoints in font_styles.values()
+    )
+
+
+def test_get_fonts_recursive(
+    tmp_path: Path, build_font: Callable[..., None]
+) -> None:
+    (tmp_path / "show/fonts/nested").mkdir(parents=True)
+    (tmp_path / "library").mkdir()
+    build_font(tmp_path / "show/fonts/nested/show.ttf", "Show Sans")
+    build_font(tmp_path / "library/shared.TTF", "Show Sans")
+    build_font(tmp_path / "library/other.otf", "Other Sans")
+    (tmp_path / "library/readme.txt").write_text("not a font")
+    (tmp_path / "library/broken.ttf").write_bytes(b"not a font")
+
+    fonts = get_fonts(
+        (tmp_path / "show/fonts", tmp_path / "library", tmp_path / "missing")
+    )
+    assert [path.name for path in fonts] == [
+        "show.ttf",
+        "other.otf",
+        "shared.TTF",
+    ]
+    # earlier directories take precedence
+    assert locate_font(fonts, "Show Sans", False, False)[1].name == "show.ttf"
+
+
+def test_get_fonts_parallel(
+    tmp_path: Path,
+    build_font: Callable[..., None],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(fonts_module, "MIN_PARALLEL_FONT_COUNT", 1)
+    for i in range(4):
+        build_font(tmp_path / f"font{i}.ttf", f"Font {i}")
+    fonts = get_fonts((tmp_path,), workers=2)
+    assert sorted(font.names[0] for font in fonts.values()) == [
+        f"Font {i}" for i in range(4)
+    ]
+
+
+def test_check_context_fonts_dirs(tmp_path: Path) -> None:
+    ctx = CheckContext(
+        subs_path=tmp_path / "show/episode.ass",
+        ass_file=AssFile(),
+        video_resolution=(1280, 720),
+        fonts_dirs=[Path("fonts"), Path("../library"), Path("/usr/fonts")],
+    )
+    assert ctx.get_fonts_dirs() == [
+        tmp_path / "show/fonts",
+        tmp_path / "show/../library",
+        Path("/usr/fonts"),
+    ]
+
+
+def make_ass_file_with_fonts(
+    tmp_path: Path, build_font: Callable[..., None], count: int
+) -> AssFile:
+    ass_file = AssFile()
+    section = AssAttachmentSection(name="Fonts")
+    for i in range(count):
+        build_font(
+            tmp_path / f"font{i}.ttf", f"Embedded {i}", extra_chars="あ"
+        )
+        section.attachments.append(
+            AssAttachment(
+                name=f"font{i}_0.ttf",
+                lines=encode_attachment(
+                    (tmp_path / f"font{i}.ttf").read_bytes()
+                ),
+            )
+        )
+    # the same font embedded twice
+    section.attachments.append(
+        AssAttachment(name="copy_0.ttf", lines=section.attachments[0].lines)
+    )
+    ass_file.extra_sections.append(section)
+    return ass_file
+
+
+def test_get_embedded_fonts(
+    tmp_path: Path,
+    build_font: Callable[..., None],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(fonts_module, "_embedded_font_memo", {})
+    ass_file = make_ass_file_with_fonts(tmp_path, build_font, 2)
+    fonts = get_embedded_fonts(ass_file)
+    assert {
+        path.as_posix(): font.names[0] for path, font in fonts.items()
+    } == {
+        "[Fonts]/font0_0.ttf": "Embedded 0",
+        "[Fonts]/font1_0.ttf": "Embedded 1",
+        "[Fonts]/copy_0.ttf": "Embedded 0",
+    }
+    font = locate_font(fonts, "Embedded 1", False, False)[2]
+    assert 0x3042 in font.codepoints
+
+
+def test_get_embedded_fonts_cache(
+    tmp_path: Path,
+    build_font: Callable[..., None],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(fonts_module, "_embedded_font_memo", {})
+    ass_file = make_ass_file_with_fonts(tmp_path, build_font, 2)
+    cache = DiskCache("embedded_fonts", tmp_path / "cache")
+
+    loaded = []
+    load_font_info = fonts_module.load_font_info
+    monkeypatch.setattr(
+        fonts_module,
+        "load_font_info",
+        lambda source: loaded.append(source) or load_font_info(source),
+    )
+    fonts1 = get_embedded_fonts(ass_file, cache)
+    assert len(loaded) == 2
+
+    fonts_module._embedded_font_memo.clear()
+    fonts2 = get_embedded_fonts(ass_file, cache)
+    assert len(loaded) == 2
+    assert {path: font.names for path, font in fonts1.items()} == {
+        path: font.names for path, font in fonts2.items()
+    }
+
+    # entries of other formats are never read
+    fonts_module._embedded_font_memo.clear()
+    monkeypatch.setattr(fonts_module, "FONT_INFO_FORMAT", -1)
+    get_embedded_fonts(ass_file, cache)
+    assert len(loaded) == 4
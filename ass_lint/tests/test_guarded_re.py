@@ -0,0 +1,37 @@
+import itertools
+import re
+from unittest.mock import Mock
+
+import pytest
+
+from ass_lint import guarded_re
+
+
+def test_guarded_search() -> None:
+    match = guarded_re.search(r"^b(\w)$", "a\nbc", flags=re.M)
+    assert match and match.group(1) == "c"
+    assert guarded_re.findall(r"\d", "a1b2") == ["1", "2"]
+    assert [
+        match.group(1)
+        for match in guarded_re.finditer(r"(\w+)\s+\1", "a a b c c")
+    ] == ["a", "c"]
+
+
+def test_guarded_search_timeout() -> None:
+    pattern = Mock(pattern="slow", search=Mock(side_effect=TimeoutError))
+    with pytest.raises(guarded_re.PatternTimeout, match="slow"):
+        guarded_re.search(pattern, "text")
+
+
+def test_shared_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    # every pattern takes a second
+    monkeypatch.setattr(
+        guarded_re.time, "perf_counter", itertools.count().__next__
+    )
+    with guarded_re.shared_budget(2.5):
+        assert guarded_re.split(r"\W+", "a b") == ["a", "b"]
+        assert guarded_re.sub(r"\W", "", "a b") == "ab"
+        assert guarded_re.search("a", "a")
+        with pytest.raises(guarded_re.PatternTimeout, match="b"):
+            guarded_re.search("b", "b")
+    assert guarded_re.search("b", "b")
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+from ass_parser import AssEvent, AssEventList
+
+from ass_lint.intervals import IntervalIndex, make_event_index
+
+
+def test_get_overlapping() -> None:
+    index = IntervalIndex([(0, 10, "a"), (5, 15, "b"), (20, 30, "c")])
+    assert index.get_overlapping(0, 5) == ["a"]
+    assert index.get_overlapping(9, 20) == ["a", "b"]
+    assert index.get_overlapping(15, 20) == []
+    assert index.get_overlapping(0, 100) == ["a", "b", "c"]
+    assert index.get_overlapping(5, 5) == []
+    assert index.get_at(10) == ["b"]
+    assert index.get_at(30) == []
+
+
+def test_empty_intervals_skipped() -> None:
+    index = IntervalIndex([(5, 5, "a"), (0, 10, "b")])
+    assert len(index) == 1
+    assert index.get_at(5) == ["b"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_get_overlapping_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    intervals = []
+    for i in range(500):
+        start = rng.randrange(10000)
+        intervals.append((start, start + rng.choice([1, 50, 500, 5000]), i))
+    index = IntervalIndex(intervals)
+    for _ in range(200):
+        start = rng.randrange(-100, 11000)
+        end = start + rng.randrange(1, 1000)
+        assert sorted(index.get_overlapping(start, end)) == sorted(
+            value
+            for interval_start, interval_end, value in intervals
+            if interval_start < end and interval_end > start
+        )
+
+
+def test_make_event_index() -> None:
+    events = AssEventList()
+    events.append(AssEvent(start=0, end=100, text="a"))
+    events.append(AssEvent(start=50, end=150, text="b", is_comment=True))
+    events.append(AssEvent(start=80, end=200, text="c"))
+    index = make_event_index(events)
+    assert [event.text for event in index.get_at(90)] == ["a", "c"]
@@ -0,0 +1,376 @@
+import io
+import sys
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from ass_lint import matroska
+from ass_lint.common import make_context
+from ass_lint.fonts import get_embedded_fonts
+from ass_lint.matroska import MatroskaError, MatroskaReader, read_matroska_ass
+from ass_lint.reader import read_ass
+from ass_lint.result_cache import get_content_key
+
+CODEC_PRIVATE = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 1920
+PlayResY: 1080
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, \
+OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, \
+ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, \
+MarginR, MarginV, Encoding
+Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,\
+0,100,100,0,0,1,2,2,2,10,10,10,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, \
+Text
+"""
+
+# (cluster timestamp, relative timestamp, duration, read order, text)
+EVENTS = [
+    (0, 1000, 1500, 1, "second"),
+    (0, 500, 400, 0, "first"),
+    (60000, 2500, 2000, 2, "third, with a comma"),
+]
+VIDEO_BLOCK_SIZE = 100000
+# the reader ignores the cues, they only make the files realistic
+CUE_POINT_ID = 0xBB
+CUE_TRACK_POSITIONS_ID = 0xB7
+CUE_TRACK_ID = 0xF7
+CUE_CLUSTER_POSITION_ID = 0xF1
+CUE_RELATIVE_POSITION_ID = 0xF0
+
+
+def _element(element_id: int, payload: bytes) -> bytes:
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    size = (1 << 56) | len(payload)
+    return id_bytes + size.to_bytes(8, "big") + payload
+
+
+def _uint(element_id: int, value: int) -> bytes:
+    return _element(element_id, value.to_bytes(8, "big"))
+
+
+def _string(element_id: int, value: str) -> bytes:
+    return _element(element_id, value.encode())
+
+
+def _block(track_number: int, timestamp: int, data: bytes) -> bytes:
+    return (
+        bytes([0x80 | track_number])
+        + timestamp.to_bytes(2, "big", signed=True)
+        + b"\0"
+        + data
+    )
+
+
+def build_matroska(
+    path: Path,
+    use_cues: bool = True,
+    cued_events: Optional[list[int]] = None,
+    compress: bool = False,
+    attachments: Optional[list[tuple[str, str, bytes]]] = None,
+) -> None:
+    ass_track = (
+        _uint(matroska.TRACK_NUMBER_ID, 2)
+        + _uint(matroska.TRACK_TYPE_ID, matroska.TRACK_TYPE_SUBTITLE)
+        + _string(matroska.CODEC_ID_ID, "S_TEXT/ASS")
+        + _element(
+            matroska.CODEC_PRIVATE_ID,
+            (
+                zlib.compress(CODEC_PRIVATE.encode())
+                if compress
+                else CODEC_PRIVATE.encode()
+            ),
+        )
+    )
+    if compress:
+        ass_track += _element(
+            matroska.CONTENT_ENCODINGS_ID,
+            _element(
+                matroska.CONTENT_ENCODING_ID,
+                _uint(matroska.CONTENT_ENCODING_SCOPE_ID, 3)
+                + _element(
+                    matroska.CONTENT_COMPRESSION_ID,
+                    _uint(matroska.CONTENT_COMP_ALGO_ID, 0),
+                ),
+            ),
+        )
+    children: list[tuple[int, bytes]] = [
+        (matroska.INFO_ID, _uint(matroska.TIMESTAMP_SCALE_ID, 1000000)),
+        (
+            matroska.TRACKS_ID,
+            _element(
+                matroska.TRACK_ENTRY_ID,
+                _uint(matroska.TRACK_NUMBER_ID, 1)
+                + _uint(matroska.TRACK_TYPE_ID, 1)
+                + _string(matroska.CODEC_ID_ID, "V_TEST"),
+            )
+            + _element(matroska.TRACK_ENTRY_ID, ass_track),
+        ),
+    ]
+
+    cues = []
+    for cluster_timestamp in sorted({event[0] for event in EVENTS}):
+        payload = _uint(matroska.CLUSTER_TIMESTAMP_ID, cluster_timestamp)
+        payload += _element(
+            matroska.SIMPLE_BLOCK_ID,
+            _block(1, 0, b"\xff" * VIDEO_BLOCK_SIZE),
+        )
+        for event in EVENTS:
+            if event[0] != cluster_timestamp:
+                continue
+            _cluster_timestamp, timestamp, duration, read_order, text = event
+            data = f"{read_order},0,Default,,0,0,0,,{text}".encode()
+            if compress:
+                data = zlib.compress(data)
+            cues.append((cluster_timestamp, timestamp, len(payload)))
+            payload += _element(
+                matroska.BLOCK_GROUP_ID,
+                _element(matroska.BLOCK_ID, _block(2, timestamp, data))
+                + _uint(matroska.BLOCK_DURATION_ID, duration),
+            )
+        children.append((matroska.CLUSTER_ID, payload))
+    if attachments:
+        children.append(
+            (
+                matroska.ATTACHMENTS_ID,
+                b"".join(
+                    _element(
+                        matroska.ATTACHED_FILE_ID,
+                        _string(matroska.FILE_NAME_ID, name)
+                        + _string(matroska.FILE_MIME_TYPE_ID, mime_type)
+                        + _element(matroska.FILE_DATA_ID, data),
+                    )
+                    for name, mime_type, data in attachments
+                ),
+            )
+        )
+    if use_cues:
+        children.append((matroska.CUES_ID, b""))
+
+    # the seek head only depends on the element count thanks to the fixed
+    # size integers
+    def build_seek_head(positions: list[int]) -> bytes:
+        return _element(
+            matroska.SEEK_HEAD_ID,
+            b"".join(
+                _element(
+                    matroska.SEEK_ID,
+                    _element(
+                        matroska.SEEK_ID_ID,
+                        element_id.to_bytes(4, "big"),
+                    )
+                    + _uint(matroska.SEEK_POSITION_ID, position),
+                )
+                for (element_id, _payload), position in zip(
+                    children, positions
+                )
+                if element_id != matroska.CLUSTER_ID
+            ),
+        )
+
+    def get_positions() -> list[int]:
+        positions = []
+        position = len(build_seek_head([0] * len(children)))
+        for element_id, payload in children:
+            positions.append(position)
+            position += len(_element(element_id, payload))
+        return positions
+
+    cluster_positions = dict(
+        zip(
+            sorted({event[0] for event in EVENTS}),
+            [
+                position
+                for (element_id, _payload), position in zip(
+                    children, get_positions()
+                )
+                if element_id == matroska.CLUSTER_ID
+            ],
+        )
+    )
+    if use_cues:
+        children[-1] = (
+            matroska.CUES_ID,
+            b"".join(
+                _element(
+                    CUE_POINT_ID,
+                    _uint(0xB3, cluster_timestamp + timestamp)
+                    + _element(
+                        CUE_TRACK_POSITIONS_ID,
+                        _uint(CUE_TRACK_ID, 2)
+                        + _uint(
+                            CUE_CLUSTER_POSITION_ID,
+                            cluster_positions[cluster_timestamp],
+                        )
+                        + _uint(
+                            CUE_RELATIVE_POSITION_ID,
+                            relative_position,
+                        ),
+                    ),
+                )
+                for i, (
+                    cluster_timestamp,
+                    timestamp,
+                    relative_position,
+                ) in enumerate(cues)
+                if cued_events is None or i in cued_events
+            ),
+        )
+
+    segment = build_seek_head(get_positions()) + b"".join(
+        _element(element_id, payload) for element_id, payload in children
+    )
+    path.write_bytes(
+        _element(matroska.EBML_ID, _string(0x4282, "matroska"))
+        + _element(matroska.SEGMENT_ID, segment)
+    )
+
+
+EXPECTED_EVENTS = [
+    ("first", 500, 900),
+    ("second", 1000, 2500),
+    ("third, with a comma", 62500, 64500),
+]
+
+
+class _CountingReader(io.RawIOBase):
+    def __init__(self, handle: Any) -> None:
+        self.handle = handle
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.handle.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.handle.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.handle.tell()
+
+    def close(self) -> None:
+        self.handle.close()
+
+
+def read_events(path: Path) -> list[tuple[str, int, int]]:
+    return [
+        (event.text, event.start, event.end) for event in read_ass(path).events
+    ]
+
+
+@pytest.mark.parametrize(
+    "build_kwargs",
+    [
+        {},
+        {"use_cues": False},
+        {"cued_events": [0, 2]},
+        # the cues only cover the beginning of the file
+        {"cued_events": [0, 1]},
+        {"compress": True},
+    ],
+)
+def test_read_ass(tmp_path: Path, build_kwargs: dict[str, Any]) -> None:
+    path = tmp_path / "test.mkv"
+    build_matroska(path, **build_kwargs)
+    assert read_events(path) == EXPECTED_EVENTS
+    assert read_ass(path).script_info["PlayResX"] == "1920"
+
+
+@pytest.mark.parametrize(
+    "build_kwargs",
+    [{}, {"cued_events": [0, 2]}, {"use_cues": False}],
+)
+def test_skips_video_data(
+    tmp_path: Path, build_kwargs: dict[str, Any]
+) -> None:
+    path = tmp_path / "test.mkv"
+    build_matroska(path, **build_kwargs)
+    with MatroskaReader(path) as reader:
+        reader._handle = _CountingReader(reader._handle)
+        reader.read_ass()
+        assert reader._handle.bytes_read < VIDEO_BLOCK_SIZE
+
+
+def test_attachments(tmp_path: Path, build_font: Callable[..., None]) -> None:
+    build_font(tmp_path / "font.ttf", "Attached Sans")
+    path = tmp_path / "test.mkv"
+    build_matroska(
+        path,
+        attachments=[
+            (
+                "font.ttf",
+                "application/x-truetype-font",
+                (tmp_path / "font.ttf").read_bytes(),
+            ),
+            ("cover.jpg", "image/jpeg", b"\xff\xd8"),
+        ],
+    )
+    ctx = make_context(path)
+    assert [attachment.name for attachment in ctx.font_attachments] == [
+        "font.ttf"
+    ]
+    fonts = get_embedded_fonts(ctx.ass_file, None, ctx.font_attachments)
+    assert {
+        path.as_posix(): font.names[0] for path, font in fonts.items()
+    } == {"[Attachments]/font.ttf": "Attached Sans"}
+
+
+def test_not_matroska(tmp_path: Path) -> None:
+    path = tmp_path / "test.mkv"
+    path.write_bytes(b"[Script Info]\n")
+    with pytest.raises(MatroskaError):
+        MatroskaReader(path)
+
+
+def test_content_key(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "test.mkv"
+    build_matroska(path, attachments=[("font.ttf", "font/ttf", b"old")])
+    key = get_content_key(path)
+
+    # same file size, different events
+    monkeypatch.setattr(
+        sys.modules[__name__],
+        "EVENTS",
+        [(*event[:-1], event[-1].upper()) for event in EVENTS],
+    )
+    build_matroska(path, attachments=[("font.ttf", "font/ttf", b"old")])
+    assert get_content_key(path) != key
+    monkeypatch.undo()
+
+    build_matroska(path, attachments=[("font.ttf", "font/ttf", b"new")])
+    assert get_content_key(path) != key
+
+    build_matroska(path, attachments=[("font.ttf", "font/ttf", b"old")])
+    assert get_content_key(path) == key
+
+
+def test_truncated_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(sys.modules[__name__], "VIDEO_BLOCK_SIZE", 10)
+    path = tmp_path / "test.mkv"
+    build_matroska(path, attachments=[("font.ttf", "font/ttf", b"font")])
+    data = path.read_bytes()
+    for size in range(len(data)):
+        path.write_bytes(data[:size])
+        try:
+            with MatroskaReader(path) as reader:
+                reader.read_ass()
+                reader.get_attachments()
+        except MatroskaError:
+            pass
+        assert get_content_key(path)
+
+    # cut within the last event
+    path.write_bytes(data[: data.index(b"third") + 1])
+    with pytest.raises(MatroskaError, match="unexpected end of file"):
+        read_matroska_ass(path)
@@ -0,0 +1,40 @@
+import pytest
+from ass_parser import AssEvent, AssEventList
+
+from ass_lint.profiler import CheckProfile, Profiler
+
+
+def test_check_profile_histogram() -> None:
+    profile = CheckProfile(name="test")
+    profile.event_times = [(0.00005, 1), (0.0005, 2), (0.0006, 3), (2.0, 4)]
+    assert profile.get_histogram() == [1, 2, 0, 0, 0, 1]
+
+
+def test_check_profile_slowest_events() -> None:
+    profile = CheckProfile(name="test")
+    profile.event_times = [(0.1, 1), (0.3, 2), (0.2, 3)]
+    assert profile.get_slowest_events(2) == [(0.3, 2), (0.2, 3)]
+
+
+def test_check_profile_measure_event() -> None:
+    event_list = AssEventList()
+    event_list.append(AssEvent())
+    profile = CheckProfile(name="test")
+    with profile.measure_event(event_list[0]):
+        pass
+    assert len(profile.event_times) == 1
+    assert profile.event_times[0][1] == 1
+
+
+@pytest.mark.asyncio
+async def test_profiler_measure_run() -> None:
+    async def gen():
+        yield 1
+        yield 2
+
+    profiler = Profiler()
+    profile = profiler.create_profile("test")
+    results = [result async for result in profiler.measure_run(profile, gen())]
+    assert results == [1, 2]
+    assert profile.run_time > 0
+    assert "test" in profiler.format_summary()
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import ass_parser
+import pytest
+
+from ass_lint.attachments import AssAttachmentSection
+from ass_lint.reader import AssReader, read_ass
+
+ASS_SOURCE = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 1280
+PlayResY: 720
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,48,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,2,2,10,10,10,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+{events}
+
+[Aegisub Project Garbage]
+Active Line: 2
+"""
+
+
+@pytest.fixture(name="ass_path")
+def fixture_ass_path(tmp_path: Path) -> Path:
+    events = "\n".join(
+        f"Dialogue: 0,0:00:{i // 100:02d}.{i % 100:02d},"
+        f"0:00:{i // 100:02d}.{i % 100:02d},Default,,0,0,0,,line {i}"
+        for i in range(1000)
+    )
+    path = tmp_path / "test.ass"
+    path.write_text(ASS_SOURCE.format(events=events))
+    return path
+
+
+def test_read_ass(ass_path: Path) -> None:
+    assert read_ass(ass_path) == ass_parser.read_ass(ass_path)
+
+
+def test_read_header_before_events(ass_path: Path) -> None:
+    reader = AssReader(ass_path)
+    ass_file = reader.read_header()
+    assert ass_file.script_info["PlayResX"] == "1280"
+    assert ass_file.styles.get_by_name("Default")
+    assert len(ass_file.events) == 0
+    assert not ass_file.extra_sections
+
+
+def test_iter_event_chunks(ass_path: Path) -> None:
+    reader = AssReader(ass_path)
+    reader.read_header()
+    seen = 0
+    for chunk in reader.iter_event_chunks():
+        assert chunk[0].index == seen
+        seen += len(chunk)
+        assert len(reader.ass_file.events) == seen
+    assert seen == 1000
+    assert reader.ass_file.events[999].text == "line 999"
+    assert reader.ass_file.extra_sections[0].name == "Aegisub Project Garbage"
+
+
+def test_read_ass_attachments(tmp_path: Path) -> None:
+    path = tmp_path / "test.ass"
+    path.write_text(
+        ASS_SOURCE.format(events="")
+        + "\n[Fonts]\n"
+        + "fontname: test_0.ttf\n"
+        + ";line starting with a semicolon\n"
+        + "[second line]x\n"
+        + "fontname: other_0.ttf\n"
+        + "abcd\n"
+        + "\n[Graphics]\n"
+        + "filename: logo.png\n"
+        + "efgh\n"
+    )
+    fonts_section, graphics_section = read_ass(path).extra_sections[1:]
+    assert isinstance(fonts_section, AssAttachmentSection)
+    assert [
+        (attachment.name, list(attachment.iter_lines()))
+        for attachment in fonts_section.attachments
+    ] == [
+        ("test_0.ttf", [";line starting with a semicolon", "[second line]x"]),
+        ("other_0.ttf", ["abcd"]),
+    ]
+    assert not any(
+        attachment.lines for attachment in fonts_section.attachments
+    )
+    assert graphics_section.name == "Graphics"
+    assert graphics_section.attachments[0].name == "logo.png"
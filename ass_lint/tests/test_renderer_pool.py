@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from ass_parser import AssEvent, AssEventList, AssFile, AssStyle
+
+from ass_lint import renderer_pool
+from ass_lint.common import BaseEventCheck, Violation, make_context
+from ass_lint.renderer_pool import RendererPool
+from ass_lint.util import strip_raster_only_tags
+
+
+@pytest.fixture(name="pool")
+def fixture_pool(monkeypatch: pytest.MonkeyPatch) -> RendererPool:
+    in_use: set[int] = set()
+    lock = threading.Lock()
+
+    def fake_measure_frame_size(
+        renderer, _styles_file, _video_resolution, event
+    ):
+        with lock:
+            assert id(renderer) not in in_use
+            in_use.add(id(renderer))
+        time.sleep(0.05)
+        with lock:
+            in_use.remove(id(renderer))
+        return (len(event.text), 1)
+
+    monkeypatch.setattr(
+        renderer_pool, "measure_frame_size", fake_measure_frame_size
+    )
+    pool = RendererPool(AssFile(), (1280, 720), workers=4)
+    monkeypatch.setattr(pool, "_create_renderer", Mock)
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_renderer_pool_measures_concurrently(pool: RendererPool) -> None:
+    events = [AssEvent(text="x" * i) for i in range(8)]
+    start = time.perf_counter()
+    sizes = await asyncio.gather(
+        *(pool.measure_frame_size(event) for event in events)
+    )
+    assert time.perf_counter() - start < 0.3
+    assert sizes == [(i, 1) for i in range(8)]
+    assert pool._renderers.qsize() <= 4
+
+
+def test_renderer_pool_close(pool: RendererPool) -> None:
+    pool.measure_frame_size_sync(AssEvent(text="x"))
+    assert pool._renderers.qsize() == 1
+    pool.close()
+    assert pool._renderers.empty()
+    with pytest.raises(RuntimeError):
+        pool._executor.submit(print)
+
+
+def test_context_closes_renderer_pool(pool: RendererPool) -> None:
+    ctx = make_context(Path("test.ass"), AssFile())
+    ctx.close()
+    assert "renderer_pool" not in vars(ctx)
+    ctx.renderer_pool = pool
+    ctx.close()
+    with pytest.raises(RuntimeError):
+        pool._executor.submit(print)
+
+
+class CheckMeasure(BaseEventCheck):
+    async def run_for_event(self, event: AssEvent) -> None:
+        width, _height = await self.ctx.renderer_pool.measure_frame_size(event)
+        yield Violation(str(width), [event])
+
+
+@pytest.mark.asyncio
+async def test_event_concurrency(pool: RendererPool) -> None:
+    events = AssEventList()
+    events.extend(AssEvent(text="x" * i) for i in range(1, 9))
+    context = Mock(ass_file=Mock(events=events), renderer_pool=pool, diff=None)
+    check = CheckMeasure(context)
+    check.event_concurrency = 4
+
+    start = time.perf_counter()
+    results = [result async for result in check.run()]
+    assert time.perf_counter() - start < 0.3
+    assert [result.text for result in results] == [str(i) for i in range(1, 9)]
+
+
+@pytest.mark.parametrize(
+    "text, outline, expected_text",
+    [
+        ("text", 0, "text"),
+        ("{\\bord2\\shad1.5}text", 0, "{}text"),
+        ("{\\xbord3\\yshad-2\\blur2\\be1}text", 0, "{}text"),
+        ("{\\b1\\i1\\fs20}text", 0, "{\\b1\\i1\\fs20}text"),
+        (
+            "{\\t(0,100,\\bord5\\fscx120)}text",
+            0,
+            "{\\t(0,100,\\fscx120)}text",
+        ),
+        ("text \\bord2", 0, "text \\bord2"),
+        # without a border, the blur applies to the glyph fill
+        ("{\\blur2}text", 0, "{\\blur2\\be0}text"),
+        ("{\\blur2}text", 3, "{}text"),
+        ("{\\be3\\bord0}text", 3, "{\\blur0\\be3}text"),
+        (
+            "{\\blur2}a{\\bord0}b{\\bord1}c",
+            3,
+            "{}a{\\blur2\\be0}b{\\blur0\\be0}c",
+        ),
+        ("{\\bord0\\blur2}a{\\r}b", 3, "{\\blur2\\be0}a{\\r}b"),
+    ],
+)
+def test_strip_raster_only_tags(
+    text: str, outline: float, expected_text: str
+) -> None:
+    assert strip_raster_only_tags(text, outline) == expected_text
+
+
+LAYOUT_CORPUS = [
+    "Short line.",
+    "A somewhat longer line that is likely to be wrapped by the renderer "
+    "once it reaches the right margin of the frame.",
+    "First line\\NSecond line",
+    "{\\bord6\\shad4}Thick border and shadow",
+    "{\\blur5}Blurred text",
+    "{\\be3\\bord0}Edge blur without border",
+    "{\\fs80\\xbord8\\yshad3}Big text",
+    "{\\i1}Italic{\\i0} and {\\b1}bold{\\b0}",
+    "{\\fscx150\\fsp5}Wide spacing",
+    "{\\an8\\pos(640,100)\\bord3}Positioned",
+]
+
+
+def test_metrics_only_matches_full_render() -> None:
+    try:
+        import ass_renderer  # pylint: disable=unused-import
+    except (ImportError, AssertionError):
+        pytest.skip("libass is not available")
+
+    ass_file = AssFile()
+    ass_file.script_info["PlayResX"] = "1280"
+    ass_file.script_info["PlayResY"] = "720"
+    ass_file.styles.append(
+        AssStyle(name="Default", font_size=48, outline=3, shadow=2)
+    )
+    full_pool = RendererPool(ass_file, (1280, 720), metrics_only=False)
+    metrics_pool = RendererPool(ass_file, (1280, 720), metrics_only=True)
+    for text in LAYOUT_CORPUS:
+        event = AssEvent(start=0, end=1000, text=text, style_name="Default")
+        assert metrics_pool.measure_frame_size_sync(
+            event
+        ) == full_pool.measure_frame_size_sync(event), text
@@ -0,0 +1,91 @@
+import logging
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ass_lint.common import (
+    BaseCheck,
+    CheckContext,
+    Information,
+    Violation,
+    make_context,
+)
+from ass_lint.config import Config
+from ass_lint.reader import AssReader
+from ass_lint.result_cache import (
+    ResultCache,
+    count_warnings,
+    get_result_cache_key,
+)
+
+ASS_TEXT = """[Script Info]
+PlayResX: 1280
+PlayResY: 720
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,Hello
+"""
+
+
+class CheckA(BaseCheck):
+    inputs: list[Any] = []
+
+    @classmethod
+    def get_external_inputs(cls, ctx: CheckContext) -> list[Any]:
+        return cls.inputs
+
+
+class CheckB(BaseCheck):
+    pass
+
+
+def get_key(path: Path, **kwargs: Any) -> str:
+    ctx = make_context(path, AssReader(path).read_header(), **kwargs)
+    return get_result_cache_key(ctx, [CheckA, CheckB], "check")
+
+
+def test_result_cache_key(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "test.ass"
+    path.write_text(ASS_TEXT)
+    key = get_key(path)
+    assert get_key(path) == key
+
+    path.write_text(ASS_TEXT.replace("Hello", "Hi"))
+    assert get_key(path) != key
+    path.write_text(ASS_TEXT)
+
+    monkeypatch.setattr(CheckB, "version", 2)
+    assert get_key(path) != key
+    monkeypatch.undo()
+
+    monkeypatch.setattr(CheckA, "inputs", ["dictionary"])
+    assert get_key(path) != key
+    monkeypatch.undo()
+
+    config = Config()
+    config.actor_names["sign"] = ["TS"]
+    assert get_key(path, config=config) != key
+    assert get_key(path) == key
+
+
+def test_result_cache(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path)
+    assert cache.get("key") is None
+    results = [Information("summary"), Violation("too short")]
+    cache.set("key", results)
+    cached = cache.get("key")
+    assert [type(result) for result in cached] == [Information, Violation]
+    assert [repr(result) for result in cached] == ["summary", "too short"]
+
+
+def test_count_warnings() -> None:
+    with count_warnings() as warnings:
+        logging.debug("debug")
+        assert warnings.count == 0
+        logging.warning("warning")
+    logging.warning("warning")
+    assert warnings.count == 1
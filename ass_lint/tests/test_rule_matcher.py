@@ -0,0 +1,123 @@
+import random
+from pathlib import Path
+
+import pytest
+import regex
+
+from ass_lint import rules as rules_module
+from ass_lint.config import ConfigError, load_config
+from ass_lint.event_flags import EventFlag
+from ass_lint.rules import Rule, RuleMatcher, load_rule_pack, parse_rule
+
+RULE_PACK = """
+[[rule]]
+pattern = "\\\\bSenpai\\\\b"
+message = "honorifics are lowercase"
+
+[[rule]]
+pattern = "(?i)okey dokey"
+message = "banned phrase"
+level = "info"
+categories = ["dialog"]
+languages = ["en"]
+"""
+
+
+def test_load_rule_pack(tmp_path: Path) -> None:
+    (tmp_path / "house.toml").write_text(RULE_PACK)
+    rules = load_rule_pack(tmp_path / "house.toml")
+    assert rules == [
+        Rule(pattern=r"\bSenpai\b", message="honorifics are lowercase"),
+        Rule(
+            pattern="(?i)okey dokey",
+            message="banned phrase",
+            level="info",
+            categories=frozenset({"dialog"}),
+            languages=("en",),
+        ),
+    ]
+    assert rules[1].category_flags == EventFlag.DIALOG
+    assert rules[1].applies_to_language("en_US")
+    assert not rules[1].applies_to_language("pl_PL")
+    assert rules[0].applies_to_language("pl_PL")
+
+
+def test_config_rule_packs(tmp_path: Path) -> None:
+    (tmp_path / "ass-lint.toml").write_text(
+        '[rules]\npacks = ["rules/house.toml"]\n'
+    )
+    config = load_config(tmp_path / "ass-lint.toml")
+    assert config.rule_packs == [tmp_path / "rules/house.toml"]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "not a table",
+        {"message": "no pattern"},
+        {"pattern": "(", "message": "bad pattern"},
+        {"pattern": "a", "message": "m", "level": "error"},
+        {"pattern": "a", "message": "m", "categories": ["narrator"]},
+        {"pattern": "a", "message": "m", "languages": [1]},
+    ],
+)
+def test_parse_rule_invalid(data: object) -> None:
+    with pytest.raises(ConfigError):
+        parse_rule(data, "test")
+
+
+def test_rule_matcher() -> None:
+    matcher = RuleMatcher(
+        [
+            Rule(pattern="(?i)foo", message="foo"),
+            Rule(pattern="bar", message="bar"),
+            Rule(pattern=r"\b(\w+) \1\b", message="repeated word"),
+            Rule(pattern="^Foo", message="leading foo"),
+        ]
+    )
+    assert matcher.standalone == [2]
+    assert [
+        (rule.message, text)
+        for rule, text in matcher.find_matches("Foo bar bar")
+    ] == [
+        ("foo", "Foo"),
+        ("bar", "bar"),
+        ("repeated word", "bar bar"),
+        ("leading foo", "Foo"),
+    ]
+    # the leading flags don't leak into the other rules
+    assert [rule.message for rule, _text in matcher.find_matches("BAR")] == []
+
+
+def test_rule_matcher_unscopable_flags() -> None:
+    matcher = RuleMatcher(
+        [
+            Rule(pattern="(?x) foo # trailing comment", message="verbose"),
+            Rule(pattern="b(?i)ar", message="late flags"),
+            Rule(pattern="baz", message="baz"),
+        ]
+    )
+    assert matcher.standalone == [0, 1]
+    assert [
+        (rule.message, text)
+        for rule, text in matcher.find_matches("FOO bAR BAZ foo bar baz")
+    ] == [("verbose", "foo"), ("late flags", "bAR"), ("baz", "baz")]
+    # the late flags don't leak into the other rules
+    assert [rule.message for rule, _text in matcher.find_matches("BAZ")] == []
+
+
+def test_rule_matcher_many_rules(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(rules_module, "MAX_GROUP_SIZE", 16)
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choice("abcde") for _ in range(rng.randint(2, 4)))
+        for _ in range(100)
+    ]
+    rules = [Rule(pattern=rf"\b{word}\b", message=word) for word in words]
+    matcher = RuleMatcher(rules)
+    assert len(matcher.groups) == 7
+    for _ in range(200):
+        text = " ".join(rng.choice(words) for _ in range(5))
+        assert [rule for rule, _text in matcher.find_matches(text)] == [
+            rule for rule in rules if regex.search(rule.pattern, text)
+        ]
@@ -0,0 +1,102 @@
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+import pytest
+from ass_parser import AssEvent, AssFile
+
+from ass_lint.common import (
+    BaseEventCheck,
+    BaseResult,
+    Information,
+    Skipped,
+    Violation,
+    make_context,
+)
+from ass_lint.event_flags import EventClassifier
+from ass_lint.sampling import sample_events
+
+
+def make_ass_file() -> AssFile:
+    ass_file = AssFile()
+    ass_file.events.extend(
+        [
+            *(
+                AssEvent(style_name="Default", text="dialog")
+                for _ in range(90)
+            ),
+            *(
+                AssEvent(style_name="Sign", actor="[sign]", text="sign")
+                for _ in range(10)
+            ),
+            *(AssEvent(text="comment", is_comment=True) for _ in range(5)),
+        ]
+    )
+    return ass_file
+
+
+def test_sample_events() -> None:
+    events = make_ass_file().events
+    sample = sample_events(events, EventClassifier(events), 0.1, seed=1)
+    assert sample.population == 100
+    assert Counter(events[idx].style_name for idx in sample.weights) == {
+        "Default": 9,
+        "Sign": 1,
+    }
+    assert sample.get_weight(min(sample.weights)) == 10
+    assert sum(sample.weights.values()) == pytest.approx(100)
+
+
+def test_sample_events_seed() -> None:
+    events = make_ass_file().events
+    classifier = EventClassifier(events)
+    sample = sample_events(events, classifier, 0.1, seed=1)
+    assert sample_events(events, classifier, 0.1, seed=1) == sample
+    assert sample_events(events, classifier, 0.1, seed=2) != sample
+
+
+class CheckExpensive(BaseEventCheck):
+    expensive = True
+
+    async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
+        if event.style_name == "Sign":
+            yield Violation("sign", [event])
+
+
+@pytest.mark.asyncio
+async def test_sampled_check() -> None:
+    ctx = make_context(Path("test.ass"), make_ass_file(), sample_fraction=0.2)
+    results = [result async for result in CheckExpensive(ctx).run()]
+    assert [type(result) for result in results] == [
+        Violation,
+        Violation,
+        Information,
+    ]
+    assert results[-1].text == (
+        "CheckExpensive: sampled 20/100 events (20%), found 2 findings, "
+        "about 10 estimated in total"
+    )
+
+    ctx = make_context(Path("test.ass"), make_ass_file())
+    results = [result async for result in CheckExpensive(ctx).run()]
+    assert len(results) == 10
+
+
+class CheckExpensiveInformation(BaseEventCheck):
+    expensive = True
+
+    async def run_for_event(self, event: AssEvent) -> Iterable[BaseResult]:
+        if event.style_name == "Sign":
+            yield Information("sign", [event])
+        else:
+            yield Skipped("not a sign", [event])
+
+
+@pytest.mark.asyncio
+async def test_sampled_check_counts_all_findings() -> None:
+    ctx = make_context(Path("test.ass"), make_ass_file(), sample_fraction=0.2)
+    results = [result async for result in CheckExpensiveInformation(ctx).run()]
+    assert results[-1].text == (
+        "CheckExpensiveInformation: sampled 20/100 events (20%), "
+        "found 2 findings, about 10 estimated in total"
+    )
@@ -0,0 +1,273 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+from unittest.mock import Mock
+
+import pytest
+from ass_parser import AssEvent, AssEventList, AssFile
+
+from ass_lint.checks import grammar
+from ass_lint.checks.grammar import CheckGrammar
+from ass_lint.common import (
+    BaseCheck,
+    BaseEventCheck,
+    ExecutionMode,
+    Information,
+    Resource,
+    Violation,
+)
+from ass_lint.event_flags import EventClassifier
+from ass_lint.grammar import GrammarBackend
+from ass_lint.scheduler import ResultOrder, Scheduler, TimeBudget
+
+
+@pytest.fixture(name="context")
+def fixture_context() -> Mock:
+    events = AssEventList()
+    events.extend([AssEvent(), AssEvent(), AssEvent()])
+    return Mock(ass_file=Mock(events=events), diff=None)
+
+
+class CheckSlowThread(BaseCheck):
+    execution_mode = ExecutionMode.thread
+
+    async def run(self) -> None:
+        time.sleep(0.2)
+        yield Violation("slow", [self.ctx.ass_file.events[2]])
+
+
+class CheckMeeting(BaseCheck):
+    """Waits for another check to run at the same time, failing if none
+    does.
+    """
+
+    execution_mode = ExecutionMode.thread
+    barrier = threading.Barrier(2, timeout=5)
+
+    async def run(self) -> None:
+        CheckMeeting.barrier.wait()
+        yield Information("met")
+
+
+class CheckOtherMeeting(CheckMeeting):
+    pass
+
+
+class CheckFast(BaseCheck):
+    async def run(self) -> None:
+        yield Violation("fast 1", [self.ctx.ass_file.events[0]])
+        yield Information("fast summary")
+
+
+class CheckBroken(BaseCheck):
+    async def run(self) -> None:
+        raise RuntimeError("broken")
+        yield  # pylint: disable=unreachable
+
+
+class CheckCounting(BaseCheck):
+    execution_mode = ExecutionMode.thread
+    running = 0
+    max_running = 0
+
+    async def run(self) -> None:
+        CheckCounting.running += 1
+        CheckCounting.max_running = max(
+            CheckCounting.max_running, CheckCounting.running
+        )
+        time.sleep(0.05)
+        CheckCounting.running -= 1
+        yield Information("counted")
+
+
+class CheckOtherCounting(CheckCounting):
+    pass
+
+
+class CheckRenderer(CheckMeeting):
+    resources = frozenset({Resource.renderer})
+
+
+class CheckOtherRenderer(CheckRenderer):
+    pass
+
+
+class CheckProcess(BaseCheck):
+    execution_mode = ExecutionMode.process
+
+    async def run(self) -> None:
+        events = self.ctx.ass_file.events
+        yield Violation(f"{len(events)} events", [events[1]])
+
+
+def make_process_context(ass_file: Optional[AssFile] = None) -> Mock:
+    assert ass_file is not None, "the file shouldn't be read again"
+    return Mock(ass_file=ass_file, diff=None)
+
+
+class CheckSlowEvents(BaseEventCheck):
+    execution_mode = ExecutionMode.thread
+
+    async def run_for_event(self, event: AssEvent) -> None:
+        time.sleep(0.1)
+        yield Violation("checked", [event])
+
+
+class CheckConcurrentText(BaseEventCheck):
+    text_only = True
+    event_concurrency = 2
+
+    async def run_for_event(self, event: AssEvent) -> None:
+        yield Violation("checked", [event])
+
+
+class SlowGrammarBackend(GrammarBackend):
+    def supports(self, language: str) -> bool:
+        return True
+
+    async def get_version(self) -> str:
+        return "1"
+
+    async def check(
+        self, texts: list[str], language: str
+    ) -> list[Optional[str]]:
+        await asyncio.sleep(0.2)
+        return [f"{text}!" for text in texts]
+
+
+def make_text_context(texts: list[str]) -> Mock:
+    events = AssEventList()
+    events.extend(AssEvent(text=text) for text in texts)
+    return Mock(
+        ass_file=Mock(events=events),
+        event_flags=EventClassifier(events),
+        diff=None,
+        sample_fraction=None,
+        language="en_US",
+        open_cache=Mock(return_value=None),
+    )
+
+
+async def collect(scheduler: Scheduler, checks: list[type[BaseCheck]]):
+    return [result async for result in scheduler.run(checks)]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_check_order(context: Mock) -> None:
+    scheduler = Scheduler(context, Mock, jobs=4)
+    results = await collect(scheduler, [CheckSlowThread, CheckFast])
+    assert [result.text for result in results] == [
+        "slow",
+        "fast 1",
+        "fast summary",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_event_order(context: Mock) -> None:
+    scheduler = Scheduler(context, Mock, jobs=4, order=ResultOrder.event)
+    results = await collect(scheduler, [CheckSlowThread, CheckFast])
+    assert [result.text for result in results] == [
+        "fast 1",
+        "slow",
+        "fast summary",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_concurrently(context: Mock) -> None:
+    scheduler = Scheduler(context, Mock, jobs=2)
+    results = await collect(scheduler, [CheckMeeting, CheckOtherMeeting])
+    assert [result.text for result in results] == ["met", "met"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_concurrency_limit(context: Mock) -> None:
+    CheckCounting.max_running = 0
+    scheduler = Scheduler(context, Mock, jobs=1)
+    results = await collect(scheduler, [CheckCounting, CheckOtherCounting])
+    assert len(results) == 2
+    assert CheckCounting.max_running == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_renderer_is_shared(context: Mock) -> None:
+    scheduler = Scheduler(context, Mock, jobs=2)
+    results = await collect(scheduler, [CheckRenderer, CheckOtherRenderer])
+    assert [result.text for result in results] == ["met", "met"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_process_gets_parsed_file() -> None:
+    ass_file = AssFile()
+    ass_file.events.extend([AssEvent(), AssEvent(), AssEvent()])
+    scheduler = Scheduler(Mock(ass_file=ass_file), make_process_context)
+    results = await collect(scheduler, [CheckProcess])
+    assert [result.text for result in results] == ["3 events"]
+    assert results[0].events == [ass_file.events[1]]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_broken_check(context: Mock) -> None:
+    scheduler = Scheduler(context, Mock, jobs=2)
+    results = await collect(scheduler, [CheckBroken, CheckFast])
+    assert [result.text for result in results] == ["fast 1", "fast summary"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_check_timeout(context: Mock) -> None:
+    scheduler = Scheduler(
+        context, Mock, jobs=2, time_budget=TimeBudget(per_check=0.15)
+    )
+    results = await collect(scheduler, [CheckSlowEvents, CheckFast])
+    assert [result.text for result in results] == [
+        "checked",
+        "checked",
+        "CheckSlowEvents: timed out after 2/3 events",
+        "fast 1",
+        "fast summary",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_global_timeout(context: Mock) -> None:
+    scheduler = Scheduler(
+        context,
+        Mock,
+        time_budget=TimeBudget(per_check=10, deadline=time.time()),
+    )
+    results = await collect(scheduler, [CheckSlowEvents])
+    assert [result.text for result in results] == [
+        "CheckSlowEvents: timed out after 0/3 events"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_grammar_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        grammar, "create_backend", lambda _context: SlowGrammarBackend()
+    )
+    scheduler = Scheduler(
+        make_text_context(["a", "b", "c"]),
+        Mock,
+        time_budget=TimeBudget(per_check=0.3),
+    )
+    results = await collect(scheduler, [CheckGrammar])
+    assert [result.text for result in results] == [
+        "suggested change: a!",
+        "suggested change: b!",
+        "CheckGrammar: timed out after 2/3 events",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_check_counts_skipped_events() -> None:
+    check = CheckConcurrentText(
+        make_text_context(["a", "{\\p1}m 0 0 l 1 1{\\p0}", "b"])
+    )
+    results = [result async for result in check.run()]
+    assert [result.events[0].text for result in results] == ["a", "b"]
+    assert check.checked_event_count == 3
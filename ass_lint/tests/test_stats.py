@@ -0,0 +1,40 @@
+import pytest
+from ass_parser import AssEvent, AssEventList
+
+from ass_lint.event_flags import EventClassifier
+from ass_lint.stats import collect_stats, get_on_screen_time
+
+
+def test_collect_stats() -> None:
+    events = AssEventList()
+    events.extend(
+        [
+            AssEvent(start=0, end=1000, text="Hey!", actor="A"),
+            AssEvent(start=500, end=1500, text="{\\i1}What…", style_name="S"),
+            AssEvent(start=0, end=9000, text="Nope!", is_comment=True),
+            AssEvent(start=2000, end=3000, text="La!", actor="karaoke"),
+        ]
+    )
+    stats = collect_stats(events, EventClassifier(events))
+    assert stats.actors == {"A": 1, "": 2, "karaoke": 1}
+    assert stats.styles == {"": 3, "S": 1}
+    assert stats.punctuation == {"!": 2, "…": 1}
+    assert stats.style_durations == {"": 2000, "S": 1000}
+    assert stats.style_characters == {"": 5, "S": 4}
+    assert stats.on_screen_time == 2500
+
+
+@pytest.mark.parametrize(
+    "intervals, expected",
+    [
+        ([], 0),
+        ([(0, 10)], 10),
+        ([(0, 10), (5, 15)], 15),
+        ([(0, 10), (2, 4), (20, 30)], 20),
+        ([(5, 5), (10, 0)], 0),
+    ],
+)
+def test_get_on_screen_time(
+    intervals: list[tuple[int, int]], expected: int
+) -> None:
+    assert get_on_screen_time(intervals) == expected
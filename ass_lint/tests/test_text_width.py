@@ -0,0 +1,92 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from ass_parser import AssEvent, AssFile, AssStyle
+
+from ass_lint.fonts import get_fonts
+from ass_lint.text_width import FontMetrics, TextWidthEstimator
+
+
+@pytest.fixture(name="fonts_dir")
+def fixture_fonts_dir(tmp_path: Path, build_font: Callable[..., None]) -> Path:
+    build_font(tmp_path / "test.ttf", "Test Sans")
+    return tmp_path
+
+
+def make_ass_file(**style_kwargs) -> AssFile:
+    ass_file = AssFile()
+    ass_file.script_info["PlayResX"] = "1000"
+    ass_file.script_info["PlayResY"] = "1000"
+    ass_file.styles.append(
+        AssStyle(
+            name="Default",
+            font_name="Test Sans",
+            font_size=100,
+            **{"bold": False, "italic": False, **style_kwargs},
+        )
+    )
+    return ass_file
+
+
+def make_estimator(ass_file: AssFile, fonts_dir: Path) -> TextWidthEstimator:
+    return TextWidthEstimator(
+        ass_file=ass_file,
+        video_resolution=(1000, 1000),
+        fonts=get_fonts((fonts_dir,)),
+    )
+
+
+def test_font_metrics(fonts_dir: Path) -> None:
+    metrics = FontMetrics(fonts_dir / "test.ttf")
+    assert metrics.units_per_size == 1000
+    # 500 + 600 - 100 kerning - 50 left bearing
+    assert metrics.get_width("ab") == 950
+    assert metrics.get_width("ba") == 1050
+    assert metrics.get_width("") == 0
+    assert metrics.get_width("ac") is None
+
+
+@pytest.mark.parametrize(
+    "text, style_kwargs, expected_width",
+    [
+        ("ab", {}, 95),
+        ("ab\\Nbaa", {}, 155),
+        ("a b", {}, 130),
+        ("ab", {"scale_x": 200}, 190),
+        ("ab", {"spacing": 10}, 105),
+        ("ab{\\fs50}", {}, None),
+        ("abc", {}, None),
+        ("ab" * 100, {}, None),
+        ("ab", {"bold": True}, None),
+    ],
+)
+def test_estimate_frame_width(
+    fonts_dir: Path,
+    text: str,
+    style_kwargs: dict,
+    expected_width: float,
+) -> None:
+    estimator = make_estimator(make_ass_file(**style_kwargs), fonts_dir)
+    event = AssEvent(text=text, style_name="Default")
+    assert estimator.estimate_frame_width(event) == expected_width
+
+
+def test_estimate_frame_width_unknown_font(tmp_path: Path) -> None:
+    estimator = make_estimator(make_ass_file(), tmp_path)
+    assert (
+        estimator.estimate_frame_width(
+            AssEvent(text="ab", style_name="Default")
+        )
+        is None
+    )
+
+
+def test_margin(fonts_dir: Path) -> None:
+    estimator = make_estimator(make_ass_file(), fonts_dir)
+    assert estimator.is_clearly_below(90, 100)
+    assert not estimator.is_clearly_below(98, 100)
+    assert not estimator.is_clearly_below(None, 100)
+    assert estimator.is_clearly_above(110, 100)
+    assert not estimator.is_clearly_above(102, 100)
+    assert not estimator.is_clearly_above(None, 100)
@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import pytest
+from ass_parser import AssFile, AssStyle
+
+from ass_lint import util
+from ass_lint.cache import DiskCache
+
+
+@pytest.fixture(name="rendered_styles")
+def fixture_rendered_styles(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    rendered_styles: list[str] = []
+
+    def fake_render(
+        _ass_file: AssFile,
+        _video_resolution: tuple[int, int],
+        styles: list[AssStyle],
+    ) -> dict[str, float]:
+        rendered_styles.extend(style.name for style in styles)
+        return {style.name: style.font_size * 1.25 for style in styles}
+
+    monkeypatch.setattr(util, "_render_optimal_line_heights", fake_render)
+    monkeypatch.setattr(util, "_line_height_memo", {})
+    return rendered_styles
+
+
+def make_ass_file(*styles: AssStyle) -> AssFile:
+    ass_file = AssFile()
+    ass_file.script_info["PlayResX"] = "1920"
+    ass_file.script_info["PlayResY"] = "1080"
+    ass_file.styles.extend(styles)
+    return ass_file
+
+
+def test_get_optimal_line_heights_memo(rendered_styles: list[str]) -> None:
+    ass_file1 = make_ass_file(
+        AssStyle(name="Default", font_size=40),
+        AssStyle(name="Alt", font_size=40),
+    )
+    ass_file2 = make_ass_file(
+        AssStyle(name="Default", font_size=40),
+        AssStyle(name="Big", font_size=80),
+    )
+    assert util.get_optimal_line_heights(ass_file1, (1920, 1080)) == {
+        "Default": 50,
+        "Alt": 50,
+    }
+    assert util.get_optimal_line_heights(ass_file2, (1920, 1080)) == {
+        "Default": 50,
+        "Big": 100,
+    }
+    # identical definitions are only rendered once, regardless of names
+    assert rendered_styles == ["Default", "Big"]
+
+
+def test_get_optimal_line_heights_persistent_cache(
+    rendered_styles: list[str], tmp_path: Path
+) -> None:
+    ass_file = make_ass_file(AssStyle(name="Default", font_size=40))
+    cache = DiskCache("line_heights", tmp_path)
+    util.get_optimal_line_heights(ass_file, (1920, 1080), cache=cache)
+    util._line_height_memo.clear()
+    assert util.get_optimal_line_heights(
+        ass_file, (1920, 1080), cache=cache
+    ) == {"Default": 50}
+    assert rendered_styles == ["Default"]
+
+
+def test_get_optimal_line_heights_script_info(
+    rendered_styles: list[str],
+) -> None:
+    ass_file = make_ass_file(AssStyle(name="Default", font_size=40))
+    util.get_optimal_line_heights(ass_file, (1920, 1080))
+    ass_file.script_info["ScaledBorderAndShadow"] = "yes"
+    util.get_optimal_line_heights(ass_file, (1920, 1080))
+    assert rendered_styles == ["Default", "Default"]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("hello", "hello"),
+        ("{\\p1}m 0 0 l 10 10{\\p0}", "{\\p1}{\\p0}"),
+        ("a{\\p1}m 0 0 l 1 1{\\p0}b", "a{\\p1}{\\p0}b"),
+        ("{\\pos(1,2)\\p2}m 0 0 l 1 1", "{\\pos(1,2)\\p2}"),
+    ],
+)
+def test_strip_drawings(text: str, expected: str) -> None:
+    assert util.strip_drawings(text) == expected
+
+
+def test_get_plaintext() -> None:
+    assert util.get_plaintext("{\\p1}m 0 0 l 1 1{\\p0}Hello") == "Hello"
+    assert util.get_plaintext("{\\i1}Hello{\\i0}") == "Hello"
@@ -0,0 +1,214 @@
+import argparse
+import statistics
+from functools import cache
+from pathlib import Path
+from typing import Optional
+
+import fontTools.ttLib as font_tools
+from ass_parser import AssEvent, AssFile, AssStyle
+
+from ass_lint.common import DEFAULT_FONTS_DIRS, make_context
+from ass_lint.fonts import FontInfo, locate_font
+from ass_lint.util import (
+    DEFAULT_WIDTH_MARGIN,
+    get_video_height,
+    get_video_width,
+)
+
+
+class FontMetrics:
+    """Horizontal metrics of a single font file."""
+
+    def __init__(self, font_path: Path, font_number: int = 0) -> None:
+        font = font_tools.TTFont(font_path, lazy=True, fontNumber=font_number)
+
+        self.cmap: dict[int, str] = font.getBestCmap() or {}
+        self.advances: dict[str, int] = {
+            glyph_name: advance
+            for glyph_name, (advance, _lsb) in font["hmtx"].metrics.items()
+        }
+        self.left_bearings: dict[str, int] = {
+            glyph_name: lsb
+            for glyph_name, (_advance, lsb) in font["hmtx"].metrics.items()
+        }
+
+        # libass scales the font so that the Windows ascent and descent add
+        # up to the requested font size
+        os2 = font["OS/2"] if "OS/2" in font else None
+        if os2 and os2.usWinAscent + os2.usWinDescent:
+            self.units_per_size = os2.usWinAscent + os2.usWinDescent
+        else:
+            hhea = font["hhea"]
+            self.units_per_size = hhea.ascent - hhea.descent
+
+        self.kerning: dict[tuple[str, str], int] = {}
+        if "kern" in font:
+            for table in font["kern"].kernTables:
+                if table.format == 0 and hasattr(table, "kernTable"):
+                    self.kerning.update(table.kernTable)
+
+    def get_width(self, text: str) -> Optional[float]:
+        """Measure the advance width of given text in font units.
+
+        :param text: text to measure
+        :return: width, or None if the font lacks some of the glyphs
+        """
+        glyph_names = []
+        for char in text:
+            glyph_name = self.cmap.get(ord(char))
+            if glyph_name is None:
+                return None
+            glyph_names.append(glyph_name)
+        if not glyph_names:
+            return 0
+
+        width = sum(self.advances[glyph_name] for glyph_name in glyph_names)
+        for pair in zip(glyph_names, glyph_names[1:]):
+            width += self.kerning.get(pair, 0)
+        # the rendered bitmap starts where the first glyph's ink starts
+        width -= self.left_bearings[glyph_names[0]]
+        return width
+
+
+@cache
+def get_font_metrics(font_path: Path, font_number: int = 0) -> FontMetrics:
+    return FontMetrics(font_path, font_number)
+
+
+class TextWidthEstimator:
+    """Estimates rendered line widths from font advance widths.
+
+    Only handles events that libass would lay out trivially: no override
+    tags, no automatic wrapping and an exact font match, so that no faux
+    bold, faux italic or font fallback gets involved. Everything else is left
+    to the renderer.
+    """
+
+    def __init__(
+        self,
+        ass_file: AssFile,
+        video_resolution: tuple[int, int],
+        fonts: dict[Path, FontInfo],
+        margin: float = DEFAULT_WIDTH_MARGIN,
+    ) -> None:
+        self.ass_file = ass_file
+        self.video_resolution = video_resolution
+        self.fonts = fonts
+        self.margin = margin
+        self._styles = {style.name: style for style in ass_file.styles}
+
+    def estimate_frame_width(self, event: AssEvent) -> Optional[float]:
+        """Estimate the width of given event, in the same units as
+        measure_frame_size.
+
+        :param event: event to measure
+        :return: the widest line's width, or None if it can't be estimated
+        """
+        if "{" in event.text or "\\n" in event.text:
+            return None
+        style = self._styles.get(event.style_name)
+        if not style:
+            return None
+        metrics = self._get_metrics(style)
+        if not metrics:
+            return None
+
+        play_res_x = get_video_width(self.ass_file)
+        play_res_y = get_video_height(self.ass_file)
+        if not play_res_x or not play_res_y:
+            return None
+        font_scale = self.video_resolution[1] / play_res_y
+        pixel_aspect = (self.video_resolution[0] / play_res_x) / font_scale
+        scale_x = style.scale_x / 100 * pixel_aspect
+        max_line_width = (
+            play_res_x - style.margin_left - style.margin_right
+        ) * (self.video_resolution[0] / play_res_x)
+
+        ret = 0.0
+        for line in event.text.replace("\\h", "\N{NO-BREAK SPACE}").split(
+            "\\N"
+        ):
+            line = line.strip(" ")
+            units = metrics.get_width(line)
+            if units is None:
+                return None
+            width = units * style.font_size / metrics.units_per_size
+            width += style.spacing * max(len(line) - 1, 0)
+            width *= scale_x * font_scale
+            if width > max_line_width:
+                # libass might wrap the line
+                return None
+            ret = max(ret, width)
+        return ret * self.video_resolution[0] / self.video_resolution[1]
+
+    def is_clearly_below(self, width: Optional[float], limit: float) -> bool:
+        return width is not None and width * (1 + self.margin) < limit
+
+    def is_clearly_above(self, width: Optional[float], limit: float) -> bool:
+        return width is not None and width * (1 - self.margin) > limit
+
+    def _get_metrics(self, style: AssStyle) -> Optional[FontMetrics]:
+        result = locate_font(
+            self.fonts, style.font_name, style.bold, style.italic
+        )
+        if not result:
+            return None
+        _weight, _font_path, font = result
+        if (
+            font.font_path is None
+            or font.is_bold != style.bold
+            or font.is_italic != style.italic
+        ):
+            return None
+        return get_font_metrics(font.font_path, font.font_number)
+
+
+def validate(paths: list[Path], fonts_dirs: list[Path]) -> None:
+    """Report the estimator error against the renderer."""
+    errors: list[float] = []
+    skipped = 0
+    for path in paths:
+        ctx = make_context(path)
+        ctx.fonts_dirs = fonts_dirs
+        estimator = ctx.text_width
+        if not estimator:
+            raise SystemExit(f"no fonts found for {path}")
+        for event in ctx.ass_file.events:
+            if event.is_comment or not event.text:
+                continue
+            estimate = estimator.estimate_frame_width(event)
+            if estimate is None:
+                skipped += 1
+                continue
+            width, _height = ctx.renderer_pool.measure_frame_size_sync(event)
+            if width:
+                errors.append((estimate - width) / width)
+
+    print(f"estimated: {len(errors)}, left to the renderer: {skipped}")
+    if not errors:
+        return
+    abs_errors = sorted(abs(error) for error in errors)
+    print(f"mean error: {statistics.mean(errors):+.2%}")
+    print(f"mean absolute error: {statistics.mean(abs_errors):.2%}")
+    print(f"95th percentile: {abs_errors[int(len(abs_errors) * 0.95)]:.2%}")
+    print(f"max absolute error: {abs_errors[-1]:.2%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="compare estimated line widths with the rendered ones"
+    )
+    parser.add_argument("paths", type=Path, nargs="+")
+    parser.add_argument(
+        "--fonts-dir",
+        type=Path,
+        action="append",
+        dest="fonts_dirs",
+        metavar="DIR",
+    )
+    args = parser.parse_args()
+    validate(args.paths, args.fonts_dirs or DEFAULT_FONTS_DIRS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 import enum
 import logging
 import os
+import re
+import sys
+import threading
+import time
 from contextlib import contextmanager
 from copy import copy
-from datetime import datetime
-from typing import Optional
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-from ass_parser import AssEvent, AssFile
-from ass_renderer import AssRenderer
+from ass_parser import AssEvent, AssFile, AssStyle
+from ass_tag_parser import ass_to_plaintext
+
+from ass_lint.cache import make_cache_key
+
+if TYPE_CHECKING:
+    from ass_renderer import AssRenderer
+
+    from ass_lint.cache import DiskCache
 
 
 class AspectRatio(enum.Enum):
@@ -20,6 +32,20 @@ WIDTH_MULTIPLIERS = {
     AspectRatio.AR_16_9: {1: 0.7, 2: 0.9},
 }
 
+# override tags that only affect the outline, shadow and blur bitmaps, but not
+# the glyph layout
+RASTER_ONLY_TAG_RE = re.compile(r"\\(?:[xy]?bord|[xy]?shad|blur|be)[-\d.]*")
+# tags whose state decides what the blur applies to, outside of \t
+BLUR_STATE_TAG_RE = re.compile(r"\\(xbord|ybord|bord|blur|be|r)([^\\}()]*)")
+TRANSFORM_TAG_RE = re.compile(r"\\t\((?:[^()]|\([^()]*\))*\)")
+OVERRIDE_BLOCK_RE = re.compile(r"{[^}]*}")
+DRAWING_RE = re.compile(r"{[^}]*\\p[1-9]")
+DRAWING_MODE_RE = re.compile(r"\\p(\d+)")
+
+# relative error tolerated before falling back to the renderer
+DEFAULT_WIDTH_MARGIN = 0.05
+NON_WORD_RE = re.compile(r"\W+", flags=re.I | re.U)
+
 NON_STUTTER_PREFIXES = {"half", "well"}
 NON_STUTTER_SUFFIXES = {"kun", "san", "chan", "smaa", "senpai", "sensei"}
 NON_STUTTER_WORDS = {
@@ -36,23 +62,67 @@ NON_STUTTER_WORDS = {
 }
 WORDS_WITH_PERIOD = {"vs.", "Mrs.", "Mr.", "Jr.", "U.F.O.", "a.k.a."}
 
+# style and script info fields that affect the rendered line height
+LINE_HEIGHT_STYLE_FIELDS = (
+    "font_name",
+    "font_size",
+    "bold",
+    "italic",
+    "underline",
+    "strike_out",
+    "scale_x",
+    "scale_y",
+    "spacing",
+    "angle",
+    "border_style",
+    "outline",
+    "shadow",
+    "alignment",
+    "margin_left",
+    "margin_right",
+    "margin_vertical",
+    "encoding",
+)
+# WrapStyle is left out, the heights are always measured without wrapping
+LINE_HEIGHT_SCRIPT_INFO_FIELDS = (
+    "ScaledBorderAndShadow",
+    "PlayResX",
+    "PlayResY",
+)
+
+# shared by all the files checked within a single process
+_line_height_memo: dict[str, float] = {}
+_line_height_memo_lock = threading.Lock()
+
 
 def measure_frame_size(
-    renderer: AssRenderer, video_resolution: tuple[int, int], event: AssEvent
+    renderer: "AssRenderer",
+    styles_file: AssFile,
+    video_resolution: tuple[int, int],
+    event: AssEvent,
+    render_resolution: Optional[tuple[int, int]] = None,
 ) -> tuple[int, int]:
-    if not any(
-        style.name == event.style_name for style in renderer.ass_file.styles
-    ):
+    """Measure the size of given event on the screen.
+
+    :param renderer: renderer to measure with, its source gets replaced
+    :param styles_file: file with the styles and script info to render with
+    :param video_resolution: resolution of the video
+    :param event: event to measure
+    :param render_resolution: resolution to render at, the video resolution
+        by default
+    :return: width and height of the event in pixels
+    """
+    if not any(style.name == event.style_name for style in styles_file.styles):
         return (0, 0)
 
     fake_file = AssFile()
-    fake_file.styles[:] = [copy(style) for style in renderer.ass_file.styles]
+    fake_file.styles[:] = [copy(style) for style in styles_file.styles]
     fake_file.events[:] = [copy(event)]
-    fake_file.script_info.update(renderer.ass_file.script_info)
+    fake_file.script_info.update(styles_file.script_info)
 
     renderer.set_source(
         ass_file=fake_file,
-        video_resolution=renderer.video_resolution,
+        video_resolution=render_resolution or video_resolution,
     )
 
     layers = [
@@ -70,25 +140,174 @@ def measure_frame_size(
     return (int((max_x - min_x) * aspect_ratio), max_y - min_y)
 
 
+def _parse_tag_value(value: str, default: float) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def strip_raster_only_tags(text: str, outline: float = 0) -> str:
+    """Remove the tags that only affect borders, shadows and blur.
+
+    libass blurs the border if there is one, and the glyph fill otherwise,
+    which makes the fill larger. As the borders are gone in the metrics-only
+    mode, explicit blur is put back just where the border was zero.
+
+    :param text: ASS text to strip
+    :param outline: border width of the event's style
+    :return: the stripped text
+    """
+    border = [outline, outline]
+    blur = [0.0, 0.0]
+    fill_blur = [0.0, 0.0]
+
+    def strip_block(match: re.Match) -> str:
+        block = match.group(0)
+        for name, value in BLUR_STATE_TAG_RE.findall(
+            TRANSFORM_TAG_RE.sub("", block)
+        ):
+            if name == "r":
+                # approximated with the event's style for named styles too
+                border[:] = [outline, outline]
+                blur[:] = fill_blur[:] = [0.0, 0.0]
+            elif name == "bord":
+                border[:] = [_parse_tag_value(value, outline)] * 2
+            elif name == "xbord":
+                border[0] = _parse_tag_value(value, outline)
+            elif name == "ybord":
+                border[1] = _parse_tag_value(value, outline)
+            elif name == "blur":
+                blur[0] = _parse_tag_value(value, 0)
+            else:
+                blur[1] = _parse_tag_value(value, 0)
+
+        block = RASTER_ONLY_TAG_RE.sub("", block)
+        wanted = blur[:] if border == [0, 0] else [0.0, 0.0]
+        if wanted != fill_blur:
+            fill_blur[:] = wanted
+            block = f"{block[:-1]}\\blur{wanted[0]:g}\\be{wanted[1]:g}}}"
+        return block
+
+    return OVERRIDE_BLOCK_RE.sub(strip_block, text)
+
+
+def make_metrics_only_style(style: AssStyle) -> AssStyle:
+    """Copy given style so that only the glyph fill gets rendered.
+
+    The fill is the only part measure_frame_size looks at, and its bounding
+    box doesn't depend on borders or shadows.
+    """
+    ret = copy(style)
+    ret.outline = 0
+    ret.shadow = 0
+    return ret
+
+
+def get_renderer_version() -> str:
+    try:
+        return metadata.version("ass_renderer")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def get_rendering_inputs(fonts_dirs: list[Path]) -> list[str]:
+    """Identify what the rendered sizes depend on besides the subtitles.
+
+    :param fonts_dirs: directories the fonts are looked for in
+    :return: inputs for the result cache key
+    """
+    from ass_lint.fonts import get_fonts_fingerprint
+
+    return [get_renderer_version(), get_fonts_fingerprint(fonts_dirs)]
+
+
+def get_line_height_cache_key(
+    style: AssStyle, ass_file: AssFile, renderer_version: str
+) -> str:
+    return make_cache_key(
+        "line_height",
+        renderer_version,
+        [getattr(style, name) for name in LINE_HEIGHT_STYLE_FIELDS],
+        [
+            str(ass_file.script_info.get(name, ""))
+            for name in LINE_HEIGHT_SCRIPT_INFO_FIELDS
+        ],
+    )
+
+
 def get_optimal_line_heights(
-    ass_file: AssFile, video_resolution: tuple[int, int]
+    ass_file: AssFile,
+    video_resolution: tuple[int, int],
+    cache: Optional["DiskCache"] = None,
+) -> dict[str, float]:
+    renderer_version = get_renderer_version()
+    keys = {
+        style.name: get_line_height_cache_key(
+            style, ass_file, renderer_version
+        )
+        for style in ass_file.styles
+    }
+
+    with _line_height_memo_lock:
+        known = {
+            key: _line_height_memo[key]
+            for key in keys.values()
+            if key in _line_height_memo
+        }
+    if cache:
+        known.update(
+            cache.get_many(key for key in keys.values() if key not in known)
+        )
+
+    # styles with identical definitions need to be rendered only once
+    missing_styles: dict[str, AssStyle] = {}
+    for style in ass_file.styles:
+        if keys[style.name] not in known:
+            missing_styles.setdefault(keys[style.name], style)
+    if missing_styles:
+        rendered = _render_optimal_line_heights(
+            ass_file, video_resolution, list(missing_styles.values())
+        )
+        new_items = {
+            keys[style_name]: line_height
+            for style_name, line_height in rendered.items()
+        }
+        known.update(new_items)
+        if cache:
+            cache.set_many(new_items)
+
+    with _line_height_memo_lock:
+        _line_height_memo.update(known)
+
+    ret = {}
+    for style_name, key in keys.items():
+        ret[style_name] = known[key]
+        logging.debug(f"average height for {style_name}: {known[key]}")
+    return ret
+
+
+def _render_optimal_line_heights(
+    ass_file: AssFile,
+    video_resolution: tuple[int, int],
+    styles: list[AssStyle],
 ) -> dict[str, float]:
+    from ass_renderer import AssRenderer
+
     test_line_count = 20
     video_res_x = 100
     video_res_y = test_line_count * 300
 
     fake_file = AssFile()
-    fake_file.styles[:] = [copy(style) for style in ass_file.styles]
+    fake_file.styles[:] = [
+        make_metrics_only_style(style) for style in ass_file.styles
+    ]
     fake_file.script_info.update(ass_file.script_info)
     fake_file.script_info["WrapStyle"] = "2"
     renderer = AssRenderer()
-    renderer.set_source(
-        ass_file=fake_file,
-        video_resolution=(video_res_x, video_res_y),
-    )
 
     ret = {}
-    for style in ass_file.styles:
+    for style in styles:
         event = AssEvent(
             start=0,
             end=1000,
@@ -97,14 +316,37 @@ def get_optimal_line_heights(
         )
 
         _frame_width, frame_height = measure_frame_size(
-            renderer, video_resolution, event
+            renderer,
+            fake_file,
+            video_resolution,
+            event,
+            render_resolution=(video_res_x, video_res_y),
         )
-        line_height = frame_height / test_line_count
-        ret[event.style_name] = line_height
-        logging.debug(f"average height for {event.style_name}: {line_height}")
+        ret[style.name] = frame_height / test_line_count
     return ret
 
 
+def get_system_fonts_dirs() -> list[Path]:
+    if sys.platform == "win32":
+        return [
+            Path(os.environ.get("WINDIR", "C:/Windows")) / "Fonts",
+            Path(os.environ.get("LOCALAPPDATA", "~"))
+            / "Microsoft/Windows/Fonts",
+        ]
+    if sys.platform == "darwin":
+        return [
+            Path("/System/Library/Fonts"),
+            Path("/Library/Fonts"),
+            Path("~/Library/Fonts"),
+        ]
+    return [
+        Path("/usr/share/fonts"),
+        Path("/usr/local/share/fonts"),
+        Path(os.environ.get("XDG_DATA_HOME") or "~/.local/share") / "fonts",
+        Path("~/.fonts"),
+    ]
+
+
 def get_video_height(ass_file: AssFile) -> int:
     return int(ass_file.script_info.get("PlayResY", "0"))
 
@@ -113,37 +355,40 @@ def get_video_width(ass_file: AssFile) -> int:
     return int(ass_file.script_info.get("PlayResX", "0"))
 
 
-def strip_brackets(text: str) -> str:
-    return text.lstrip("[(").rstrip(")]")
-
-
-def is_event_sign(event: AssEvent) -> bool:
-    return strip_brackets(event.actor) in {
-        "sign",
-        "episode title",
-        "series title",
-    }
+def strip_drawings(text: str) -> str:
+    """Remove the vector drawing commands from given ASS text, keeping the
+    override blocks and the regular text.
+    """
+    parts = []
+    is_drawing = False
+    pos = 0
+    for match in OVERRIDE_BLOCK_RE.finditer(text):
+        if not is_drawing:
+            parts.append(text[pos : match.start()])
+        parts.append(match.group(0))
+        if modes := DRAWING_MODE_RE.findall(match.group(0)):
+            is_drawing = int(modes[-1]) > 0
+        pos = match.end()
+    if not is_drawing:
+        parts.append(text[pos:])
+    return "".join(parts)
 
 
-def is_event_title(event: AssEvent) -> bool:
-    return strip_brackets(event.actor) == "title"
+def get_plaintext(text: str) -> str:
+    """Same as ass_to_plaintext, but skips over the drawings without parsing
+    their commands, which can take seconds for detailed signs.
+    """
+    if DRAWING_RE.search(text):
+        text = strip_drawings(text)
+    return ass_to_plaintext(text)
 
 
-def is_event_karaoke(event: AssEvent) -> bool:
-    return strip_brackets(event.actor) == "karaoke"
+def count_plaintext_characters(plaintext: str) -> int:
+    return len(NON_WORD_RE.sub("", plaintext))
 
 
-def is_event_credits(event: AssEvent) -> bool:
-    return strip_brackets(event.actor) == "credits"
-
-
-def is_event_dialog(event: AssEvent) -> bool:
-    return not (
-        is_event_sign(event)
-        or is_event_title(event)
-        or is_event_karaoke(event)
-        or is_event_credits(event)
-    )
+def strip_brackets(text: str) -> str:
+    return text.lstrip("[(").rstrip(")]")
 
 
 def get_video_aspect_ratio(ass_file: AssFile) -> Optional[AspectRatio]:
@@ -171,11 +416,11 @@ def get_video_aspect_ratio(ass_file: AssFile) -> Optional[AspectRatio]:
 
 @contextmanager
 def benchmark(message: str) -> None:
-    start = datetime.now()
+    start = time.perf_counter()
     yield
-    end = datetime.now()
+    end = time.perf_counter()
     duration = end - start
-    logging.debug(f"{message}: {duration}")
+    logging.debug(f"{message}: {duration:.06f} s")
 
 
 @contextmanager
@@ -185,5 +430,8 @@ def suppress_stderr():
     devnull = os.open(os.devnull, os.O_WRONLY)
     os.dup2(devnull, 2)
     os.close(devnull)
-    yield
-    os.dup2(newstderr, 2)
+    try:
+        yield
+    finally:
+        os.dup2(newstderr, 2)
+        os.close(newstderr)